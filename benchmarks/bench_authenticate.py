@@ -0,0 +1,79 @@
+"""
+Benchmark de autenticación
+Mide inicios de sesión por segundo sostenidos con UserService.authenticate
+
+Uso:
+    python benchmarks/bench_authenticate.py [--users N] [--seconds S]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.user_service import UserService
+from src.utils.rate_limiter import TokenBucketLimiter
+
+
+def build_service(user_count):
+    """Crea un servicio con user_count usuarios y límites holgados"""
+    service = UserService()
+    service.import_users({"name": f"User {i}", "email": f"user{i}@example.com", "password": f"password{i}"}
+                         for i in range(user_count))
+    return service
+
+
+def run_phase(service, label, attempts, seconds):
+    """Ejecuta intentos durante `seconds` segundos e informa el ritmo"""
+    ok = rejected = failed = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for email, password, source in attempts:
+            success, message = service.authenticate(email, password, source=source)
+            if success:
+                ok += 1
+            elif message.startswith("Demasiados"):
+                rejected += 1
+            else:
+                failed += 1
+    elapsed = time.perf_counter() - start
+    total = ok + rejected + failed
+    print(f"{label:<38} {total / elapsed:>12,.0f} intentos/s  "
+          f"(ok={ok}, fallidos={failed}, limitados={rejected})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    random.seed(42)
+    service = build_service(args.users)
+    sample = random.sample(range(args.users), min(args.users, 1000))
+
+    # Límites holgados: mide el coste del camino de autenticación en sí
+    service._account_limiter = TokenBucketLimiter(1e9, 1e9)
+    service._source_limiter = TokenBucketLimiter(1e9, 1e9)
+    valid = [(f"user{i}@example.com", f"password{i}", f"10.0.{i % 256}.{i // 256 % 256}") for i in sample]
+    run_phase(service, "Credenciales válidas", valid, args.seconds)
+
+    invalid = [(email, "wrong-password", source) for email, _, source in valid]
+    run_phase(service, "Contraseña incorrecta", invalid, args.seconds)
+
+    unknown = [(f"missing{i}@example.com", "password", "10.1.0.1") for i in range(1000)]
+    run_phase(service, "Cuenta inexistente", unknown, args.seconds)
+
+    # Límites por defecto: ataque de fuerza bruta contra una cuenta
+    service._account_limiter = TokenBucketLimiter(5, 0.1)
+    service._source_limiter = TokenBucketLimiter(50, 5)
+    brute_force = [("user0@example.com", f"guess{i}", "203.0.113.7") for i in range(1000)]
+    run_phase(service, "Fuerza bruta (límites por defecto)", brute_force, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Benchmark de carga masiva
+Compara los modos de GC de las cargas de archivos (BULK_LOAD_GC_MODE)
+
+Para cada formato y modo mide el tiempo de carga, las pasadas del GC
+durante la carga (y cuántas se evitaron frente a 'off'), la pausa de una
+colección completa después de cargar y los objetos que ya no recorre el GC.
+Con --trace mide además el pico de memoria con tracemalloc (más lento).
+
+Para TXT compara además la lectura actual (líneas sobre los bytes y
+User.from_fields) con la anterior (copia decodificada, lista de líneas y un
+diccionario por línea para User.from_dict): tiempo, pico de memoria,
+bloques vivos a mitad de la lectura según un snapshot de tracemalloc, y
+diccionarios por línea (uno por línea leída en la ruta anterior, ninguno
+en la actual).
+
+Uso:
+    python benchmarks/bench_bulk_load.py [--users N] [--formats json,txt] [--trace]
+"""
+
+import argparse
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.user import User
+from src.services.user_service import UserService
+from src.utils.gc_control import GC_MODES
+from src.utils.memory_profiler import format_bytes
+
+
+def write_sources(user_count, directory):
+    """Guarda user_count usuarios en JSON y TXT y devuelve las rutas por formato"""
+    service = UserService()
+    service.import_users({"name": f"User {i}", "email": f"user{i}@example.com", "password": f"password{i}"}
+                         for i in range(user_count))
+    paths = {'json': os.path.join(directory, 'users.json'), 'txt': os.path.join(directory, 'users.txt')}
+    service.save_to_json(paths['json'])
+    service.export_to_txt(paths['txt'])
+    return paths
+
+
+def parse_txt_legacy(raw):
+    """Lectura de TXT anterior: copia decodificada, lista de líneas y un diccionario por usuario"""
+    users = []
+    for line in raw.decode('utf-8').split('\n'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            parts = line.split('|')
+            if len(parts) == 5:
+                user_data = {'id': int(parts[0]), 'name': parts[1], 'email': parts[2],
+                             'password_hash': parts[3], 'created_at': parts[4]}
+                users.append(User.from_dict(user_data))
+    return users
+
+
+def parse_txt_current(raw):
+    """Lectura de TXT actual (la de UserService.load_from_txt, sin índices)"""
+    users = []
+    from_fields = User.from_fields
+    for line in io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8', newline='\n'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            parts = line.split('|')
+            if len(parts) == 5:
+                users.append(from_fields(int(parts[0]), parts[1], parts[2], parts[3], parts[4]))
+    return users
+
+
+def measure_txt_parse(path, parse, builder, line_dicts):
+    """
+    Mide una lectura de TXT: tiempo, pico de tracemalloc, bloques vivos a mitad
+    de la lectura y diccionarios por línea
+
+    Los bloques se cuentan con un snapshot de tracemalloc tomado al construir
+    el usuario del medio (el constructor `builder` de User se envuelve solo en
+    esa pasada): incluyen lo que la lectura mantiene en curso (copia
+    decodificada, lista de líneas) además de los usuarios ya construidos.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        users = parse(raw)
+        elapsed = time.perf_counter() - start
+        count = len(users)
+        del users
+        gc.collect()
+
+        build = getattr(User, builder)
+        original = User.__dict__[builder]
+        calls = [0]
+        snapshots = {}
+
+        def build_and_snapshot(*args):
+            calls[0] += 1
+            if calls[0] == count // 2:
+                snapshots['midway'] = tracemalloc.take_snapshot()
+            return build(*args)
+
+        tracemalloc.start()
+        snapshots['before'] = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        setattr(User, builder, staticmethod(build_and_snapshot))
+        try:
+            users = parse(raw)
+        finally:
+            setattr(User, builder, original)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del users
+    finally:
+        gc.enable()
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    differences = snapshots['midway'].filter_traces(ignored).compare_to(
+        snapshots['before'].filter_traces(ignored), 'filename')
+    return {'elapsed': elapsed, 'peak': peak, 'users': count,
+            'blocks': sum(stat.count_diff for stat in differences),
+            'line_dicts': count if line_dicts else 0}
+
+
+def collections():
+    """Colecciones hechas hasta ahora por generación"""
+    return [stats['collections'] for stats in gc.get_stats()]
+
+
+def measure(path, fmt, mode, trace):
+    """Carga un archivo con un modo de GC y devuelve las medidas"""
+    gc.unfreeze()
+    gc.collect()
+    pauses = []
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            pauses.append(time.perf_counter())
+        else:
+            pauses[-1] = time.perf_counter() - pauses[-1]
+
+    service = UserService(bulk_load_gc=mode)
+    loader = service.load_from_json if fmt == 'json' else service.load_from_txt
+    if trace:
+        tracemalloc.start()
+    before = collections()
+    gc.callbacks.append(on_gc)
+    start = time.perf_counter()
+    success, message = loader(path)
+    elapsed = time.perf_counter() - start
+    gc.callbacks.remove(on_gc)
+    during = [after - prior for after, prior in zip(collections(), before)]
+    peak = tracemalloc.get_traced_memory()[1] if trace else None
+    if trace:
+        tracemalloc.stop()
+    if not success:
+        raise SystemExit(message)
+
+    # Pausa de una colección completa con los usuarios ya cargados
+    start = time.perf_counter()
+    gc.collect()
+    full_pause = time.perf_counter() - start
+    result = {'elapsed': elapsed, 'collections': during, 'gc_pause': sum(pauses), 'full_pause': full_pause,
+              'frozen': gc.get_freeze_count(), 'peak': peak, 'users': len(service.users)}
+    del service
+    gc.unfreeze()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=500000)
+    parser.add_argument('--formats', default='json,txt')
+    parser.add_argument('--trace', action='store_true', help="Mide el pico de memoria con tracemalloc")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generando {args.users} usuarios...")
+        paths = write_sources(args.users, directory)
+
+        header = (f"{'Formato':<8} {'Modo':<7} {'Carga s':>8} {'Pasadas GC':>16} {'Evitadas':>9} "
+                  f"{'Pausa GC ms':>12} {'GC completo ms':>15} {'Congelados':>11}")
+        if args.trace:
+            header += f" {'Pico':>10}"
+        print(header)
+        for fmt in args.formats.split(','):
+            baseline = None
+            for mode in GC_MODES:
+                result = measure(paths[fmt], fmt, mode, args.trace)
+                total = sum(result['collections'])
+                baseline = total if baseline is None else baseline
+                row = (f"{fmt:<8} {mode:<7} {result['elapsed']:>8.2f} "
+                       f"{'/'.join(map(str, result['collections'])):>16} {baseline - total:>9} "
+                       f"{result['gc_pause'] * 1000:>12.1f} {result['full_pause'] * 1000:>15.1f} "
+                       f"{result['frozen']:>11,}")
+                if args.trace:
+                    row += f" {format_bytes(result['peak']):>10}"
+                print(row)
+        if 'txt' in args.formats.split(','):
+            print("\nLectura de TXT (sin índices)")
+            print(f"{'Ruta':<9} {'Usuarios':>9} {'Lectura s':>10} {'Pico':>10} {'Bloques a mitad':>18} "
+                  f"{'Dicts por línea':>16}")
+            results = {name: measure_txt_parse(paths['txt'], parse, builder, line_dicts)
+                       for name, parse, builder, line_dicts in (
+                           ('anterior', parse_txt_legacy, 'from_dict', True),
+                           ('actual', parse_txt_current, 'from_fields', False))}
+            for name, result in results.items():
+                print(f"{name:<9} {result['users']:>9,} {result['elapsed']:>10.2f} "
+                      f"{format_bytes(result['peak']):>10} {result['blocks']:>18,} {result['line_dicts']:>16,}")
+            legacy, current = results['anterior'], results['actual']
+            peak_delta = current['peak'] - legacy['peak']
+            peak_delta = f"{'-' if peak_delta < 0 else '+'}{format_bytes(abs(peak_delta))}"
+            print(f"{'delta':<9} {'':>9} {current['elapsed'] - legacy['elapsed']:>+10.2f} {peak_delta:>10} "
+                  f"{current['blocks'] - legacy['blocks']:>+18,} {current['line_dicts'] - legacy['line_dicts']:>+16,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Prueba de carga y resistencia
+Ejecuta una mezcla de operaciones con llegadas de lazo abierto durante un tiempo fijo
+y reporta rendimiento, latencias p50/p99/p999, pausas del recolector y crecimiento de memoria
+
+Las operaciones llegan según un proceso de Poisson de --rate operaciones/s,
+independientemente de lo que tarde el servicio (lazo abierto). La latencia se
+mide desde la llegada programada, así que incluye la espera en cola cuando
+el servicio no da abasto.
+
+Uso:
+    python benchmarks/soak.py [--users N] [--duration S] [--rate R]
+                              [--mix lookup=70,search=20,register=8,delete=2]
+                              [--target inprocess|cli] [--interval S] [--json]
+
+Con --target cli solo hay search, fuzzy, register y delete (el modo por lotes
+no tiene búsqueda por ID ni autenticación); la mezcla por defecto es
+search=90,register=8,delete=2.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.user_service import UserService
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+OPERATIONS = ('lookup', 'search', 'fuzzy', 'register', 'delete', 'auth')
+CLI_OPERATIONS = ('search', 'fuzzy', 'register', 'delete')
+DEFAULT_MIX = {'inprocess': 'lookup=70,search=20,register=8,delete=2', 'cli': 'search=90,register=8,delete=2'}
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Pedro', 'Sofía', 'Diego']
+LAST_NAMES = ['García', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Díaz', 'Ruiz', 'Torres', 'Vega']
+
+
+class LatencyHistogram:
+    """Histograma logarítmico de latencias (~1% de error relativo, memoria constante)"""
+
+    _GROWTH = math.log(1.01)
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1.0)
+        self.buckets[int(math.log(micros) / self._GROWTH)] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """Latencia en segundos por debajo de la cual queda `fraction` de las muestras"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(math.exp((bucket + 1) * self._GROWTH) / 1e6, self.max)
+        return self.max
+
+
+class GcMonitor:
+    """Mide las pausas del recolector de basura con gc.callbacks"""
+
+    def __init__(self):
+        self.pauses = LatencyHistogram()
+        self.total = 0.0
+        self.collections = Counter()
+        self._started = None
+
+    def __enter__(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc_info):
+        gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self.pauses.record(pause)
+            self.total += pause
+            self.collections[info['generation']] += 1
+            self._started = None
+
+
+def current_rss():
+    """Memoria residente del proceso en bytes (0 si no se puede medir)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+def parse_mix(text):
+    """Convierte 'lookup=70,search=20' en pesos por operación"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: '{name}' (use {', '.join(OPERATIONS)})")
+        mix[name] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("La mezcla debe tener algún peso positivo")
+    return mix
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+class LiveIds:
+    """IDs vivos con alta, baja y elección al azar en O(1)"""
+
+    def __init__(self, ids=()):
+        self.ids = list(ids)
+        self.positions = {user_id: i for i, user_id in enumerate(self.ids)}
+
+    def __bool__(self):
+        return bool(self.ids)
+
+    def add(self, user_id):
+        self.positions[user_id] = len(self.ids)
+        self.ids.append(user_id)
+
+    def remove(self, user_id):
+        position = self.positions.pop(user_id)
+        last = self.ids.pop()
+        if last != user_id:
+            self.ids[position] = last
+            self.positions[last] = position
+
+    def choice(self, rng):
+        return rng.choice(self.ids)
+
+
+class InProcessTarget:
+    """Ejecuta las operaciones directamente sobre un UserService"""
+
+    def __init__(self, users, rng):
+        self.rng = rng
+        self.service = UserService()
+        self.service.import_users({"name": random_name(rng), "email": f"user{i}@example.com",
+                                   "password": f"password{i}"} for i in range(users))
+        self.ids = LiveIds(user.id for user in self.service.list_users())
+        self.sequence = users
+
+    def run(self, operation):
+        rng = self.rng
+        if operation == 'lookup' and self.ids:
+            self.service.get_user_by_id(self.ids.choice(rng))
+        elif operation == 'search':
+            self.service.search_users_by_name(rng.choice(LAST_NAMES)[:4])
+        elif operation == 'fuzzy':
+            self.service.search_users_fuzzy(rng.choice(LAST_NAMES).lower().replace('í', 'i'))
+        elif operation == 'register':
+            self.sequence += 1
+            success, _ = self.service.register_user(random_name(rng), f"user{self.sequence}@example.com",
+                                                    f"password{self.sequence}")
+            if success:
+                self.ids.add(self.service.get_user_by_email(f"user{self.sequence}@example.com").id)
+        elif operation == 'delete' and self.ids:
+            user_id = self.ids.choice(rng)
+            self.service.delete_user(user_id)
+            self.ids.remove(user_id)
+        elif operation == 'auth':
+            number = rng.randrange(self.sequence)
+            self.service.authenticate(f"user{number}@example.com", f"password{number}",
+                                      source=f"10.0.{number % 256}.1")
+
+
+class CliTarget:
+    """
+    Ejecuta cada operación como un proceso 'main.py <subcomando>' sobre un almacén en disco
+
+    Solo admite CLI_OPERATIONS. El almacén empieza vacío y los IDs nunca se
+    reutilizan, así que cada alta recibe el siguiente ID.
+    """
+
+    def __init__(self, users, rng, store):
+        self.rng = rng
+        self.store = store
+        self.sequence = users
+        records = "".join(json.dumps({"name": random_name(rng), "email": f"user{i}@example.com",
+                                      "password": f"password{i}"}) + "\n" for i in range(users))
+        if os.path.exists(store):
+            os.remove(store)
+        self._main('import', '-', stdin=records)
+        self.ids = LiveIds(range(1, users + 1))
+        self.next_id = users + 1
+
+    def _main(self, *argv, stdin=None):
+        subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--store', self.store, *argv],
+                       input=stdin, text=True, capture_output=True, check=True, cwd=ROOT)
+
+    def run(self, operation):
+        rng = self.rng
+        if operation not in CLI_OPERATIONS:
+            raise ValueError(f"Operación no disponible con --target cli: '{operation}'")
+        if operation == 'search':
+            self._main('search', rng.choice(LAST_NAMES)[:4])
+        elif operation == 'fuzzy':
+            self._main('search', '--fuzzy', rng.choice(LAST_NAMES).lower())
+        elif operation == 'register':
+            self.sequence += 1
+            record = {"name": random_name(rng), "email": f"user{self.sequence}@example.com",
+                      "password": f"password{self.sequence}"}
+            self._main('import', '-', stdin=json.dumps(record) + "\n")
+            self.ids.add(self.next_id)
+            self.next_id += 1
+        elif operation == 'delete' and self.ids:
+            user_id = self.ids.choice(rng)
+            self._main('delete', str(user_id))
+            self.ids.remove(user_id)
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.3f}"
+
+
+def soak(target, mix, rate, duration, interval, rng, report_interval):
+    """Ejecuta la carga y devuelve el resumen; report_interval(fila) se llama cada `interval` segundos"""
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    per_operation = {name: LatencyHistogram() for name in operations}
+    errors = Counter()
+    timeline = []
+
+    gc.collect()
+    rss_start = current_rss()
+    with GcMonitor() as gc_monitor:
+        start = time.perf_counter()
+        deadline = start + duration
+        next_arrival = start
+        window_start, window = start, LatencyHistogram()
+        window_gc = 0.0
+        completed = 0
+
+        while next_arrival < deadline:
+            now = time.perf_counter()
+            if now >= deadline:
+                break  # Saturado: las llegadas pendientes se reportan como no atendidas
+            if now < next_arrival:
+                time.sleep(next_arrival - now)
+
+            operation = rng.choices(operations, weights)[0]
+            try:
+                target.run(operation)
+            except Exception:
+                errors[operation] += 1
+            finished = time.perf_counter()
+            latency = finished - next_arrival
+            per_operation[operation].record(latency)
+            window.record(latency)
+            completed += 1
+            next_arrival += rng.expovariate(rate)
+
+            if finished - window_start >= interval:
+                row = {
+                    'elapsed_s': round(finished - start, 3),
+                    'throughput': window.count / (finished - window_start),
+                    'p99_ms': window.percentile(0.99) * 1000,
+                    'gc_pause_ms': (gc_monitor.total - window_gc) * 1000,
+                    'rss_mb': current_rss() / 2 ** 20,
+                    'backlog_s': max(0.0, finished - next_arrival)
+                }
+                timeline.append(row)
+                report_interval(row)
+                window_start, window, window_gc = finished, LatencyHistogram(), gc_monitor.total
+
+        elapsed = time.perf_counter() - start
+        unserved = int(max(0.0, deadline - next_arrival) * rate)
+
+    overall = LatencyHistogram()
+    for histogram in per_operation.values():
+        overall.merge(histogram)
+
+    def summary(histogram):
+        return {'count': histogram.count, 'p50_ms': histogram.percentile(0.5) * 1000,
+                'p99_ms': histogram.percentile(0.99) * 1000, 'p999_ms': histogram.percentile(0.999) * 1000,
+                'max_ms': histogram.max * 1000}
+
+    rss_end = current_rss()
+    return {
+        'duration_s': elapsed,
+        'offered_rate': rate,
+        'throughput': completed / elapsed if elapsed else 0.0,
+        'unserved': unserved,
+        'latency': summary(overall),
+        'operations': {name: summary(histogram) for name, histogram in per_operation.items()},
+        'errors': dict(errors),
+        'gc': {
+            'collections': {str(generation): count for generation, count in sorted(gc_monitor.collections.items())},
+            'total_pause_ms': gc_monitor.total * 1000,
+            'p99_pause_ms': gc_monitor.pauses.percentile(0.99) * 1000,
+            'max_pause_ms': gc_monitor.pauses.max * 1000
+        },
+        'memory': {
+            'rss_start_mb': rss_start / 2 ** 20,
+            'rss_end_mb': rss_end / 2 ** 20,
+            'growth_mb': (rss_end - rss_start) / 2 ** 20
+        },
+        'timeline': timeline
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000, help="Usuarios iniciales")
+    parser.add_argument('--duration', type=float, default=30.0, help="Segundos de carga")
+    parser.add_argument('--rate', type=float, default=2000.0, help="Operaciones por segundo ofrecidas")
+    parser.add_argument('--mix', type=parse_mix,
+                        help=f"Pesos por operación ({', '.join(OPERATIONS)}; con --target cli: "
+                             f"{', '.join(CLI_OPERATIONS)}). Por defecto {DEFAULT_MIX['inprocess']} "
+                             f"o {DEFAULT_MIX['cli']} con --target cli")
+    parser.add_argument('--target', choices=['inprocess', 'cli'], default='inprocess',
+                        help="inprocess: UserService directo; cli: un proceso main.py por operación")
+    parser.add_argument('--store', default=os.path.join(ROOT, 'soak_users.json'),
+                        help="Almacén usado con --target cli")
+    parser.add_argument('--interval', type=float, default=5.0, help="Segundos entre filas del reporte")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Imprime el resumen como JSON")
+    args = parser.parse_args()
+    args.mix = args.mix or parse_mix(DEFAULT_MIX[args.target])
+    if args.target == 'cli':
+        unsupported = [name for name in args.mix if name not in CLI_OPERATIONS]
+        if unsupported:
+            parser.error(f"--target cli no admite {', '.join(unsupported)} (use {', '.join(CLI_OPERATIONS)})")
+
+    rng = random.Random(args.seed)
+    if args.target == 'cli':
+        target = CliTarget(args.users, rng, args.store)
+    else:
+        target = InProcessTarget(args.users, rng)
+
+    def report_interval(row):
+        if not args.json:
+            print(f"{row['elapsed_s']:>8.1f}s {row['throughput']:>10,.0f} ops/s  p99 {row['p99_ms']:>9.3f} ms  "
+                  f"gc {row['gc_pause_ms']:>8.2f} ms  rss {row['rss_mb']:>8.1f} MB  cola {row['backlog_s']:.3f} s")
+
+    if not args.json:
+        print(f"Objetivo: {args.target}, {args.users} usuarios, {args.rate:,.0f} ops/s durante {args.duration:.0f} s")
+    result = soak(target, args.mix, args.rate, args.duration, args.interval, rng, report_interval)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"\nRendimiento: {result['throughput']:,.0f} ops/s (ofrecidas {args.rate:,.0f})")
+    if result['unserved']:
+        print(f"Llegadas sin atender al terminar: ~{result['unserved']:,} (el servicio no sostiene la tasa)")
+    print(f"{'Operación':<10} {'n':>9} {'p50 ms':>10} {'p99 ms':>10} {'p999 ms':>10} {'max ms':>10}")
+    for name, stats in list(result['operations'].items()) + [('total', result['latency'])]:
+        print(f"{name:<10} {stats['count']:>9} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+              f"{stats['p999_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+    gc_stats = result['gc']
+    collections = ', '.join(f"gen{generation}={count}" for generation, count in gc_stats['collections'].items())
+    print(f"GC: {collections or 'sin'} colecciones, pausa total {gc_stats['total_pause_ms']:.1f} ms, "
+          f"p99 {gc_stats['p99_pause_ms']:.3f} ms, máx {gc_stats['max_pause_ms']:.3f} ms")
+    memory = result['memory']
+    print(f"Memoria: {memory['rss_start_mb']:.1f} MB -> {memory['rss_end_mb']:.1f} MB "
+          f"({memory['growth_mb']:+.1f} MB)")
+    if result['errors']:
+        print(f"Errores: {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import os
 import sys
 import traceback
+from datetime import datetime
 from src.services.user_service import UserService
-from src.config.settings import APP_NAME, DEBUG
+from src.services.cached_user_service import CachedUserService
+from src.services.resumable_import import has_checkpoint
+from src.config.settings import APP_NAME, DEBUG, CACHE_ENABLED, SNAPSHOT_CACHE_ENABLED, DEFAULT_DATA_FILE
+from src.utils.gc_control import bulk_load_gc
+from src.utils.memory_profiler import trace_allocations, format_bytes
 from colorama import init, Fore, Style
 
 # Inicializar colorama
@@ -28,6 +33,10 @@ def display_menu():
     print(f"{Fore.GREEN}4. {Style.RESET_ALL}Eliminar usuario")
     print(f"{Fore.GREEN}5. {Style.RESET_ALL}Guardar usuarios en archivo")
     print(f"{Fore.GREEN}6. {Style.RESET_ALL}Cargar usuarios desde archivo")
+    print(f"{Fore.GREEN}7. {Style.RESET_ALL}Consultar usuarios por fecha de registro")
+    print(f"{Fore.GREEN}8. {Style.RESET_ALL}Búsqueda aproximada por nombre")
+    print(f"{Fore.GREEN}9. {Style.RESET_ALL}Reporte de estadísticas")
+    print(f"{Fore.GREEN}10. {Style.RESET_ALL}Reporte de memoria")
     print(f"{Fore.RED}0. {Style.RESET_ALL}Salir")
     print(f"{Fore.CYAN}{'=' * 40}")
 
@@ -122,6 +131,180 @@ def search_user(service):
             traceback.print_exc()
 
 
+def fuzzy_search_user(service):
+    """Busca usuarios por nombre tolerando acentos y errores de tipeo"""
+    try:
+        print(f"\n{Fore.CYAN}--- Búsqueda Aproximada ---{Style.RESET_ALL}")
+        
+        search_term = input(f"{Fore.YELLOW}Ingrese nombre a buscar: {Style.RESET_ALL}").strip()
+        if not search_term:
+            show_error("El término de búsqueda no puede estar vacío")
+            return
+        
+        users = service.search_users_fuzzy(search_term)
+        
+        if not users:
+            show_info(f"No se encontraron usuarios parecidos a '{search_term}'")
+            return
+        
+        print(f"\n{Fore.GREEN}Mejores coincidencias para '{search_term}':{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}{'ID':<5} {'Nombre':<20} {'Email':<30}{Style.RESET_ALL}")
+        print("-" * 55)
+        
+        for user in users:
+            print(f"{user.id:<5} {user.name:<20} {user.email:<30}")
+            
+    except Exception as e:
+        show_error(f"Error en la búsqueda aproximada: {str(e)}")
+        if DEBUG:
+            traceback.print_exc()
+
+
+def parse_date_input(prompt, end_of_day=False):
+    """
+    Solicita una fecha (AAAA-MM-DD o ISO completo); vacío significa sin límite
+    
+    Raises:
+        ValueError: Si la fecha no tiene un formato válido
+    """
+    value = input(f"{Fore.YELLOW}{prompt}: {Style.RESET_ALL}").strip()
+    if not value:
+        return None
+    
+    date = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        # Una fecha sin hora como límite superior incluye todo el día
+        date = date.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return date
+
+
+def search_by_date(service):
+    """Consulta usuarios por fecha de registro"""
+    try:
+        print(f"\n{Fore.CYAN}--- Usuarios por Fecha de Registro ---{Style.RESET_ALL}")
+        print("1. Registrados entre dos fechas")
+        print("2. Más recientes")
+        print("3. Más antiguos")
+        
+        option = input(f"{Fore.YELLOW}Opción: {Style.RESET_ALL}").strip()
+        
+        if option == "1":
+            try:
+                start = parse_date_input("Desde (AAAA-MM-DD, vacío = sin límite)")
+                end = parse_date_input("Hasta (AAAA-MM-DD, vacío = sin límite)", end_of_day=True)
+            except ValueError:
+                show_error("Fecha inválida. Use el formato AAAA-MM-DD")
+                return
+            users = service.find_by_created_range(start, end)
+        elif option in ("2", "3"):
+            try:
+                count = int(input(f"{Fore.YELLOW}Cantidad de usuarios: {Style.RESET_ALL}").strip() or "10")
+            except ValueError:
+                show_error("Cantidad inválida. Debe ser un número.")
+                return
+            users = service.newest(count) if option == "2" else service.oldest(count)
+        else:
+            show_error("Opción inválida")
+            return
+        
+        if not users:
+            show_info("No se encontraron usuarios")
+            return
+        
+        print(f"\n{Fore.YELLOW}{'ID':<5} {'Nombre':<20} {'Email':<30} {'Registro':<19}{Style.RESET_ALL}")
+        print("-" * 75)
+        
+        for user in users:
+            print(f"{user.id:<5} {user.name:<20} {user.email:<30} {user.created_at:%Y-%m-%d %H:%M:%S}")
+            
+    except Exception as e:
+        show_error(f"Error en la consulta por fecha: {str(e)}")
+        if DEBUG:
+            traceback.print_exc()
+
+
+def show_stats(service):
+    """Muestra el reporte de estadísticas agregadas"""
+    try:
+        stats = service.stats(top_domains=10)
+        
+        print(f"\n{Fore.CYAN}--- Reporte de Estadísticas ---{Style.RESET_ALL}")
+        print(f"Total de usuarios: {stats['total_users']}")
+        
+        if not stats['total_users']:
+            return
+        
+        print(f"\n{Fore.YELLOW}{'Dominio':<30} {'Usuarios':>10}{Style.RESET_ALL}")
+        print("-" * 41)
+        for domain, count in stats['domains'].items():
+            print(f"{domain:<30} {count:>10}")
+        
+        print(f"\n{Fore.YELLOW}{'Mes':<30} {'Altas':>10}{Style.RESET_ALL}")
+        print("-" * 41)
+        for month, count in list(stats['signups_by_month'].items())[-12:]:
+            print(f"{month:<30} {count:>10}")
+        
+        print(f"\n{Fore.YELLOW}{'Día':<30} {'Altas':>10}{Style.RESET_ALL}")
+        print("-" * 41)
+        for day, count in list(stats['signups_by_day'].items())[-14:]:
+            print(f"{day:<30} {count:>10}")
+            
+    except Exception as e:
+        show_error(f"Error al generar estadísticas: {str(e)}")
+        if DEBUG:
+            traceback.print_exc()
+
+
+def print_allocations(title, trace):
+    """Muestra la diferencia de memoria medida con tracemalloc"""
+    print(f"\n{Fore.YELLOW}{title}{Style.RESET_ALL}")
+    print(f"Retenido: {format_bytes(trace['net_bytes'])} - Pico: {format_bytes(trace['peak_bytes'])}")
+    for entry in trace['top']:
+        print(f"{format_bytes(entry['size_diff']):>12} {entry['count_diff']:>9}  {entry['location']}")
+
+
+def show_memory_report(service):
+    """Muestra el reporte de memoria y, opcionalmente, mide un guardado o una carga"""
+    try:
+        print(f"\n{Fore.CYAN}--- Reporte de Memoria ---{Style.RESET_ALL}")
+        print("1. Solo reporte")
+        print("2. Medir guardado en JSON")
+        print("3. Medir carga de archivo")
+        option = input(f"{Fore.YELLOW}Opción: {Style.RESET_ALL}").strip() or "1"
+        
+        trace = None
+        if option == "2":
+            filename = input(f"{Fore.YELLOW}Archivo de destino: {Style.RESET_ALL}").strip() or "users.json"
+            (success, message), trace = trace_allocations(service.save_to_json, filename)
+        elif option == "3":
+            filename = input(f"{Fore.YELLOW}Archivo a cargar (json o txt): {Style.RESET_ALL}").strip()
+            loader = service.load_from_txt if filename.endswith('.txt') else service.load_from_json
+            (success, message), trace = trace_allocations(loader, filename)
+        elif option != "1":
+            show_error("Opción inválida")
+            return
+        if trace is not None:
+            (show_success if success else show_error)(message)
+        
+        report = service.memory_report()
+        print(f"\nUsuarios: {report['users']}")
+        print(f"Total: {format_bytes(report['total_bytes'])} - "
+              f"Por usuario: {format_bytes(report['per_user_bytes'])}")
+        
+        print(f"\n{Fore.YELLOW}{'Componente':<30} {'Tamaño':>12}{Style.RESET_ALL}")
+        print("-" * 43)
+        for name, size in list(report['breakdown'].items()) + list(report['indexes'].items()):
+            print(f"{name:<30} {format_bytes(size):>12}")
+        
+        if trace is not None:
+            print_allocations("Asignaciones de la operación (tracemalloc)", trace)
+            
+    except Exception as e:
+        show_error(f"Error al generar el reporte de memoria: {str(e)}")
+        if DEBUG:
+            traceback.print_exc()
+
+
 def delete_user(service):
     """Elimina un usuario"""
     try:
@@ -178,6 +361,8 @@ def save_to_file(service):
         print(f"\n{Fore.BLUE}Formato:{Style.RESET_ALL}")
         print("1. JSON")
         print("2. TXT")
+        print("3. NDJSON")
+        print("4. CSV")
         
         format_choice = input(f"{Fore.YELLOW}Opción: {Style.RESET_ALL}").strip()
         
@@ -185,6 +370,10 @@ def save_to_file(service):
             success, message = service.save_to_json(f"{filename}.json")
         elif format_choice == "2":
             success, message = service.export_to_txt(f"{filename}.txt")
+        elif format_choice == "3":
+            success, message = service.save_to_ndjson(f"{filename}.ndjson")
+        elif format_choice == "4":
+            success, message = service.save_to_csv(f"{filename}.csv")
         else:
             show_error("Opción inválida")
             return
@@ -214,12 +403,24 @@ def load_from_file(service):
             show_error(f"El archivo '{filename}' no existe")
             return
         
-        if filename.endswith('.json'):
+        resume = False
+        if has_checkpoint(filename):
+            answer = input(f"{Fore.YELLOW}Hay una importación interrumpida de este archivo. "
+                           f"¿Reanudarla? (s/n): {Style.RESET_ALL}")
+            resume = answer.lower() == 's'
+        
+        if resume:
+            success, message = service.load_resumable(filename)
+        elif filename.endswith('.json'):
             success, message = service.load_from_json(filename)
         elif filename.endswith('.txt'):
             success, message = service.load_from_txt(filename)
+        elif filename.endswith(('.ndjson', '.jsonl')):
+            success, message = service.load_from_ndjson(filename)
+        elif filename.endswith('.csv'):
+            success, message = service.load_from_csv(filename)
         else:
-            show_error("Formato no soportado (use .json o .txt)")
+            show_error("Formato no soportado (use .json, .txt, .ndjson o .csv)")
             return
         
         if success:
@@ -238,12 +439,21 @@ def main():
     try:
         # Crear una sola instancia del servicio
         service = UserService()
+        if CACHE_ENABLED:
+            service = CachedUserService(service)
         
         # Intentar cargar usuarios desde archivo por defecto
-        default_file = 'users.json'
+        default_file = DEFAULT_DATA_FILE
         if os.path.exists(default_file):
             try:
-                success, message = service.load_from_json(default_file)
+                # Carga inicial de un proceso de larga vida: los usuarios se congelan (gc.freeze)
+                with bulk_load_gc('freeze'):
+                    if has_checkpoint(default_file):
+                        success, message = service.load_resumable(default_file)
+                    elif SNAPSHOT_CACHE_ENABLED:
+                        success, message = service.load_cached(default_file)
+                    else:
+                        success, message = service.load_from_json(default_file)
                 if success:
                     show_success(message)
             except Exception as e:
@@ -261,7 +471,10 @@ def main():
                     if service.has_unsaved_changes():
                         save_prompt = input(f"{Fore.YELLOW}Hay cambios sin guardar. ¿Guardar antes de salir? (s/n): {Style.RESET_ALL}")
                         if save_prompt.lower() in ('s', 'si', 'sí', 'y', 'yes'):
-                            service.save_to_json(default_file)
+                            success, _ = service.save_to_json(default_file)
+                            if success and SNAPSHOT_CACHE_ENABLED:
+                                # El próximo arranque usa el snapshot en lugar de leer el archivo
+                                service.save_snapshot(default_file)
                     
                     print(f"\n{Fore.GREEN}¡Hasta luego!{Style.RESET_ALL}")
                     sys.exit(0)
@@ -278,6 +491,14 @@ def main():
                     save_to_file(service)
                 elif choice == "6":
                     load_from_file(service)
+                elif choice == "7":
+                    search_by_date(service)
+                elif choice == "8":
+                    fuzzy_search_user(service)
+                elif choice == "9":
+                    show_stats(service)
+                elif choice == "10":
+                    show_memory_report(service)
                 else:
                     show_error("Opción inválida")
                     
@@ -297,6 +518,11 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Modo por lotes: subcomandos no interactivos (ver "python main.py --help")
+        from src.cli.batch import run
+        sys.exit(run(sys.argv[1:]))
+    
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,424 @@
+"""
+Modo por lotes de la línea de comandos
+Subcomandos no interactivos para operar sobre el almacén desde scripts
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+from src.config.settings import DEFAULT_DATA_FILE
+from src.services.migrations import upgrade_file
+from src.services.user_service import UserService, CSV_FIELDS
+from src.utils.file_handler import iter_ndjson_stream, write_ndjson_stream, iter_csv_stream, write_csv_stream
+from src.utils.integrity import IntegrityStatus, verify_file
+from src.utils.memory_profiler import trace_allocations
+
+# Registros por llamada a UserService.import_users (una reserva de IDs por lote)
+IMPORT_BATCH_SIZE = 10000
+
+
+class BatchError(Exception):
+    """Error que termina un subcomando con código de salida distinto de cero"""
+    pass
+
+
+def detect_format(filename: Optional[str], default: str = 'ndjson') -> str:
+    """
+    Deduce el formato a partir de la extensión del archivo
+
+    Args:
+        filename (str, optional): Nombre del archivo ('-' o None = entrada/salida estándar)
+        default (str): Formato si no se puede deducir
+
+    Returns:
+        str: 'json', 'txt', 'ndjson' o 'csv'
+    """
+    if not filename or filename == '-':
+        return default
+    extension = os.path.splitext(filename)[1].lower()
+    return {'.json': 'json', '.txt': 'txt', '.ndjson': 'ndjson',
+            '.jsonl': 'ndjson', '.csv': 'csv'}.get(extension, default)
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lee registros de un flujo NDJSON o CSV, uno a uno
+
+    Args:
+        stream (TextIO): Flujo de entrada
+        fmt (str): 'ndjson' o 'csv'
+
+    Yields:
+        Dict[str, Any]: Registro normalizado
+    """
+    if fmt == 'csv':
+        records = iter_csv_stream(stream)
+    elif fmt == 'ndjson':
+        records = iter_ndjson_stream(stream)
+    else:
+        raise BatchError(f"Formato de registros no soportado: {fmt} (use ndjson o csv)")
+    for record in records:
+        yield coerce_record(record)
+
+
+def coerce_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normaliza un registro leído de texto (los CSV solo tienen cadenas)
+
+    Args:
+        record (Dict[str, Any]): Registro original
+
+    Returns:
+        Dict[str, Any]: Registro con 'id' entero (o sin 'id') y sin campos vacíos
+    """
+    record = {key: value for key, value in record.items() if value not in ('', None)}
+    if 'id' in record:
+        record['id'] = int(record['id'])
+    return record
+
+
+def write_records(stream: TextIO, records: Iterable[Dict[str, Any]], fmt: str) -> int:
+    """
+    Escribe registros en un flujo NDJSON o CSV
+
+    Args:
+        stream (TextIO): Flujo de salida
+        records (Iterable[Dict[str, Any]]): Registros a escribir
+        fmt (str): 'ndjson' o 'csv'
+
+    Returns:
+        int: Cantidad de registros escritos
+    """
+    if fmt == 'csv':
+        return write_csv_stream(stream, records, CSV_FIELDS)
+    if fmt == 'ndjson':
+        return write_ndjson_stream(stream, records)
+    raise BatchError(f"Formato de registros no soportado: {fmt} (use ndjson o csv)")
+
+
+def emit(result: Dict[str, Any]) -> None:
+    """Escribe un resultado como una línea NDJSON en la salida estándar"""
+    sys.stdout.write(json.dumps(result, ensure_ascii=False))
+    sys.stdout.write('\n')
+
+
+def open_input(filename: str) -> TextIO:
+    """Abre un archivo de entrada, o la entrada estándar si es '-'"""
+    if filename == '-':
+        return sys.stdin
+    return open(filename, 'r', encoding='utf-8', newline='')
+
+
+def open_output(filename: Optional[str]) -> TextIO:
+    """Abre un archivo de salida, o la salida estándar si es '-' o None"""
+    if not filename or filename == '-':
+        return sys.stdout
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def load_into(service: UserService, filename: str, resumable: bool = False) -> None:
+    """
+    Carga un archivo en el servicio según su formato
+
+    Con resumable, los archivos JSON y NDJSON se cargan con puntos de
+    control (ver UserService.load_resumable).
+
+    Raises:
+        BatchError: Si el archivo no se pudo cargar
+    """
+    fmt = detect_format(filename)
+    if resumable and fmt in ('json', 'ndjson') and filename != '-':
+        success, message = service.load_resumable(filename)
+    elif fmt == 'json':
+        success, message = service.load_from_json(filename)
+    elif fmt == 'txt':
+        success, message = service.load_from_txt(filename)
+    elif filename != '-':
+        loader = service.load_from_csv if fmt == 'csv' else service.load_from_ndjson
+        success, message = loader(filename)
+    else:
+        success, message = import_stream(service, iter_records(sys.stdin, fmt))
+    if not success:
+        raise BatchError(message)
+
+
+def save_from(service: UserService, filename: str) -> None:
+    """
+    Guarda el servicio en un archivo según su formato
+
+    Raises:
+        BatchError: Si el archivo no se pudo guardar
+    """
+    fmt = detect_format(filename)
+    if fmt == 'json':
+        success, message = service.save_to_json(filename)
+    elif fmt == 'txt':
+        success, message = service.export_to_txt(filename)
+    elif filename != '-':
+        saver = service.save_to_csv if fmt == 'csv' else service.save_to_ndjson
+        success, message = saver(filename)
+    else:
+        write_records(sys.stdout, (user.to_dict() for user in service.list_users()), fmt)
+        success, message = True, "Usuarios escritos en la salida estándar"
+    if not success:
+        raise BatchError(message)
+
+
+def import_stream(service: UserService, records: Iterable[Dict[str, Any]]):
+    """
+    Importa registros por lotes para acotar la memoria usada
+
+    Los IDs nuevos de un lote se reservan por encima de los IDs explícitos
+    vistos hasta entonces; para que no choquen con IDs explícitos de lotes
+    posteriores, llamar antes a service.observe_id con el mayor (ver cmd_import).
+
+    Returns:
+        Tuple[bool, str]: Resultado del último lote con error, o un resumen
+    """
+    records = iter(records)
+    messages = []
+    while True:
+        batch = list(islice(records, IMPORT_BATCH_SIZE))
+        if not batch:
+            break
+        success, message = service.import_users(batch)
+        if not success:
+            return False, message
+        messages.append(message)
+    return True, '; '.join(messages) or "No había registros para importar"
+
+
+def iter_arguments(values: List[str]) -> Iterator[str]:
+    """Devuelve los argumentos dados o, si no hay, las líneas de la entrada estándar"""
+    if values:
+        yield from values
+        return
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def open_store(args) -> UserService:
+    """
+    Crea el servicio y carga el almacén indicado con --store si existe
+
+    Raises:
+        BatchError: Si el almacén existe pero no se pudo cargar
+    """
+    service = UserService()
+    if os.path.exists(args.store):
+        load_into(service, args.store, resumable=args.resumable)
+    return service
+
+
+def cmd_import(args) -> int:
+    """Importa registros NDJSON/CSV al almacén"""
+    service = open_store(args)
+    for filename in args.files or ['-']:
+        fmt = args.format or detect_format(filename)
+        stream = open_input(filename)
+        try:
+            if stream is not sys.stdin:
+                # Primera pasada: el mayor ID explícito, para que los IDs nuevos no lo alcancen
+                highest = max((record['id'] for record in iter_records(stream, fmt) if 'id' in record), default=0)
+                service.observe_id(highest)
+                stream.seek(0)
+            success, message = import_stream(service, iter_records(stream, fmt))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        emit({'file': filename, 'ok': success, 'message': message})
+        if not success:
+            return 1
+    save_from(service, args.store)
+    return 0
+
+
+def cmd_export(args) -> int:
+    """Exporta el almacén como NDJSON/CSV"""
+    service = open_store(args)
+    fmt = args.format or detect_format(args.output)
+    stream = open_output(args.output)
+    try:
+        write_records(stream, (user.to_dict() for user in service.list_users()), fmt)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+def cmd_search(args) -> int:
+    """Busca por nombre cada término y emite una línea por coincidencia"""
+    service = open_store(args)
+    for term in iter_arguments(args.terms):
+        if args.fuzzy:
+            users = service.search_users_fuzzy(term, limit=args.limit)
+        else:
+            users = service.search_users_by_name(term)[:args.limit]
+        for user in users:
+            emit({'query': term, 'id': user.id, 'name': user.name, 'email': user.email})
+    return 0
+
+
+def cmd_delete(args) -> int:
+    """Elimina usuarios por ID (búsqueda por el índice de IDs) y emite una línea por ID; guarda una sola vez al final"""
+    service = open_store(args)
+    for value in iter_arguments(args.ids):
+        try:
+            success, message = service.delete_user(int(value))
+        except ValueError:
+            success, message = False, f"ID inválido: '{value}'"
+        emit({'id': value, 'ok': success, 'message': message})
+    if service.has_unsaved_changes():
+        save_from(service, args.store)
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """Emite las estadísticas agregadas como JSON"""
+    service = open_store(args)
+    emit(service.stats(top_domains=args.top))
+    return 0
+
+
+def cmd_memory(args) -> int:
+    """Emite el reporte de memoria del almacén, con las asignaciones de la carga y el guardado si se piden"""
+    service = UserService()
+    traces = {}
+    if os.path.exists(args.store):
+        if args.trace:
+            _, traces['load'] = trace_allocations(load_into, service, args.store, top=args.top)
+        else:
+            load_into(service, args.store)
+    if args.save:
+        _, traces['save'] = trace_allocations(save_from, service, args.save, top=args.top)
+    report = service.memory_report()
+    report.update(traces)
+    emit(report)
+    return 0
+
+
+def cmd_verify(args) -> int:
+    """Verifica la suma y el conteo de archivos JSON/TXT sin cargar los usuarios"""
+    failed = False
+    for filename in args.files or [args.store]:
+        fmt = detect_format(filename)
+        if fmt not in ('json', 'txt'):
+            raise BatchError(f"Solo se pueden verificar archivos json o txt: '{filename}'")
+        result = verify_file(filename, fmt)
+        emit({'file': filename, **result.to_dict()})
+        if not result.ok or (args.strict and result.status is IntegrityStatus.MISSING):
+            failed = True
+    return 1 if failed else 0
+
+
+def cmd_migrate(args) -> int:
+    """Actualiza un archivo JSON/NDJSON al esquema actual sin cargarlo en el servicio"""
+    target = args.target or args.source
+    result = upgrade_file(args.source, target, workers=args.workers)
+    emit({'source': args.source, 'target': target, 'ok': True, **result})
+    return 0
+
+
+def cmd_convert(args) -> int:
+    """Convierte un archivo de usuarios entre formatos"""
+    service = UserService()
+    load_into(service, args.source)
+    save_from(service, args.target)
+    if args.target != '-':
+        emit({'source': args.source, 'target': args.target, 'ok': True,
+              'count': len(service.list_users())})
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el analizador de argumentos"""
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description="Operaciones por lotes sobre el almacén de usuarios. "
+                    "Sin argumentos se inicia el menú interactivo."
+    )
+    parser.add_argument('--store', default=DEFAULT_DATA_FILE,
+                        help=f"Archivo del almacén (json, txt, ndjson o csv). Por defecto {DEFAULT_DATA_FILE}")
+    parser.add_argument('--resumable', action='store_true',
+                        help="Carga el almacén JSON/NDJSON con puntos de control; si se interrumpe, "
+                             "la siguiente ejecución retoma desde el último")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    formats = ['ndjson', 'csv']
+
+    import_parser = subparsers.add_parser('import', help="Importa registros NDJSON/CSV")
+    import_parser.add_argument('files', nargs='*', help="Archivos de entrada ('-' o nada = stdin)")
+    import_parser.add_argument('--format', choices=formats, help="Formato de entrada")
+    import_parser.set_defaults(handler=cmd_import)
+
+    export_parser = subparsers.add_parser('export', help="Exporta el almacén")
+    export_parser.add_argument('--output', '-o', help="Archivo de salida (por defecto stdout)")
+    export_parser.add_argument('--format', choices=formats, help="Formato de salida")
+    export_parser.set_defaults(handler=cmd_export)
+
+    search_parser = subparsers.add_parser('search', help="Busca usuarios por nombre")
+    search_parser.add_argument('terms', nargs='*', help="Términos (si no hay, uno por línea en stdin)")
+    search_parser.add_argument('--fuzzy', action='store_true', help="Búsqueda aproximada")
+    search_parser.add_argument('--limit', type=int, default=10, help="Resultados por término")
+    search_parser.set_defaults(handler=cmd_search)
+
+    delete_parser = subparsers.add_parser('delete', help="Elimina usuarios por ID")
+    delete_parser.add_argument('ids', nargs='*', help="IDs (si no hay, uno por línea en stdin)")
+    delete_parser.set_defaults(handler=cmd_delete)
+
+    stats_parser = subparsers.add_parser('stats', help="Muestra estadísticas agregadas")
+    stats_parser.add_argument('--top', type=int, default=None, help="Limita los dominios mostrados")
+    stats_parser.set_defaults(handler=cmd_stats)
+
+    memory_parser = subparsers.add_parser('memory', help="Reporte de memoria del almacén cargado")
+    memory_parser.add_argument('--trace', action='store_true',
+                               help="Mide con tracemalloc las asignaciones de la carga")
+    memory_parser.add_argument('--save', metavar='ARCHIVO',
+                               help="Guarda el almacén en ARCHIVO midiendo sus asignaciones")
+    memory_parser.add_argument('--top', type=int, default=10, help="Líneas de código con más asignaciones")
+    memory_parser.set_defaults(handler=cmd_memory)
+
+    verify_parser = subparsers.add_parser('verify', help="Verifica la integridad de archivos guardados")
+    verify_parser.add_argument('files', nargs='*', help="Archivos json o txt (por defecto el almacén)")
+    verify_parser.add_argument('--strict', action='store_true',
+                               help="Falla también si un archivo no tiene suma de verificación")
+    verify_parser.set_defaults(handler=cmd_verify)
+
+    migrate_parser = subparsers.add_parser('migrate', help="Actualiza un archivo al esquema actual")
+    migrate_parser.add_argument('source', help="Archivo de origen (json, ndjson o jsonl)")
+    migrate_parser.add_argument('target', nargs='?', help="Archivo de destino (por defecto el origen)")
+    migrate_parser.add_argument('--workers', type=int, default=1, help="Procesos para migrar en paralelo")
+    migrate_parser.set_defaults(handler=cmd_migrate)
+
+    convert_parser = subparsers.add_parser('convert', help="Convierte entre formatos")
+    convert_parser.add_argument('source', help="Archivo de origen")
+    convert_parser.add_argument('target', help="Archivo de destino ('-' = stdout en NDJSON)")
+    convert_parser.set_defaults(handler=cmd_convert)
+
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Ejecuta un subcomando por lotes
+
+    Args:
+        argv (List[str], optional): Argumentos (por defecto sys.argv[1:])
+
+    Returns:
+        int: Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (BatchError, OSError, ValueError, csv.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        sys.stdout.flush()
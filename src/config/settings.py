@@ -3,4 +3,42 @@ from decouple import config
 # Configuración de la aplicación
 APP_NAME = config('APP_NAME', default='User Management System')
 DEBUG = config('DEBUG', default=False, cast=bool)
-DEFAULT_DATA_FILE = config('DEFAULT_DATA_FILE', default='data/users.json')
\ No newline at end of file
+# Almacén que usan por defecto el menú interactivo y el modo por lotes
+DEFAULT_DATA_FILE = config('DEFAULT_DATA_FILE', default='users.json')
+
+# Filtro de Bloom para descartar emails nuevos sin consultar el almacenamiento
+EMAIL_FILTER_ENABLED = config('EMAIL_FILTER_ENABLED', default=False, cast=bool)
+EMAIL_FILTER_CAPACITY = config('EMAIL_FILTER_CAPACITY', default=100000, cast=int)
+EMAIL_FILTER_FP_RATE = config('EMAIL_FILTER_FP_RATE', default=0.01, cast=float)
+
+# Límite de intentos de autenticación (cubetas de tokens por cuenta y por origen)
+AUTH_ACCOUNT_BURST = config('AUTH_ACCOUNT_BURST', default=5, cast=float)
+AUTH_ACCOUNT_REFILL_PER_SECOND = config('AUTH_ACCOUNT_REFILL_PER_SECOND', default=0.1, cast=float)
+AUTH_SOURCE_BURST = config('AUTH_SOURCE_BURST', default=50, cast=float)
+AUTH_SOURCE_REFILL_PER_SECOND = config('AUTH_SOURCE_REFILL_PER_SECOND', default=5, cast=float)
+
+# Caché de lecturas (get_user_by_id y búsquedas por nombre)
+CACHE_ENABLED = config('CACHE_ENABLED', default=False, cast=bool)
+CACHE_MAX_ENTRIES = config('CACHE_MAX_ENTRIES', default=1024, cast=int)
+CACHE_TTL_SECONDS = config('CACHE_TTL_SECONDS', default=60, cast=float)
+CACHE_MAX_USERS = config('CACHE_MAX_USERS', default=100000, cast=int)
+
+# Eventos retenidos en el flujo de cambios (UserService.events)
+EVENTS_BUFFER_SIZE = config('EVENTS_BUFFER_SIZE', default=10000, cast=int)
+
+# E/S de archivos asíncrona (hilos del pool dedicado y tamaño de bloque en bytes)
+FILE_IO_MAX_WORKERS = config('FILE_IO_MAX_WORKERS', default=4, cast=int)
+FILE_IO_CHUNK_SIZE = config('FILE_IO_CHUNK_SIZE', default=1048576, cast=int)
+
+# Suma de verificación de los archivos JSON/TXT guardados ('crc32' o 'blake2b')
+INTEGRITY_ALGORITHM = config('INTEGRITY_ALGORITHM', default='crc32')
+
+# Registros entre puntos de control de las importaciones reanudables
+IMPORT_CHECKPOINT_RECORDS = config('IMPORT_CHECKPOINT_RECORDS', default=10000, cast=int)
+
+# GC durante las cargas de archivos: 'off', 'pause' (desactivado) o 'freeze' (desactivado + gc.freeze al terminar,
+# que congela todo el montículo; main.py lo usa solo en la carga inicial)
+BULK_LOAD_GC_MODE = config('BULK_LOAD_GC_MODE', default='pause')
+
+# Snapshot (pickle) del estado cargado junto a users.json para arrancar sin volver a leerlo
+SNAPSHOT_CACHE_ENABLED = config('SNAPSHOT_CACHE_ENABLED', default=True, cast=bool)
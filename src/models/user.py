@@ -4,14 +4,36 @@ Representa un usuario en el sistema
 """
 
 import hashlib
+import hmac
 from datetime import datetime
+from src.utils.id_allocator import IdAllocator
+
+# Asignador usado por los usuarios creados fuera de un UserService
+_default_allocator = IdAllocator()
+
+
+def to_local_naive(value):
+    """
+    Normaliza una fecha a hora local sin zona horaria
+    
+    Las fechas de creación se comparan entre sí (índice por fecha) y Python
+    no compara fechas con y sin zona, así que las que traen zona se
+    convierten a la hora local, la misma que usa datetime.now().
+    
+    Args:
+        value (datetime): Fecha con o sin zona horaria
+        
+    Returns:
+        datetime: Fecha sin zona horaria
+    """
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
 
 
 class User:
     """Clase que representa un usuario"""
     
-    _next_id = 1  # Contador para generar IDs únicos
-    
     def __init__(self, name, email, password, user_id=None, created_at=None):
         """
         Inicializa un usuario
@@ -20,16 +42,12 @@ class User:
             name (str): Nombre del usuario
             email (str): Email del usuario
             password (str): Contraseña del usuario
-            user_id (int, optional): ID del usuario. Si no se proporciona, se genera automáticamente
-            created_at (datetime, optional): Fecha de creación. Si no se proporciona, se usa la fecha actual
+            user_id (int, optional): ID del usuario. Si no se proporciona, se genera con el
+                asignador por defecto (UserService siempre lo proporciona)
+            created_at (datetime, optional): Fecha de creación. Si no se proporciona, se usa la
+                fecha actual; si trae zona horaria se convierte a la hora local (ver to_local_naive)
         """
-        if user_id is None:
-            self.id = User._next_id
-            User._next_id += 1
-        else:
-            self.id = user_id
-            if user_id >= User._next_id:
-                User._next_id = user_id + 1
+        self.id = _default_allocator.allocate() if user_id is None else user_id
         
         self.name = name
         self.email = email
@@ -39,11 +57,11 @@ class User:
             self.created_at = datetime.now()
         elif isinstance(created_at, str):
             try:
-                self.created_at = datetime.fromisoformat(created_at)
+                self.created_at = to_local_naive(datetime.fromisoformat(created_at))
             except ValueError:
                 self.created_at = datetime.now()
         else:
-            self.created_at = created_at
+            self.created_at = to_local_naive(created_at)
     
     @staticmethod
     def _hash_password(password):
@@ -68,7 +86,9 @@ class User:
         Returns:
             bool: True si la contraseña es correcta
         """
-        return self.password_hash == self._hash_password(password)
+        # Comparación en tiempo constante para no filtrar información por tiempos; sobre
+        # bytes, porque compare_digest rechaza str con caracteres no ASCII (hash dañado)
+        return hmac.compare_digest(self.password_hash.encode(), self._hash_password(password).encode())
     
     def to_dict(self):
         """
@@ -88,7 +108,12 @@ class User:
     @classmethod
     def from_dict(cls, data):
         """
-        Crea un usuario desde un diccionario
+        Crea un usuario desde un diccionario en el esquema actual
+        
+        Solo admite el formato de to_dict (password_hash y created_at en ISO).
+        Los registros de versiones anteriores se actualizan antes con
+        src.services.migrations. Un created_at con zona horaria se convierte
+        a la hora local (ver to_local_naive).
         
         Args:
             data (dict): Diccionario con los datos del usuario
@@ -96,34 +121,38 @@ class User:
         Returns:
             User: Instancia del usuario
         """
-        # Manejo para compatibilidad con diferentes formatos
-        if 'password_hash' in data:
-            # Si ya viene con password_hash (formato original)
-            user = cls.__new__(cls)
-            user.id = data['id']
-            user.name = data['name']
-            user.email = data['email']
-            user.password_hash = data['password_hash']
-            
-            if isinstance(data['created_at'], str):
-                user.created_at = datetime.fromisoformat(data['created_at'])
-            else:
-                user.created_at = data['created_at']
-            
-        else:
-            # Si viene con password en texto plano (formato nuevo)
-            user = cls(
-                name=data['name'],
-                email=data['email'],
-                password=data['password'],  # Será hasheado en __init__
-                user_id=data.get('id'),
-                created_at=data.get('created_at')
-            )
-        
-        # Actualizar el contador de IDs
-        if user.id >= cls._next_id:
-            cls._next_id = user.id + 1
+        user = cls.__new__(cls)
+        user.id = data['id']
+        user.name = data['name']
+        user.email = data['email']
+        user.password_hash = data['password_hash']
+        created = datetime.fromisoformat(data['created_at'])
+        # Comprobación en línea: esta ruta se ejecuta por cada usuario de una carga
+        user.created_at = created if created.tzinfo is None else to_local_naive(created)
+        return user
+    
+    @classmethod
+    def from_fields(cls, user_id, name, email, password_hash, created_at):
+        """
+        Crea un usuario desde sus campos ya persistidos, sin diccionario intermedio
         
+        Args:
+            user_id (int): ID del usuario
+            name (str): Nombre del usuario
+            email (str): Email del usuario
+            password_hash (str): Hash de la contraseña
+            created_at (str): Fecha de creación en ISO (con zona, se convierte a la hora local)
+            
+        Returns:
+            User: Instancia del usuario
+        """
+        user = cls.__new__(cls)
+        user.id = user_id
+        user.name = name
+        user.email = email
+        user.password_hash = password_hash
+        created = datetime.fromisoformat(created_at)
+        user.created_at = created if created.tzinfo is None else to_local_naive(created)
         return user
     
     def __str__(self):
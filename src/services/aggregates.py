@@ -0,0 +1,129 @@
+"""
+Agregados de Usuarios
+Contadores mantenidos incrementalmente por dominio de email y fecha de registro
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+from src.models.user import User
+
+
+def email_domain(email: str) -> str:
+    """
+    Obtiene el dominio normalizado de un email
+
+    Args:
+        email (str): Email del usuario
+
+    Returns:
+        str: Dominio en minúsculas ('' si el email no tiene '@')
+    """
+    return email.rpartition('@')[2].strip().lower() if '@' in email else ''
+
+
+class UserAggregates:
+    """
+    Contadores por dominio de email, día y mes de registro
+
+    Cada alta o baja actualiza los contadores en O(1); una carga los
+    reconstruye en una sola pasada. Así las estadísticas no necesitan
+    recorrer todos los usuarios.
+    """
+
+    def __init__(self):
+        """Inicializa los contadores vacíos"""
+        self._by_domain: Dict[str, Dict[int, User]] = {}
+        self._by_day: Counter = Counter()
+        self._by_month: Counter = Counter()
+        self._total = 0
+
+    def add(self, user: User) -> None:
+        """
+        Suma un usuario a los contadores
+
+        Args:
+            user (User): Usuario agregado
+        """
+        self._by_domain.setdefault(email_domain(user.email), {})[user.id] = user
+        day = user.created_at.date().isoformat()
+        self._by_day[day] += 1
+        self._by_month[day[:7]] += 1
+        self._total += 1
+
+    def remove(self, user: User) -> None:
+        """
+        Resta un usuario de los contadores
+
+        Args:
+            user (User): Usuario eliminado
+        """
+        domain = email_domain(user.email)
+        users = self._by_domain.get(domain)
+        if users is None or users.pop(user.id, None) is None:
+            return
+        if not users:
+            del self._by_domain[domain]
+
+        day = user.created_at.date().isoformat()
+        self._decrement(self._by_day, day)
+        self._decrement(self._by_month, day[:7])
+        self._total -= 1
+
+    def rebuild(self, users: Iterable[User]) -> None:
+        """
+        Reconstruye todos los contadores en una sola pasada
+
+        Args:
+            users (Iterable[User]): Usuarios cargados
+        """
+        self.clear()
+        for user in users:
+            self.add(user)
+
+    def clear(self) -> None:
+        """Vacía los contadores"""
+        self._by_domain.clear()
+        self._by_day.clear()
+        self._by_month.clear()
+        self._total = 0
+
+    def users_by_domain(self, domain: str) -> List[User]:
+        """
+        Obtiene los usuarios de un dominio de email
+
+        Args:
+            domain (str): Dominio (sin distinguir mayúsculas, con o sin '@')
+
+        Returns:
+            List[User]: Usuarios del dominio en orden de alta
+        """
+        return list(self._by_domain.get(domain.lstrip('@').strip().lower(), {}).values())
+
+    def stats(self, top_domains: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Devuelve un resumen de los contadores
+
+        Args:
+            top_domains (int, optional): Limita los dominios a los N más frecuentes
+
+        Returns:
+            Dict[str, Any]: total_users, domains, signups_by_day y signups_by_month
+        """
+        domains = sorted(((domain, len(users)) for domain, users in self._by_domain.items()),
+                         key=lambda item: (-item[1], item[0]))
+        if top_domains is not None:
+            domains = domains[:top_domains]
+
+        return {
+            'total_users': self._total,
+            'domains': dict(domains),
+            'signups_by_day': dict(sorted(self._by_day.items())),
+            'signups_by_month': dict(sorted(self._by_month.items())),
+        }
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str) -> None:
+        """Resta uno a un contador y elimina la clave si llega a cero"""
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
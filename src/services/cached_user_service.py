@@ -0,0 +1,172 @@
+"""
+Servicio de Usuarios con Caché
+Capa de lectura con caché LRU/TTL sobre UserService
+"""
+
+from typing import Any, Dict, List, Optional
+from src.config.settings import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_USERS
+from src.models.user import User
+from src.services.events import EventType, UserEvent
+from src.services.user_service import UserService
+from src.utils.cache import LRUCache, MISSING
+from src.utils.text_search import DEFAULT_MAX_CANDIDATES, normalize_text
+
+
+def _user_weight(value: Any) -> int:
+    """Peso de un resultado: cantidad de usuarios que referencia"""
+    return len(value) if isinstance(value, list) else 1
+
+
+class CachedUserService:
+    """
+    Envoltorio de UserService que cachea lecturas repetidas
+
+    Cachea get_user_by_id (también los resultados None), search_users_by_name
+    y search_users_fuzzy. La invalidación sigue el flujo de cambios del
+    servicio (service.events): cada alta o baja invalida solo las entradas
+    afectadas y cada carga vacía la caché, sin importar si la escritura pasó
+    por el envoltorio o se hizo directamente sobre el servicio. El resto de
+    métodos se delegan tal cual en el servicio.
+    """
+
+    def __init__(self, service: Optional[UserService] = None,
+                 max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl: Optional[float] = CACHE_TTL_SECONDS,
+                 max_users: Optional[int] = CACHE_MAX_USERS):
+        """
+        Inicializa la caché sobre un servicio
+
+        Args:
+            service (UserService, optional): Servicio envuelto (por defecto uno nuevo)
+            max_entries (int): Entradas máximas en caché
+            ttl (float, optional): Segundos de vida de cada entrada
+            max_users (int, optional): Total de usuarios referenciados por los resultados cacheados
+        """
+        self._service = service if service is not None else UserService()
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl, max_weight=max_users,
+                               weigher=_user_weight)
+        self._unsubscribe = self._service.events.subscribe(self._on_event)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._service, name)
+
+    """
+    Lecturas cacheadas
+    """
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """
+        Obtiene un usuario por su ID, usando la caché
+
+        Args:
+            user_id (int): ID del usuario
+
+        Returns:
+            Optional[User]: Usuario si existe, None en caso contrario
+        """
+        key = ('id', user_id)
+        user = self._cache.get(key)
+        if user is MISSING:
+            user = self._service.get_user_by_id(user_id)
+            self._cache.put(key, user)
+        return user
+
+    def search_users_by_name(self, search_term: str) -> List[User]:
+        """
+        Busca usuarios por nombre, usando la caché
+
+        Args:
+            search_term (str): Término de búsqueda
+
+        Returns:
+            List[User]: Lista de usuarios que coinciden con la búsqueda
+        """
+        key = ('name', search_term.lower())
+        users = self._cache.get(key)
+        if users is MISSING:
+            users = self._service.search_users_by_name(search_term)
+            self._cache.put(key, users)
+        return list(users)
+
+    def search_users_fuzzy(self, search_term: str, max_distance: Optional[int] = None,
+                           limit: int = 10,
+                           max_candidates: int = DEFAULT_MAX_CANDIDATES) -> List[User]:
+        """
+        Búsqueda aproximada por nombre, usando la caché
+
+        Args:
+            search_term (str): Término de búsqueda
+            max_distance (int, optional): Ediciones permitidas
+            limit (int): Número máximo de resultados
+            max_candidates (int): Máximo de palabras distintas a verificar por palabra de la búsqueda
+
+        Returns:
+            List[User]: Usuarios ordenados de mejor a peor coincidencia
+        """
+        key = ('fuzzy', normalize_text(search_term), max_distance, limit, max_candidates)
+        users = self._cache.get(key)
+        if users is MISSING:
+            users = self._service.search_users_fuzzy(search_term, max_distance, limit, max_candidates)
+            self._cache.put(key, users)
+        return list(users)
+
+    """
+    Invalidación por eventos
+    """
+
+    def _on_event(self, event: UserEvent) -> None:
+        """
+        Invalida las entradas que un cambio del servicio deja obsoletas
+
+        Args:
+            event (UserEvent): Evento publicado por el servicio envuelto
+        """
+        user_id = event.user_id
+        if event.type is EventType.REGISTERED:
+            lowered_name = event.data.get('name', '').lower()
+            # Entradas afectadas: el ID nuevo (pudo cachearse como None), las
+            # búsquedas exactas que ahora lo incluyen y las aproximadas (top-k)
+            self._cache.invalidate_where(
+                lambda key, _: (key == ('id', user_id)
+                                or (key[0] == 'name' and key[1] in lowered_name)
+                                or key[0] == 'fuzzy'))
+        elif event.type is EventType.DELETED:
+            self._cache.invalidate_where(
+                lambda key, value: (key == ('id', user_id)
+                                    or (isinstance(value, list)
+                                        and any(item.id == user_id for item in value))))
+        else:
+            self._cache.clear()
+
+    """
+    Administración de la caché
+    """
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los contadores de la caché
+
+        Returns:
+            Dict[str, Any]: hits, misses, evictions, expirations, invalidations,
+                entries, weight y hit_rate
+        """
+        return self._cache.stats()
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Mide la memoria del servicio envuelto, incluida la caché
+
+        Returns:
+            Dict[str, Any]: Reporte de UserService.memory_report con la
+                entrada 'cache' en indexes
+        """
+        return self._service.memory_report(extra={'cache': self._cache})
+
+    def clear_cache(self) -> None:
+        """Vacía la caché"""
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Deja de seguir los eventos del servicio y vacía la caché"""
+        self._unsubscribe()
+        self._cache.clear()
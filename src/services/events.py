@@ -0,0 +1,312 @@
+"""
+Flujo de Cambios
+Eventos tipados con número de secuencia para seguir las mutaciones de UserService
+"""
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class EventType(Enum):
+    """Tipos de cambio publicados por UserService"""
+    REGISTERED = 'registered'  # Alta de un usuario (registro o importación)
+    DELETED = 'deleted'        # Baja de un usuario
+    LOADED = 'loaded'          # Todos los usuarios fueron reemplazados por una carga
+
+
+@dataclass(frozen=True)
+class UserEvent:
+    """
+    Cambio en el conjunto de usuarios
+
+    Attributes:
+        sequence (int): Número de secuencia, consecutivo y creciente desde 1
+        type (EventType): Tipo de cambio
+        user_id (int, optional): Usuario afectado (None en LOADED)
+        data (Dict[str, Any]): Datos del cambio: el usuario completo (to_dict) en
+            REGISTERED; 'source' y 'count' en LOADED
+        timestamp (datetime): Momento en que se publicó
+    """
+    sequence: int
+    type: EventType
+    user_id: Optional[int] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte el evento a un diccionario serializable
+
+        Returns:
+            Dict[str, Any]: Representación del evento
+        """
+        return {
+            'sequence': self.sequence,
+            'type': self.type.value,
+            'user_id': self.user_id,
+            'data': self.data,
+            'timestamp': self.timestamp.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UserEvent':
+        """
+        Crea un evento desde un diccionario generado con to_dict
+
+        Args:
+            data (Dict[str, Any]): Representación del evento
+
+        Returns:
+            UserEvent: Evento reconstruido
+        """
+        return cls(
+            sequence=data['sequence'],
+            type=EventType(data['type']),
+            user_id=data.get('user_id'),
+            data=data.get('data') or {},
+            timestamp=datetime.fromisoformat(data['timestamp'])
+        )
+
+
+class EventGapError(Exception):
+    """El suscriptor pidió eventos que ya salieron del búfer y debe resincronizarse"""
+    pass
+
+
+class ChangeFeed:
+    """
+    Búfer circular de eventos con suscriptores síncronos y asíncronos
+
+    Guarda los últimos `capacity` eventos. Los suscriptores síncronos se
+    llaman en el momento de publicar; los asíncronos leen a su propio ritmo
+    desde una posición (reanudable) sin bloquear nunca al publicador. Si un
+    lector se retrasa más que el tamaño del búfer recibe EventGapError y
+    debe resincronizarse desde una copia completa (un evento LOADED o un
+    snapshot).
+
+    No hay colas por suscriptor con contrapresión: el publicador es el
+    servicio y no debe detenerse por un lector lento. La única espera es la
+    de los suscriptores síncronos, que se ejecutan en el hilo que publica; el
+    búfer circular acota la memoria y EventGapError reemplaza a la espera.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Inicializa el flujo
+
+        Args:
+            capacity (int): Eventos retenidos en el búfer circular
+        """
+        self.capacity = capacity
+        self._events: Deque[UserEvent] = deque(maxlen=capacity)
+        self._last_sequence = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[UserEvent], None]] = []
+        self._async_subscriptions: List['AsyncSubscription'] = []
+        self.callback_errors = 0
+
+    @property
+    def last_sequence(self) -> int:
+        """int: Secuencia del último evento publicado (0 si no hay ninguno)"""
+        return self._last_sequence
+
+    @property
+    def first_sequence(self) -> int:
+        """int: Secuencia del evento más antiguo retenido (last_sequence + 1 si está vacío)"""
+        with self._lock:
+            return self._events[0].sequence if self._events else self._last_sequence + 1
+
+    def publish(self, event_type: EventType, user_id: Optional[int] = None,
+                data: Optional[Dict[str, Any]] = None) -> UserEvent:
+        """
+        Publica un evento y notifica a los suscriptores
+
+        Args:
+            event_type (EventType): Tipo de cambio
+            user_id (int, optional): Usuario afectado
+            data (Dict[str, Any], optional): Datos del cambio
+
+        Returns:
+            UserEvent: Evento publicado
+        """
+        with self._lock:
+            self._last_sequence += 1
+            event = UserEvent(self._last_sequence, event_type, user_id, data or {})
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+            async_subscriptions = list(self._async_subscriptions)
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                # Un suscriptor con errores no debe romper la operación del servicio
+                self.callback_errors += 1
+        for subscription in async_subscriptions:
+            subscription._notify()
+        return event
+
+    def read_since(self, sequence: int, limit: Optional[int] = None) -> List[UserEvent]:
+        """
+        Obtiene los eventos posteriores a una secuencia
+
+        Args:
+            sequence (int): Última secuencia ya procesada (0 = desde el principio)
+            limit (int, optional): Máximo de eventos devueltos
+
+        Returns:
+            List[UserEvent]: Eventos con secuencia > sequence, en orden
+
+        Raises:
+            EventGapError: Si alguno de los eventos pedidos ya no está en el búfer
+        """
+        with self._lock:
+            return self._read_since_locked(sequence, limit)
+
+    def subscribe(self, callback: Callable[[UserEvent], None],
+                  from_sequence: Optional[int] = None) -> Callable[[], None]:
+        """
+        Registra un suscriptor síncrono
+
+        Args:
+            callback (Callable[[UserEvent], None]): Función llamada con cada evento
+            from_sequence (int, optional): Si se indica, primero se le entregan los
+                eventos retenidos posteriores a esa secuencia
+
+        La repetición y el registro ocurren bajo el cerrojo del flujo: ningún
+        evento se publica entre ambos, así que el suscriptor recibe cada
+        secuencia una vez y en orden. Por eso, durante la repetición el
+        callback no debe publicar en este mismo flujo.
+
+        Returns:
+            Callable[[], None]: Función que cancela la suscripción
+
+        Raises:
+            EventGapError: Si from_sequence ya salió del búfer (no se registra)
+        """
+        with self._lock:
+            if from_sequence is not None:
+                for event in self._read_since_locked(from_sequence):
+                    callback(event)
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def subscribe_async(self, from_sequence: Optional[int] = None,
+                        batch_size: int = 100) -> 'AsyncSubscription':
+        """
+        Crea un suscriptor asíncrono (se consume con "async for")
+
+        Debe llamarse desde el bucle de eventos que lo va a consumir.
+
+        Args:
+            from_sequence (int, optional): Última secuencia ya procesada; por
+                defecto solo recibe eventos nuevos
+            batch_size (int): Eventos leídos del búfer por vez
+
+        Returns:
+            AsyncSubscription: Suscripción asíncrona
+        """
+        start = self._last_sequence if from_sequence is None else from_sequence
+        subscription = AsyncSubscription(self, start, batch_size, asyncio.get_running_loop())
+        with self._lock:
+            self._async_subscriptions.append(subscription)
+        return subscription
+
+    def _read_since_locked(self, sequence: int, limit: Optional[int] = None) -> List[UserEvent]:
+        """read_since con el cerrojo ya tomado"""
+        first = self._events[0].sequence if self._events else self._last_sequence + 1
+        if sequence + 1 < first:
+            raise EventGapError(
+                f"Los eventos desde {sequence + 1} ya no están disponibles (el más antiguo es {first})")
+        start = max(0, sequence + 1 - first)
+        stop = None if limit is None else start + limit
+        return list(islice(self._events, start, stop))
+
+    def _remove_async(self, subscription: 'AsyncSubscription') -> None:
+        """Quita una suscripción asíncrona"""
+        with self._lock:
+            if subscription in self._async_subscriptions:
+                self._async_subscriptions.remove(subscription)
+
+
+class AsyncSubscription:
+    """
+    Lector asíncrono del flujo de cambios
+
+    Mantiene su propia posición (sequence) y lee del búfer circular cuando
+    hay eventos nuevos, así que el consumidor marca el ritmo y el publicador
+    nunca espera. Se puede reanudar creando otra suscripción con
+    from_sequence=subscription.sequence.
+    """
+
+    def __init__(self, feed: ChangeFeed, sequence: int, batch_size: int,
+                 loop: asyncio.AbstractEventLoop):
+        self._feed = feed
+        self.sequence = sequence
+        self._batch_size = batch_size
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._pending: Deque[UserEvent] = deque()
+        self._closed = False
+
+    def _notify(self) -> None:
+        """Despierta al consumidor (se puede llamar desde cualquier hilo)"""
+        if self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def __aiter__(self) -> 'AsyncSubscription':
+        return self
+
+    async def __anext__(self) -> UserEvent:
+        while not self._pending:
+            if self._closed:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            # Puede lanzar EventGapError si el consumidor se retrasó demasiado
+            self._pending.extend(self._feed.read_since(self.sequence, self._batch_size))
+            if not self._pending:
+                await self._wakeup.wait()
+
+        event = self._pending.popleft()
+        self.sequence = event.sequence
+        return event
+
+    async def get(self, timeout: Optional[float] = None) -> UserEvent:
+        """
+        Espera el siguiente evento
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera
+
+        Returns:
+            UserEvent: Siguiente evento
+
+        Raises:
+            asyncio.TimeoutError: Si no llega ningún evento a tiempo
+        """
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    def close(self) -> None:
+        """Cancela la suscripción; la iteración termina tras los eventos pendientes"""
+        self._closed = True
+        self._feed._remove_async(self)
+        self._notify()
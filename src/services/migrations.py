@@ -0,0 +1,307 @@
+"""
+Migraciones de Esquema
+Registro de pasos que actualizan registros de usuarios de una versión a la siguiente
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.models.user import User
+from src.utils.file_handler import read_binary_file, iter_ndjson_file, write_chunks_file
+from src.utils.integrity import iter_json_document, verify_bytes
+
+# Versión del esquema de los registros que entiende User.from_dict
+SCHEMA_VERSION = 2
+
+# Registros por bloque al migrar en paralelo
+MIGRATION_CHUNK_RECORDS = 5000
+
+# Paso que convierte un registro de la versión N (clave) a la N + 1
+_MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+
+def migration(from_version: int) -> Callable:
+    """
+    Decorador que registra un paso de migración
+
+    Args:
+        from_version (int): Versión que el paso convierte a from_version + 1
+
+    Returns:
+        Callable: Decorador que devuelve la función sin cambios
+    """
+    def register(step: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        if from_version in _MIGRATIONS:
+            raise ValueError(f"Ya hay una migración registrada desde la versión {from_version}")
+        _MIGRATIONS[from_version] = step
+        return step
+    return register
+
+
+@migration(1)
+def _hash_plaintext_password(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    v1 -> v2: la contraseña se guarda hasheada y created_at siempre es una fecha ISO válida
+
+    Los registros v1 podían no tener ID: quedan con id None y el cargador les
+    asigna uno cuando ya conoce el mayor ID del archivo.
+    """
+    record = dict(record)
+    record.setdefault('id', None)
+    record['password_hash'] = User._hash_password(record.pop('password'))
+    created_at = record.get('created_at')
+    try:
+        if isinstance(created_at, datetime):
+            record['created_at'] = created_at.isoformat()
+        else:
+            datetime.fromisoformat(created_at)
+    except (TypeError, ValueError):
+        record['created_at'] = datetime.now().isoformat()
+    return record
+
+
+def detect_version(record: Optional[Dict[str, Any]]) -> int:
+    """
+    Deduce la versión de un registro de un archivo sin cabecera de versión
+
+    Args:
+        record (Dict[str, Any], optional): Registro del archivo
+
+    Returns:
+        int: 1 si trae la contraseña en texto plano; si no, la versión actual
+    """
+    if record is not None and 'password_hash' not in record and 'password' in record:
+        return 1
+    return SCHEMA_VERSION
+
+
+def resolve_version(declared: Optional[Any]) -> Optional[int]:
+    """
+    Obtiene la versión que declara la cabecera de un archivo
+
+    Un archivo sin cabecera puede mezclar registros de varias versiones (por
+    ejemplo, altas nuevas agregadas a una lista antigua), así que su versión
+    no se toma del primer registro: None indica que se deduce registro a
+    registro con detect_version.
+
+    Args:
+        declared (Any, optional): Valor de schema_version en la cabecera
+
+    Returns:
+        Optional[int]: Versión del esquema, o None si el archivo no la declara
+
+    Raises:
+        ValueError: Si la versión es más nueva que la soportada
+    """
+    if declared is None:
+        return None
+    version = int(declared)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"El archivo usa el esquema {version}, más nuevo que el soportado ({SCHEMA_VERSION})")
+    return version
+
+
+def migrate_record(record: Dict[str, Any], from_version: Optional[int]) -> Dict[str, Any]:
+    """
+    Lleva un registro a la versión actual
+
+    Args:
+        record (Dict[str, Any]): Registro en la versión from_version
+        from_version (int, optional): Versión del registro (None: se deduce del registro)
+
+    Returns:
+        Dict[str, Any]: Registro en la versión actual (el mismo objeto si ya lo estaba)
+    """
+    if from_version is None:
+        from_version = detect_version(record)
+    for step in _steps(from_version):
+        record = step(record)
+    return record
+
+
+def migrate_chunk(records: List[Dict[str, Any]], from_version: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Migra un bloque de registros (unidad de trabajo de los procesos en paralelo)
+
+    Args:
+        records (List[Dict[str, Any]]): Registros en la versión from_version
+        from_version (int, optional): Versión de los registros (None: se deduce de cada uno)
+
+    Returns:
+        List[Dict[str, Any]]: Registros en la versión actual
+    """
+    if from_version is None:
+        return [migrate_record(record, None) for record in records]
+    steps = _steps(from_version)
+    migrated = []
+    for record in records:
+        for step in steps:
+            record = step(record)
+        migrated.append(record)
+    return migrated
+
+
+def migrate_records(records: Iterable[Dict[str, Any]], from_version: Optional[int],
+                    workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Migra registros como un flujo, en orden y con memoria acotada
+
+    Los registros que ya están en la versión actual pasan sin tocarse. Con
+    workers > 1 los bloques se migran en procesos separados, con a lo sumo
+    2 * workers bloques en curso. Con from_version None (archivo sin
+    cabecera) la versión se deduce de cada registro y los bloques sin
+    registros antiguos no se envían a los procesos.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Registros en la versión from_version
+        from_version (int, optional): Versión de los registros (None: se deduce de cada uno)
+        workers (int): Procesos para migrar en paralelo
+
+    Returns:
+        Iterator[Dict[str, Any]]: Registros en la versión actual
+
+    Raises:
+        ValueError: Si no hay migración registrada para alguna versión intermedia
+    """
+    if from_version is not None and not _steps(from_version):
+        return iter(records)
+    if workers > 1:
+        return _migrate_parallel(iter(records), from_version, workers)
+    return (migrate_record(record, from_version) for record in records)
+
+
+def upgrade_file(source: str, target: Optional[str] = None, workers: int = 1) -> Dict[str, Any]:
+    """
+    Reescribe un archivo JSON o NDJSON de usuarios en el esquema actual, en una pasada
+
+    No construye usuarios: los registros se leen, se migran y se escriben
+    como flujo. El destino se escribe de forma atómica y puede ser el mismo
+    archivo de origen. Si el archivo es de una versión anterior o no declara
+    su versión, una pasada previa obtiene su mayor ID y los registros sin ID
+    reciben los siguientes (y la marca de agua se actualiza).
+
+    Args:
+        source (str): Archivo de origen (.json, .ndjson o .jsonl)
+        target (str, optional): Archivo de destino (.json, .ndjson o .jsonl); por defecto el origen
+        workers (int): Procesos para migrar en paralelo
+
+    Returns:
+        Dict[str, Any]: count, from_version y to_version
+
+    Raises:
+        IOError: Si no se puede leer o escribir
+        ValueError: Si el formato no está soportado, el archivo está dañado o su esquema es más nuevo
+    """
+    target = target or source
+    target_format = file_format(target)
+    metadata: Dict[str, Any] = {'schema_version': SCHEMA_VERSION}
+    declared = None
+    if file_format(source) == 'json':
+        raw = read_binary_file(source)
+        if raw is None:
+            raise IOError(f"No se pudo leer el archivo '{source}'")
+        integrity = verify_bytes(raw, 'json')
+        if not integrity.ok:
+            raise ValueError(f"El archivo '{source}' está dañado: {integrity.message}")
+        data = json.loads(raw)
+        if isinstance(data, dict):
+            declared = data.get('schema_version')
+            if 'next_id' in data:
+                metadata['next_id'] = data['next_id']
+            data = data.get('users', [])
+        records: Iterator[Dict[str, Any]] = iter(data)
+    else:
+        records = iter_ndjson_file(source)
+
+    version = resolve_version(declared)
+    if version is None or version < SCHEMA_VERSION:
+        highest, missing = _scan_ids(iter(data) if file_format(source) == 'json' else iter_ndjson_file(source))
+        if missing:
+            start = max(int(metadata.get('next_id', 1)), highest + 1)
+            metadata['next_id'] = start + missing
+            new_ids = count(start)
+            records = (record if 'id' in record else {**record, 'id': next(new_ids)} for record in records)
+
+    counter = [0]
+    oldest = [SCHEMA_VERSION]
+
+    def counted(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            counter[0] += 1
+            if version is None:
+                oldest[0] = min(oldest[0], detect_version(record))
+            yield record
+
+    migrated = migrate_records(counted(records), version, workers)
+    if target_format == 'json':
+        chunks = iter_json_document(metadata, migrated)
+    else:
+        chunks = (f"{json.dumps(record, ensure_ascii=False)}\n".encode('utf-8') for record in migrated)
+    if not write_chunks_file(target, chunks):
+        raise IOError(f"No se pudo escribir el archivo '{target}'")
+    from_version = version if version is not None else oldest[0]
+    return {'count': counter[0], 'from_version': from_version, 'to_version': SCHEMA_VERSION}
+
+
+def file_format(filename: str) -> str:
+    """
+    Formato de un archivo de usuarios JSON o NDJSON según su extensión
+
+    Args:
+        filename (str): Nombre del archivo
+
+    Returns:
+        str: 'json' o 'ndjson'
+
+    Raises:
+        ValueError: Si la extensión no es .json, .ndjson ni .jsonl
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.json':
+        return 'json'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    raise ValueError(f"Formato no soportado: '{filename}' (use .json, .ndjson o .jsonl)")
+
+
+def _scan_ids(records: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+    """Mayor ID de los registros (0 si no hay) y cantidad de registros sin ID"""
+    highest, missing = 0, 0
+    for record in records:
+        if 'id' in record:
+            highest = max(highest, int(record['id']))
+        else:
+            missing += 1
+    return highest, missing
+
+
+def _steps(from_version: int) -> List[Callable[[Dict[str, Any]], Dict[str, Any]]]:
+    """Pasos necesarios para llegar a la versión actual desde from_version"""
+    missing = [version for version in range(from_version, SCHEMA_VERSION) if version not in _MIGRATIONS]
+    if missing:
+        raise ValueError(f"No hay migración registrada desde la versión {missing[0]}")
+    return [_MIGRATIONS[version] for version in range(from_version, SCHEMA_VERSION)]
+
+
+def _migrate_parallel(records: Iterator[Dict[str, Any]], from_version: Optional[int],
+                      workers: int) -> Iterator[Dict[str, Any]]:
+    """Migra bloques en un pool de procesos manteniendo el orden y acotando los bloques en curso"""
+    chunks = iter(lambda: list(islice(records, MIGRATION_CHUNK_RECORDS)), [])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        for chunk in chunks:
+            if from_version is None and all(detect_version(record) == SCHEMA_VERSION for record in chunk):
+                # Bloque ya actual de un archivo sin cabecera: no vale la pena serializarlo
+                done: Future = Future()
+                done.set_result(chunk)
+                pending.append(done)
+            else:
+                pending.append(executor.submit(migrate_chunk, chunk, from_version))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,421 @@
+"""
+Replicación Primario/Réplica
+Envío de snapshots y registros de cambios a un directorio compartido
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.user import User
+from src.services.events import EventType, UserEvent
+from src.services.migrations import SCHEMA_VERSION
+from src.services.user_service import UserService
+from src.utils.file_handler import ensure_directory_exists, read_json_file, write_json_file
+
+MANIFEST_FILE = 'MANIFEST.json'
+
+
+def _snapshot_name(epoch: str, sequence: int) -> str:
+    return f"snapshot-{epoch}-{sequence:012d}.json"
+
+
+def _log_name(epoch: str, sequence: int) -> str:
+    return f"changes-{epoch}-{sequence:012d}.ndjson"
+
+
+class ReplicationPrimary:
+    """
+    Publica el estado de un UserService en un directorio de replicación
+
+    El directorio contiene:
+      - snapshot-<E>-<S>.json: copia completa del servicio tras el evento S
+      - changes-<E>-<S>.ndjson: eventos posteriores a S, uno por línea
+      - MANIFEST.json: época, snapshot y registro vigentes (se reemplaza atómicamente)
+
+    La época E identifica cada ejecución del primario (start): al reiniciar,
+    las secuencias de eventos vuelven a empezar y las réplicas recargan el
+    snapshot en lugar de comparar secuencias de ejecuciones distintas.
+
+    Se genera un snapshot nuevo al iniciar, tras cada carga (evento LOADED) y
+    cada `snapshot_every` eventos. Se conserva la generación anterior para
+    que las réplicas puedan terminar de leerla.
+
+    Los eventos se reciben dentro de la operación que los publica, así que
+    ahí solo se hace lo barato: agregar la línea al registro o, al rotar,
+    abrir el registro nuevo y copiar la lista de usuarios (referencias, no
+    diccionarios). Serializar y escribir el snapshot y el manifiesto lo hace
+    un hilo escritor; si hay varias rotaciones pendientes solo se escribe la
+    última. Los errores de escritura no se pierden: quedan en last_error y
+    snapshot_errors, flush los lanza y el siguiente evento vuelve a rotar.
+    """
+
+    def __init__(self, service: UserService, directory: str, snapshot_every: int = 10000):
+        """
+        Inicializa el primario
+
+        Args:
+            service (UserService): Servicio a replicar
+            directory (str): Directorio de replicación
+            snapshot_every (int): Eventos entre snapshots periódicos
+        """
+        self.service = service
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.epoch: Optional[str] = None
+        self.last_error: Optional[Exception] = None
+        self.snapshot_errors = 0
+        self._log = None
+        self._log_name: Optional[str] = None
+        self._events_in_log = 0
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        # Rotación pendiente (la más reciente) para el hilo escritor
+        self._pending: Optional[Tuple[int, int, List[User]]] = None
+        self._writing = False
+        self._stopping = False
+        self._pending_changed = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Escribe el snapshot inicial y empieza a enviar cambios
+
+        Los eventos publicados mientras se escribe el snapshot inicial se
+        repiten desde el flujo de cambios, así que ninguno queda fuera del
+        registro.
+
+        Raises:
+            IOError: Si no se puede escribir el snapshot inicial
+        """
+        ensure_directory_exists(os.path.join(self.directory, MANIFEST_FILE))
+        with self._lock:
+            self.epoch = uuid.uuid4().hex
+            sequence = self.service.events.last_sequence
+            snapshot = self._rotate(sequence)
+        try:
+            self._write_snapshot(*snapshot)
+        except Exception:
+            self.stop()
+            raise
+
+        self._stopping = False
+        self._writer = threading.Thread(target=self._run_writer, name='replication-snapshots', daemon=True)
+        self._writer.start()
+        self._unsubscribe = self.service.events.subscribe(self._on_event, from_sequence=sequence)
+
+    def stop(self) -> None:
+        """Deja de enviar cambios, termina los snapshots pendientes y cierra el registro actual"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._writer is not None:
+            with self._pending_changed:
+                self._stopping = True
+                self._pending_changed.notify_all()
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Espera a que el hilo escritor termine los snapshots pendientes
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera
+
+        Raises:
+            IOError: Si el último snapshot no se pudo escribir
+        """
+        with self._pending_changed:
+            self._pending_changed.wait_for(lambda: self._pending is None and not self._writing, timeout)
+        if self.last_error is not None:
+            raise IOError(f"No se pudo publicar el snapshot: {self.last_error}")
+
+    def _on_event(self, event: UserEvent) -> None:
+        """Agrega un evento al registro o rota a un snapshot nuevo"""
+        with self._lock:
+            if self._log is None:
+                return
+            if event.type is EventType.LOADED or self._events_in_log >= self.snapshot_every:
+                snapshot = self._rotate(event.sequence)
+                with self._pending_changed:
+                    self._pending = snapshot
+                    self._pending_changed.notify_all()
+                return
+            self._log.write(json.dumps(event.to_dict(), ensure_ascii=False))
+            self._log.write('\n')
+            self._log.flush()
+            self._events_in_log += 1
+
+    def _rotate(self, sequence: int) -> Tuple[int, int, List[User]]:
+        """
+        Abre el registro de la secuencia dada y captura el estado a guardar (con el cerrojo tomado)
+
+        Returns:
+            Tuple[int, int, List[User]]: Secuencia, marca de agua de IDs y usuarios del snapshot
+        """
+        if self._log is not None:
+            self._log.close()
+        self._log_name = _log_name(self.epoch, sequence)
+        self._log = open(os.path.join(self.directory, self._log_name), 'a', encoding='utf-8')
+        self._events_in_log = 0
+        # Los usuarios no se modifican tras el alta: basta copiar las referencias
+        return sequence, self.service.next_id, self.service.users
+
+    def _run_writer(self) -> None:
+        """Hilo escritor: publica la rotación pendiente más reciente hasta que se detenga el primario"""
+        while True:
+            with self._pending_changed:
+                self._pending_changed.wait_for(lambda: self._pending is not None or self._stopping)
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    return
+                self._writing = True
+            try:
+                self._write_snapshot(*snapshot)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                self.snapshot_errors += 1
+                with self._lock:
+                    # El registro abierto no está en ningún manifiesto: el próximo evento vuelve a rotar
+                    self._events_in_log = self.snapshot_every
+            finally:
+                with self._pending_changed:
+                    self._writing = False
+                    self._pending_changed.notify_all()
+
+    def _write_snapshot(self, sequence: int, next_id: int, users: List[User]) -> None:
+        """Escribe el snapshot de la secuencia dada y publica el manifiesto que lo apunta"""
+        data = {'sequence': sequence, 'schema_version': SCHEMA_VERSION, 'next_id': next_id,
+                'users': [user.to_dict() for user in users]}
+        if not write_json_file(os.path.join(self.directory, _snapshot_name(self.epoch, sequence)), data):
+            raise IOError(f"No se pudo escribir el snapshot {sequence} en '{self.directory}'")
+
+        previous = read_json_file(os.path.join(self.directory, MANIFEST_FILE))
+        if not write_json_file(os.path.join(self.directory, MANIFEST_FILE), {
+            'epoch': self.epoch,
+            'snapshot': _snapshot_name(self.epoch, sequence),
+            'snapshot_sequence': sequence,
+            'log': _log_name(self.epoch, sequence),
+            'created_at': datetime.now().isoformat()
+        }):
+            raise IOError(f"No se pudo escribir el manifiesto en '{self.directory}'")
+        self._cleanup(previous)
+
+    def _cleanup(self, previous: Optional[Dict[str, Any]]) -> None:
+        """Borra las generaciones anteriores a la previa"""
+        keep = {MANIFEST_FILE}
+        manifest = read_json_file(os.path.join(self.directory, MANIFEST_FILE)) or {}
+        for source in (manifest, previous or {}):
+            keep.update(filter(None, (source.get('snapshot'), source.get('log'))))
+        # Con el cerrojo: el registro en curso puede ser más nuevo que el manifiesto
+        with self._lock:
+            keep.add(self._log_name)
+            for filename in os.listdir(self.directory):
+                if filename.startswith(('snapshot-', 'changes-')) and filename not in keep \
+                        and not filename.endswith('.tmp'):
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except OSError:
+                        pass
+
+
+class ReplicaService:
+    """
+    Réplica de solo lectura que sigue un directorio de replicación
+
+    Carga el snapshot vigente y aplica los cambios del registro en orden.
+    Vuelve a cargar el snapshot si detecta un hueco (se perdió una
+    generación), si el primario se reinició (cambió la época) o si el
+    snapshot vigente no continúa exactamente lo ya aplicado. Las lecturas se
+    sirven desde un UserService interno.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Inicializa la réplica (sin datos hasta el primer poll)
+
+        Args:
+            directory (str): Directorio de replicación del primario
+        """
+        self.directory = directory
+        self.service = UserService()
+        self.applied_sequence = -1
+        self._epoch: Optional[str] = None
+        self._log_name: Optional[str] = None
+        self._log_offset = 0
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    """
+    Lecturas
+    """
+
+    def list_users(self) -> List[User]:
+        """Lista todos los usuarios replicados (ver UserService.list_users)"""
+        with self._lock:
+            return self.service.list_users()
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Obtiene un usuario replicado por su ID (ver UserService.get_user_by_id)"""
+        with self._lock:
+            return self.service.get_user_by_id(user_id)
+
+    def search_users_by_name(self, search_term: str) -> List[User]:
+        """Busca usuarios replicados por nombre (ver UserService.search_users_by_name)"""
+        with self._lock:
+            return self.service.search_users_by_name(search_term)
+
+    def search_users_fuzzy(self, search_term: str, **kwargs) -> List[User]:
+        """Búsqueda aproximada sobre la réplica (ver UserService.search_users_fuzzy)"""
+        with self._lock:
+            return self.service.search_users_fuzzy(search_term, **kwargs)
+
+    """
+    Seguimiento del primario
+    """
+
+    def poll(self) -> int:
+        """
+        Aplica los cambios disponibles
+
+        Returns:
+            int: Cantidad de eventos aplicados (o usuarios cargados si se leyó un snapshot)
+        """
+        manifest = read_json_file(os.path.join(self.directory, MANIFEST_FILE))
+        if not manifest:
+            return 0
+
+        with self._lock:
+            applied = 0
+            if manifest.get('epoch') != self._epoch:
+                # Primario reiniciado: sus secuencias no continúan las ya aplicadas
+                applied += self._load_snapshot(manifest)
+            elif self._log_name != manifest['log']:
+                # Terminar el registro anterior antes de cambiar de generación
+                if self._log_name is not None:
+                    applied += self._apply_log()
+                if self.applied_sequence == manifest['snapshot_sequence'] and self._log_name is not None:
+                    self._log_name, self._log_offset = manifest['log'], 0
+                else:
+                    applied += self._load_snapshot(manifest)
+            return applied + self._apply_log()
+
+    def lag(self) -> Dict[str, Any]:
+        """
+        Mide el retraso de la réplica respecto al primario
+
+        Returns:
+            Dict[str, Any]: applied_sequence, pending_bytes (registro aún sin
+                aplicar), new_generation (hay un snapshot nuevo sin leer) y
+                lag_seconds (antigüedad del cambio más viejo sin aplicar)
+        """
+        with self._lock:
+            result = {'applied_sequence': self.applied_sequence, 'pending_bytes': 0,
+                      'new_generation': False, 'lag_seconds': 0.0}
+            manifest = read_json_file(os.path.join(self.directory, MANIFEST_FILE)) or {}
+            if manifest.get('log') and manifest['log'] != self._log_name:
+                created_at = datetime.fromisoformat(manifest['created_at'])
+                result['new_generation'] = True
+                result['lag_seconds'] = max(0.0, (datetime.now() - created_at).total_seconds())
+                return result
+            if self._log_name is None:
+                return result
+
+            path = os.path.join(self.directory, self._log_name)
+            try:
+                pending = os.path.getsize(path) - self._log_offset
+                if pending > 0:
+                    with open(path, 'rb') as f:
+                        f.seek(self._log_offset)
+                        line = f.readline()
+                    if line.endswith(b'\n'):
+                        oldest = UserEvent.from_dict(json.loads(line))
+                        result['lag_seconds'] = max(0.0, (datetime.now() - oldest.timestamp).total_seconds())
+                result['pending_bytes'] = max(0, pending)
+            except OSError:
+                pass
+            return result
+
+    def start(self, interval: float = 0.5) -> None:
+        """
+        Sigue al primario en un hilo en segundo plano
+
+        Args:
+            interval (float): Segundos entre consultas
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def follow():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except (OSError, ValueError, KeyError):
+                    pass  # Archivo a medio rotar: se reintenta en la siguiente vuelta
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=follow, name='replica-follower', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el seguimiento en segundo plano"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _load_snapshot(self, manifest: Dict[str, Any]) -> int:
+        """Reemplaza el estado local por el snapshot del manifiesto"""
+        success, message = self.service.load_from_json(os.path.join(self.directory, manifest['snapshot']))
+        if not success:
+            raise IOError(message)
+        self.applied_sequence = manifest['snapshot_sequence']
+        self._epoch = manifest.get('epoch')
+        self._log_name, self._log_offset = manifest['log'], 0
+        return len(self.service.users)
+
+    def _apply_log(self) -> int:
+        """Aplica las líneas completas del registro a partir de la posición actual"""
+        if self._log_name is None:
+            return 0
+        path = os.path.join(self.directory, self._log_name)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        with f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # El primario aún está escribiendo esta línea
+                event = UserEvent.from_dict(json.loads(line))
+                if event.sequence > self.applied_sequence + 1:
+                    # Hueco: se perdieron eventos; lo resolverá el siguiente snapshot
+                    self._log_name = None
+                    break
+                self._log_offset += len(line)
+                if event.sequence <= self.applied_sequence:
+                    continue
+                self._apply_event(event)
+                applied += 1
+        return applied
+
+    def _apply_event(self, event: UserEvent) -> None:
+        """Aplica un evento al servicio local"""
+        if event.type is EventType.REGISTERED:
+            self.service.apply_registered(event.data)
+        elif event.type is EventType.DELETED:
+            self.service.delete_user(event.user_id)
+        self.applied_sequence = event.sequence
@@ -0,0 +1,176 @@
+"""
+Importación Reanudable
+Carga de archivos grandes en un almacén de preparación con puntos de control
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from src.config.settings import IMPORT_CHECKPOINT_RECORDS
+from src.models.user import User
+from src.services.migrations import file_format, migrate_record, resolve_version
+from src.utils.file_handler import (read_json_file, write_json_file, iter_json_items,
+                                    iter_ndjson_file, iter_ndjson_offsets)
+from src.utils.integrity import verify_file
+
+CHECKPOINT_SUFFIX = '.import-checkpoint.json'
+STAGING_SUFFIX = '.import-staging.ndjson'
+
+
+@dataclass
+class ImportResult:
+    """Usuarios listos para reemplazar los del servicio"""
+    users: List[User]
+    next_id: int
+    resumed_from: int
+
+
+def checkpoint_path(filename: str) -> str:
+    """Archivo lateral con el punto de control de la importación de `filename`"""
+    return f"{filename}{CHECKPOINT_SUFFIX}"
+
+
+def staging_path(filename: str) -> str:
+    """Almacén de preparación (NDJSON en el esquema actual) de la importación de `filename`"""
+    return f"{filename}{STAGING_SUFFIX}"
+
+
+def has_checkpoint(filename: str) -> bool:
+    """
+    Indica si hay una importación interrumpida de `filename` que se puede reanudar
+
+    Args:
+        filename (str): Archivo de origen
+
+    Returns:
+        bool: True si el punto de control existe y el origen no cambió desde entonces
+    """
+    return _valid_checkpoint(filename, _source_stamp(filename)) is not None
+
+
+def discard_checkpoint(filename: str) -> None:
+    """
+    Borra el punto de control y el almacén de preparación de `filename`
+
+    Args:
+        filename (str): Archivo de origen
+    """
+    for path in (checkpoint_path(filename), staging_path(filename)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def import_resumable(filename: str, checkpoint_every: int = IMPORT_CHECKPOINT_RECORDS) -> ImportResult:
+    """
+    Lee un archivo JSON o NDJSON de usuarios guardando el progreso
+
+    Cada registro se migra, se valida construyendo el User y se agrega al
+    almacén de preparación. Cada `checkpoint_every` registros se sincroniza
+    ese almacén y se reemplaza atómicamente el punto de control con la
+    posición en bytes del origen. Si la lectura se interrumpe, la siguiente
+    llamada retoma desde el último punto de control siempre que el origen no
+    haya cambiado (mismo tamaño y fecha de modificación). Al terminar queda
+    un punto de control con todos los registros: quien llama debe borrarlo
+    con discard_checkpoint solo después de reemplazar los usuarios, para que
+    un reemplazo fallido también se pueda reanudar.
+
+    Args:
+        filename (str): Archivo de origen (.json, .ndjson o .jsonl)
+        checkpoint_every (int): Registros entre puntos de control
+
+    Returns:
+        ImportResult: Usuarios construidos, marca de agua de IDs y registro desde el que se reanudó
+
+    Raises:
+        IOError: Si no se puede leer el origen o escribir el progreso
+        ValueError: Si el formato no está soportado, el archivo está dañado o su esquema es más nuevo
+    """
+    fmt = file_format(filename)
+    stamp = _source_stamp(filename)
+    checkpoint = _valid_checkpoint(filename, stamp)
+    if checkpoint is None:
+        discard_checkpoint(filename)
+        if fmt == 'json':
+            integrity = verify_file(filename, 'json')
+            if not integrity.ok:
+                raise ValueError(f"El archivo '{filename}' está dañado: {integrity.message}")
+        checkpoint = {**stamp, 'format': fmt, 'offset': None, 'records': 0, 'staging_bytes': 0,
+                      'version': None, 'metadata': {}}
+
+    staging = staging_path(filename)
+    users = _read_staging(staging, checkpoint)
+    resumed_from = checkpoint['records']
+    metadata: Dict[str, Any] = dict(checkpoint['metadata'])
+    version: Optional[int] = checkpoint['version']
+
+    def save_checkpoint(out: BinaryIO, offset: int) -> None:
+        out.flush()
+        os.fsync(out.fileno())
+        checkpoint.update(offset=offset, records=len(users), staging_bytes=out.tell(),
+                          version=version, metadata=metadata)
+        if not write_json_file(checkpoint_path(filename), checkpoint):
+            raise IOError(f"No se pudo guardar el punto de control de '{filename}'")
+
+    with open(staging, 'ab') as out:
+        last_offset = checkpoint['offset']
+        for key, record, offset in _iter_source(filename, fmt, checkpoint['offset']):
+            if key != 'users':
+                metadata[key] = record
+                continue
+            if version is None:
+                version = resolve_version(metadata.get('schema_version'))
+            user = User.from_dict(migrate_record(record, version))
+            users.append(user)
+            out.write(json.dumps(user.to_dict(), ensure_ascii=False).encode('utf-8'))
+            out.write(b'\n')
+            last_offset = offset
+            if len(users) % checkpoint_every == 0:
+                save_checkpoint(out, offset)
+        # Punto de control final: si el reemplazo posterior falla, se retoma sin releer el origen
+        if len(users) > checkpoint['records']:
+            save_checkpoint(out, last_offset)
+
+    return ImportResult(users=users, next_id=int(metadata.get('next_id', 1)), resumed_from=resumed_from)
+
+
+def _iter_source(filename: str, fmt: str, offset: Optional[int]) -> Iterator[Tuple[Optional[str], Any, int]]:
+    """Recorre el origen como (clave, valor, byte siguiente); los usuarios llevan la clave 'users'"""
+    if fmt == 'json':
+        return iter_json_items(filename, 'users', offset)
+    return (('users', record, end) for record, end in iter_ndjson_offsets(filename, offset or 0))
+
+
+def _read_staging(staging: str, checkpoint: Dict[str, Any]) -> List[User]:
+    """Reconstruye los usuarios ya preparados, descartando lo escrito tras el último punto de control"""
+    if not checkpoint['records']:
+        return []
+    with open(staging, 'r+b') as f:
+        f.truncate(checkpoint['staging_bytes'])
+    users = [User.from_dict(record) for record in iter_ndjson_file(staging)]
+    if len(users) != checkpoint['records']:
+        raise ValueError(f"El almacén de preparación '{staging}' no coincide con su punto de control")
+    return users
+
+
+def _source_stamp(filename: str) -> Dict[str, int]:
+    """Tamaño y fecha de modificación del origen, para detectar si cambió"""
+    stat = os.stat(filename)
+    return {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+
+
+def _valid_checkpoint(filename: str, stamp: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """Punto de control de `filename` si sigue siendo válido para el origen actual"""
+    checkpoint = read_json_file(checkpoint_path(filename))
+    if not isinstance(checkpoint, dict) or not checkpoint.get('records'):
+        return None
+    if any(checkpoint.get(key) != value for key, value in stamp.items()):
+        return None
+    try:
+        if os.path.getsize(staging_path(filename)) < checkpoint['staging_bytes']:
+            return None
+    except OSError:
+        return None
+    return checkpoint
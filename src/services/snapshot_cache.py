@@ -0,0 +1,113 @@
+"""
+Caché de Snapshots
+Estado completo del servicio (usuarios e índices) serializado con pickle junto al archivo de origen
+"""
+
+import os
+import pickle
+from typing import Any, Dict, Optional
+from src.config.settings import FILE_IO_CHUNK_SIZE
+from src.services.migrations import SCHEMA_VERSION
+from src.utils.file_handler import write_chunks_file
+from src.utils.integrity import StreamChecksum
+
+SNAPSHOT_SUFFIX = '.snapshot.pickle'
+
+# Cambia cuando cambia la forma del estado guardado (atributos del servicio o de sus índices)
+# o cómo se normalizan sus valores (fechas de creación sin zona horaria desde la 4)
+SNAPSHOT_FORMAT = 4
+
+PICKLE_PROTOCOL = 5
+
+
+def snapshot_path(source: str) -> str:
+    """Archivo de snapshot asociado a `source`"""
+    return f"{source}{SNAPSHOT_SUFFIX}"
+
+
+def source_key(source: str) -> Dict[str, Any]:
+    """
+    Identifica el contenido actual de un archivo de origen
+
+    Args:
+        source (str): Archivo de origen
+
+    Returns:
+        Dict[str, Any]: Tamaño, fecha de modificación, BLAKE2b del contenido
+            y versiones del esquema y del formato del snapshot
+
+    Raises:
+        OSError: Si el archivo no se puede leer
+    """
+    stat = os.stat(source)
+    checksum = StreamChecksum('blake2b')
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(FILE_IO_CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': checksum.hexdigest(),
+            'schema_version': SCHEMA_VERSION, 'snapshot_format': SNAPSHOT_FORMAT}
+
+
+def write_snapshot(source: str, key: Dict[str, Any], state: Dict[str, Any]) -> bool:
+    """
+    Guarda el estado del servicio para `source` de forma atómica
+
+    El archivo contiene dos pickles seguidos: la clave del origen y el
+    estado, de modo que una clave que no coincide se descarta sin
+    deserializar el estado.
+
+    Args:
+        source (str): Archivo de origen cuyo contenido refleja el estado
+        key (Dict[str, Any]): Clave del origen (source_key), tomada antes de leerlo
+        state (Dict[str, Any]): Estado a guardar
+
+    Returns:
+        bool: True si se escribió
+    """
+    return write_chunks_file(snapshot_path(source), (
+        pickle.dumps(key, protocol=PICKLE_PROTOCOL),
+        pickle.dumps(state, protocol=PICKLE_PROTOCOL)
+    ))
+
+
+def read_snapshot(source: str, key: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Lee el estado guardado para `source` si sigue correspondiendo a su contenido
+
+    Un snapshot que no coincide con el origen o que no se puede leer se
+    borra. El snapshot es un pickle: solo se leen los que escribe
+    write_snapshot junto al archivo de origen, con la misma confianza que
+    el propio origen.
+
+    Args:
+        source (str): Archivo de origen
+        key (Dict[str, Any], optional): Clave actual del origen (se calcula si no se da)
+
+    Returns:
+        Dict[str, Any]: Estado guardado, o None si no hay un snapshot válido
+    """
+    path = snapshot_path(source)
+    if not os.path.exists(path):
+        return None
+    try:
+        key = key or source_key(source)
+        with open(path, 'rb') as f:
+            if pickle.load(f) == key:
+                return pickle.load(f)
+    except Exception:
+        pass  # Snapshot truncado o de otra versión del código: se regenera
+    discard_snapshot(source)
+    return None
+
+
+def discard_snapshot(source: str) -> None:
+    """
+    Borra el snapshot de `source` si existe
+
+    Args:
+        source (str): Archivo de origen
+    """
+    try:
+        os.remove(snapshot_path(source))
+    except FileNotFoundError:
+        pass
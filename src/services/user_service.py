@@ -3,33 +3,91 @@ Servicio de Gestión de Usuarios
 Contiene la lógica de negocio para gestionar usuarios
 """
 
+import asyncio
+import heapq
+import io
 import json
-from typing import List, Optional
-from src.models.user import User
-from src.utils.file_handler import read_json_file, write_json_file, read_text_file, write_text_file
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.config.settings import (EMAIL_FILTER_ENABLED, EMAIL_FILTER_CAPACITY, EMAIL_FILTER_FP_RATE,
+                                 AUTH_ACCOUNT_BURST, AUTH_ACCOUNT_REFILL_PER_SECOND,
+                                 AUTH_SOURCE_BURST, AUTH_SOURCE_REFILL_PER_SECOND, EVENTS_BUFFER_SIZE,
+                                 IMPORT_CHECKPOINT_RECORDS, BULK_LOAD_GC_MODE)
+from src.models.user import User, to_local_naive
+from src.services.aggregates import UserAggregates
+from src.services.events import ChangeFeed, EventType
+from src.services.migrations import (SCHEMA_VERSION, detect_version, migrate_record, migrate_records,
+                                     resolve_version)
+from src.services.resumable_import import discard_checkpoint, import_resumable
+from src.services.snapshot_cache import read_snapshot, source_key, write_snapshot
+from src.utils.bloom_filter import BloomFilter
+from src.utils.file_handler import (read_binary_file, write_binary_file, write_chunks_file,
+                                    read_binary_file_async, write_chunks_file_async, iter_ndjson_file,
+                                    read_ndjson_range, write_ndjson_file, iter_csv_file, write_csv_file,
+                                    split_file_ranges, get_file_io_executor)
+from src.utils.gc_control import bulk_load_gc
+from src.utils.id_allocator import IdAllocator
+from src.utils.integrity import iter_json_document, iter_text_document, verify_bytes
+from src.utils.memory_profiler import sizeof_by_type
+from src.utils.rate_limiter import TokenBucketLimiter
+from src.utils.sorted_index import SortedIndex
+from src.utils.text_search import TrigramIndex, DEFAULT_MAX_CANDIDATES, edit_distance, normalize_text
 
+# Columnas de las exportaciones CSV, en el orden de User.to_dict
+CSV_FIELDS = ['id', 'name', 'email', 'password_hash', 'created_at']
 
-class UserService:
-    """Servicio para gestionar usuarios"""
-    
-    """
-Servicio de Gestión de Usuarios
-Contiene la lógica de negocio para gestionar usuarios
-"""
-
-import json
-from typing import List, Optional, Tuple
-from src.models.user import User
-from src.utils.file_handler import read_json_file, write_json_file, read_text_file, write_text_file
+# Usuarios cuyo email se comprueba al cargar un filtro de emails guardado
+EMAIL_FILTER_CHECK_SAMPLE = 256
 
 
 class UserService:
     """Servicio para gestionar usuarios"""
     
-    def __init__(self):
-        """Inicializa el servicio de usuarios"""
-        self.users = []
+    def __init__(self, id_allocator: Optional[IdAllocator] = None,
+                 email_filter: Optional[bool] = None, bulk_load_gc: Optional[str] = None):
+        """
+        Inicializa el servicio de usuarios
+        
+        Args:
+            id_allocator (IdAllocator, optional): Asignador de IDs. Por defecto cada
+                servicio tiene el suyo; se puede compartir entre servicios
+            email_filter (bool, optional): Activa el filtro de Bloom de emails.
+                Por defecto se usa EMAIL_FILTER_ENABLED
+            bulk_load_gc (str, optional): Manejo del GC durante las cargas de
+                archivos ('off', 'pause' o 'freeze', ver src.utils.gc_control).
+                Por defecto se usa BULK_LOAD_GC_MODE
+        """
+        # Usuarios por ID, en orden de alta (búsqueda y baja en O(1))
+        self._users: Dict[int, User] = {}
+        self.bulk_load_gc = bulk_load_gc or BULK_LOAD_GC_MODE
         self._unsaved_changes = False
+        self._id_allocator = id_allocator or IdAllocator()
+        self._created_index = SortedIndex()
+        self._name_index = TrigramIndex()
+        self._aggregates = UserAggregates()
+        self._users_by_email: Dict[str, User] = {}
+        self.events = ChangeFeed(EVENTS_BUFFER_SIZE)
+        self._account_limiter = TokenBucketLimiter(AUTH_ACCOUNT_BURST, AUTH_ACCOUNT_REFILL_PER_SECOND)
+        self._source_limiter = TokenBucketLimiter(AUTH_SOURCE_BURST, AUTH_SOURCE_REFILL_PER_SECOND)
+        
+        if email_filter is None:
+            email_filter = EMAIL_FILTER_ENABLED
+        self._email_filter = BloomFilter(EMAIL_FILTER_CAPACITY, EMAIL_FILTER_FP_RATE) if email_filter else None
+        self._email_filter_stats = {'checks': 0, 'rejected': 0, 'passed': 0, 'false_positives': 0}
+    
+    @property
+    def users(self) -> List[User]:
+        """List[User]: Copia de los usuarios en orden de alta (ver list_users)"""
+        return list(self._users.values())
+    
+    @property
+    def next_id(self) -> int:
+        """int: Marca de agua de IDs (el próximo ID que se asignaría)"""
+        return self._id_allocator.next_id
     
     def register_user(self, name: str, email: str, password: str) -> Tuple[bool, str]:
         """
@@ -44,26 +102,99 @@ class UserService:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
         # Verificar datos de entrada
-        if not name or not name.strip():
-            return False, "El nombre no puede estar vacío"
-        
-        if not email or '@' not in email:
-            return False, "El email no es válido"
-        
-        if not password or len(password) < 6:
-            return False, "La contraseña debe tener al menos 6 caracteres"
+        error = self._validate_user_data(name, email, password)
+        if error:
+            return False, error
         
         # Verificar si el email ya existe
-        if self._email_exists(email):
+        if self._email_taken(email):
             return False, f"Ya existe un usuario con el email '{email}'"
         
         # Crear nuevo usuario
-        user = User(name, email, password)
-        self.users.append(user)
+        user = User(name, email, password, user_id=self._id_allocator.allocate())
+        self._users[user.id] = user
+        self._index_user(user)
         self._unsaved_changes = True
+        self.events.publish(EventType.REGISTERED, user.id, user.to_dict())
         
         return True, f"Usuario '{name}' registrado exitosamente"
         
+    def import_users(self, records: Iterable[Dict[str, Any]]) -> Tuple[bool, str]:
+        """
+        Importa usuarios en bloque, reservando los IDs necesarios en una sola llamada
+        
+        Cada registro puede traer 'password' (se hashea) o 'password_hash'. Los
+        registros inválidos, con email repetido o con un ID ya ocupado se omiten.
+        Los IDs nuevos se reservan por encima del mayor ID explícito del lote,
+        así que nunca le quitan el ID a un registro posterior del mismo lote.
+        
+        Args:
+            records (Iterable[Dict[str, Any]]): Registros a importar
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            records = list(records)
+            explicit_ids = [data['id'] for data in records if data.get('id') is not None]
+            if explicit_ids:
+                self._id_allocator.observe(max(explicit_ids))
+            new_ids = iter(self._id_allocator.reserve(len(records) - len(explicit_ids)))
+            
+            imported = skipped = 0
+            
+            for data in records:
+                user_id = data.get('id')
+                if user_id is None:
+                    user_id = next(new_ids)
+                
+                email = data.get('email', '')
+                error = self._validate_user_data(data.get('name', ''), email, data.get('password'),
+                                                 check_password='password_hash' not in data)
+                if error or email.lower() in self._users_by_email or user_id in self._users:
+                    skipped += 1
+                    continue
+                
+                self._add_user(User.from_dict(migrate_record({**data, 'id': user_id}, detect_version(data))))
+                imported += 1
+            
+            if imported:
+                self._unsaved_changes = True
+            return True, f"Se importaron {imported} usuarios ({skipped} omitidos)"
+        except Exception as e:
+            return False, f"Error al importar usuarios: {str(e)}"
+    
+    def observe_id(self, user_id: int) -> None:
+        """
+        Evita que se entreguen IDs hasta user_id (por ejemplo, IDs explícitos
+        que llegarán en lotes posteriores de una importación)
+        
+        Args:
+            user_id (int): ID que se usará
+        """
+        self._id_allocator.observe(user_id)
+    
+    def apply_registered(self, data: Dict[str, Any]) -> bool:
+        """
+        Inserta un usuario ya persistido, como el de un evento REGISTERED
+        
+        A diferencia de import_users no valida los datos ni reserva IDs: solo
+        omite el registro si su ID o su email ya existen. Cada llamada es O(1),
+        así que sirve para aplicar flujos de cambios de cualquier tamaño.
+        
+        Args:
+            data (Dict[str, Any]): Usuario en el formato de User.to_dict
+            
+        Returns:
+            bool: True si se insertó
+        """
+        user = User.from_dict(data)
+        if user.id in self._users or user.email.lower() in self._users_by_email:
+            return False
+        self._add_user(user)
+        self._unsaved_changes = True
+        return True
+    
     def list_users(self) -> List[User]:
         """
         Lista todos los usuarios registrados
@@ -71,7 +202,7 @@ class UserService:
         Returns:
             List[User]: Lista de usuarios
         """
-        return self.users.copy()
+        return list(self._users.values())
     
     """
     Método de búsqueda correcto en la clase UserService
@@ -88,7 +219,94 @@ class UserService:
             List[User]: Lista de usuarios que coinciden con la búsqueda
         """
         search_term = search_term.lower()
-        return [user for user in self.users if search_term in user.name.lower()]
+        return [user for user in self._users.values() if search_term in user.name.lower()]
+    
+    def search_users_fuzzy(self, search_term: str, max_distance: Optional[int] = None,
+                           limit: int = 10,
+                           max_candidates: int = DEFAULT_MAX_CANDIDATES) -> List[User]:
+        """
+        Busca usuarios por nombre tolerando acentos, mayúsculas y errores de tipeo
+        
+        Cada palabra de la búsqueda se compara con la palabra más parecida del
+        nombre (coincidencia por subcadena = distancia 0; si no, distancia de
+        Damerau-Levenshtein). La suma de distancias no puede superar max_distance.
+        Solo se verifican las palabras candidatas que da el índice de trigramas,
+        una vez cada una aunque aparezca en muchos nombres.
+        
+        Args:
+            search_term (str): Término de búsqueda
+            max_distance (int, optional): Ediciones permitidas. Por defecto 1 para
+                búsquedas de hasta 4 caracteres y 2 para las más largas
+            limit (int): Número máximo de resultados
+            max_candidates (int): Máximo de palabras distintas a verificar por
+                palabra de la búsqueda (las que más trigramas comparten)
+            
+        Returns:
+            List[User]: Usuarios ordenados de mejor a peor coincidencia
+        """
+        query_tokens = normalize_text(search_term).split()
+        if not query_tokens or limit <= 0:
+            return []
+        
+        if max_distance is None:
+            max_distance = 1 if len(''.join(query_tokens)) <= 4 else 2
+        
+        # Distancia de cada palabra de la búsqueda a sus palabras candidatas del índice
+        matches: List[Dict[str, int]] = []
+        for query_token in query_tokens:
+            distances = {}
+            for name_token in self._name_index.candidate_tokens(query_token, max_distance, max_candidates):
+                distance = 0 if query_token in name_token else edit_distance(query_token, name_token, max_distance)
+                if distance <= max_distance:
+                    distances[name_token] = distance
+            if not distances:
+                return []
+            matches.append(distances)
+        
+        # Distancia de cada usuario a cada palabra de la búsqueda (la de su palabra más
+        # parecida); un usuario debe parecerse a todas. Se parte de la palabra con
+        # menos usuarios y cada palabra siguiente se suma por el camino más corto:
+        # repartiendo su distancia a los usuarios de sus palabras candidatas o
+        # revisando las palabras de los usuarios que siguen en carrera
+        keys, tokens = self._name_index.keys, self._name_index.tokens
+        too_far = max_distance + 1
+        sized = sorted(((sum(len(keys(token)) for token in distances), distances) for distances in matches),
+                       key=lambda item: item[0])
+        totals: Optional[Dict[User, int]] = None
+        for size, distances in sized:
+            if totals is not None and len(totals) < size:
+                extended = {}
+                for user, total in totals.items():
+                    total += min((distances.get(token, too_far) for token in tokens(user)), default=too_far)
+                    if total <= max_distance:
+                        extended[user] = total
+                totals = extended
+            else:
+                best: Dict[User, int] = {}
+                for name_token, distance in sorted(distances.items(), key=lambda item: item[1]):
+                    for user in keys(name_token):
+                        best.setdefault(user, distance)
+                totals = best if totals is None else {
+                    user: total + best[user] for user, total in totals.items()
+                    if user in best and total + best[user] <= max_distance}
+            if not totals:
+                return []
+        
+        ranked = heapq.nsmallest(limit, totals.items(),
+                                 key=lambda item: (item[1], ' '.join(tokens(item[0])), item[0].id))
+        return [user for user, _ in ranked]
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """
+        Obtiene un usuario por su email (sin distinguir mayúsculas)
+        
+        Args:
+            email (str): Email del usuario
+            
+        Returns:
+            Optional[User]: Usuario si existe, None en caso contrario
+        """
+        return self._users_by_email.get(email.lower())
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """
@@ -100,10 +318,178 @@ class UserService:
         Returns:
             Optional[User]: Usuario si existe, None en caso contrario
         """
-        for user in self.users:
-            if user.id == user_id:
-                return user
-        return None
+        return self._users.get(user_id)
+    
+    """
+    Autenticación
+    """
+
+    def authenticate(self, email: str, password: str, source: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Autentica a un usuario por email y contraseña
+        
+        Busca al usuario en el índice de emails (O(1)), compara el hash en
+        tiempo constante y limita los intentos por cuenta y, si se indica, por
+        origen (por ejemplo, la IP del cliente). Cada intento consume un token.
+        
+        Args:
+            email (str): Email del usuario
+            password (str): Contraseña en texto plano
+            source (str, optional): Identificador del origen del intento
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        account_key = (email or '').lower()
+        if source is not None and not self._source_limiter.allow(source):
+            wait = self._source_limiter.retry_after(source)
+            return False, f"Demasiados intentos desde este origen. Reintente en {wait:.0f} s"
+        if not self._account_limiter.allow(account_key):
+            wait = self._account_limiter.retry_after(account_key)
+            return False, f"Demasiados intentos para esta cuenta. Reintente en {wait:.0f} s"
+        
+        user = self._users_by_email.get(account_key)
+        if user is None:
+            # Se calcula el hash igualmente para no revelar qué cuentas existen
+            User._hash_password(password or '')
+            return False, "Email o contraseña incorrectos"
+        
+        if not user.verify_password(password or ''):
+            return False, "Email o contraseña incorrectos"
+        
+        return True, f"Bienvenido, {user.name}"
+    
+    """
+    Consultas por fecha de registro
+    """
+
+    def find_by_created_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              limit: Optional[int] = None) -> List[User]:
+        """
+        Busca usuarios registrados entre dos fechas (ambas inclusivas)
+        
+        Las fechas con zona horaria se convierten a la hora local, como las
+        fechas de creación (ver to_local_naive).
+        
+        Args:
+            start (datetime, optional): Fecha inicial. None para no acotar
+            end (datetime, optional): Fecha final. None para no acotar
+            limit (int, optional): Número máximo de resultados
+            
+        Returns:
+            List[User]: Usuarios ordenados del más antiguo al más reciente
+        """
+        start = None if start is None else to_local_naive(start)
+        end = None if end is None else to_local_naive(end)
+        return self._created_index.range(start, end, limit=limit)
+    
+    def newest(self, n: int) -> List[User]:
+        """
+        Obtiene los n usuarios registrados más recientemente
+        
+        Args:
+            n (int): Número de usuarios
+            
+        Returns:
+            List[User]: Usuarios del más reciente al más antiguo
+        """
+        return self._created_index.last(n)
+    
+    def oldest(self, n: int) -> List[User]:
+        """
+        Obtiene los n usuarios registrados hace más tiempo
+        
+        Args:
+            n (int): Número de usuarios
+            
+        Returns:
+            List[User]: Usuarios del más antiguo al más reciente
+        """
+        return self._created_index.first(n)
+    
+    """
+    Estadísticas agregadas
+    """
+
+    def stats(self, top_domains: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de usuarios sin recorrer la lista completa
+        
+        Args:
+            top_domains (int, optional): Limita los dominios a los N más frecuentes
+            
+        Returns:
+            Dict[str, Any]: total_users, domains, signups_by_day y signups_by_month
+        """
+        return self._aggregates.stats(top_domains)
+    
+    def users_by_domain(self, domain: str) -> List[User]:
+        """
+        Obtiene los usuarios cuyo email pertenece a un dominio
+        
+        Args:
+            domain (str): Dominio de email, por ejemplo 'example.com'
+            
+        Returns:
+            List[User]: Usuarios del dominio
+        """
+        return self._aggregates.users_by_domain(domain)
+    
+    def memory_report(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Mide la memoria que ocupan los usuarios y las estructuras del servicio
+        
+        Recorre los objetos con sys.getsizeof contando cada uno una sola vez:
+        primero los usuarios (así los índices solo suman sus propias
+        estructuras, no los usuarios que referencian) y después cada índice.
+        
+        Args:
+            extra (Dict[str, Any], optional): Estructuras adicionales a medir
+                (por ejemplo la caché de un envoltorio), por nombre
+            
+        Returns:
+            Dict[str, Any]: users, total_bytes, per_user_bytes, breakdown (bytes
+                de user_objects, strings, datetimes, other_attributes y
+                users_list), indexes (bytes por estructura) y by_type
+        """
+        seen = {id(self._users)}
+        by_type = sizeof_by_type(self._users.values(), seen)
+        user_bytes = sum(by_type.values())
+        breakdown = {
+            'user_objects': by_type[User.__name__],
+            'strings': by_type['str'],
+            'datetimes': by_type[datetime.__name__],
+            'other_attributes': user_bytes - by_type[User.__name__] - by_type['str'] - by_type[datetime.__name__],
+            'users_list': sys.getsizeof(self._users)
+        }
+        
+        structures = {
+            'email_index': self._users_by_email,
+            'created_index': self._created_index,
+            'name_index': self._name_index,
+            'aggregates': self._aggregates,
+            'email_filter': self._email_filter,
+            'rate_limiters': (self._account_limiter, self._source_limiter),
+            'events': self.events,
+            'id_allocator': self._id_allocator
+        }
+        structures.update(extra or {})
+        indexes = {}
+        for name, structure in structures.items():
+            sizes = sizeof_by_type([structure], seen)
+            indexes[name] = sum(sizes.values())
+            by_type.update(sizes)
+        by_type['dict'] += breakdown['users_list']
+        
+        total = sum(breakdown.values()) + sum(indexes.values())
+        return {
+            'users': len(self._users),
+            'total_bytes': total,
+            'per_user_bytes': total / len(self._users) if self._users else 0.0,
+            'breakdown': breakdown,
+            'indexes': indexes,
+            'by_type': dict(by_type.most_common())
+        }
     
     """
     Método delete_user que devuelve una tupla (success, message)
@@ -119,10 +505,11 @@ class UserService:
         Returns:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
-        user = self.get_user_by_id(user_id)
+        user = self._users.pop(user_id, None)
         if user:
-            self.users.remove(user)
+            self._unindex_user(user)
             self._unsaved_changes = True
+            self.events.publish(EventType.DELETED, user_id)
             return True, f"Usuario con ID {user_id} eliminado exitosamente"
         return False, f"No se encontró un usuario con ID {user_id}"
     
@@ -130,10 +517,27 @@ class UserService:
     Métodos de guardado y carga de archivos en UserService
     """
 
+    def export_data(self) -> Dict[str, Any]:
+        """
+        Obtiene el contenido completo del servicio tal como se guarda en JSON
+        
+        Returns:
+            Dict[str, Any]: {'schema_version': versión del esquema, 'next_id': marca
+                de agua de IDs, 'users': [usuarios]}
+        """
+        return {
+            'schema_version': SCHEMA_VERSION,
+            'next_id': self._id_allocator.next_id,
+            'users': [user.to_dict() for user in self._users.values()]
+        }
+    
     def save_to_json(self, filename: str) -> Tuple[bool, str]:
         """
         Guarda los usuarios en un archivo JSON
         
+        El archivo lleva un usuario por línea y un cierre con el conteo y la
+        suma de verificación, calculada durante la escritura (ver verify_file).
+        
         Args:
             filename (str): Nombre del archivo
             
@@ -141,17 +545,25 @@ class UserService:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
         try:
-            data = [user.to_dict() for user in self.users]
-            if write_json_file(filename, data):
+            chunks = iter_json_document({'schema_version': SCHEMA_VERSION, 'next_id': self._id_allocator.next_id},
+                                        (user.to_dict() for user in self._users.values()))
+            if write_chunks_file(filename, chunks):
+                if self._email_filter is not None:
+                    self.save_email_filter(f"{filename}.bloom")
                 self._unsaved_changes = False
                 return True, f"Usuarios guardados en '{filename}'"
             return False, f"Error al guardar en '{filename}'"
         except Exception as e:
             return False, f"Error al guardar archivo JSON: {str(e)}"
 
-    def export_to_txt(self, filename: str) -> Tuple[bool, str]:
+    async def save_to_json_async(self, filename: str) -> Tuple[bool, str]:
         """
-        Guarda los usuarios en un archivo de texto
+        Variante asíncrona de save_to_json
+        
+        Toma una copia de los datos en el bucle de eventos y la escribe en el
+        pool de E/S de archivos, así que se pueden seguir atendiendo
+        operaciones mientras se guarda. Los cambios hechos durante la
+        escritura quedan pendientes de guardar.
         
         Args:
             filename (str): Nombre del archivo
@@ -160,12 +572,36 @@ class UserService:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
         try:
-            lines = []
-            for user in self.users:
-                line = f"{user.id}|{user.name}|{user.email}|{user.password_hash}|{user.created_at.isoformat()}"
-                lines.append(line)
+            sequence = self.events.last_sequence
+            data = self.export_data()
+            users = data.pop('users')
+            chunks = iter_json_document(data, users)
+            if await write_chunks_file_async(filename, chunks):
+                if self._email_filter is not None:
+                    self.save_email_filter(f"{filename}.bloom")
+                if self.events.last_sequence == sequence:
+                    self._unsaved_changes = False
+                return True, f"Usuarios guardados en '{filename}'"
+            return False, f"Error al guardar en '{filename}'"
+        except Exception as e:
+            return False, f"Error al guardar archivo JSON: {str(e)}"
+
+    def export_to_txt(self, filename: str) -> Tuple[bool, str]:
+        """
+        Guarda los usuarios en un archivo de texto, con cierre de verificación como save_to_json
+        
+        Args:
+            filename (str): Nombre del archivo
             
-            if write_text_file(filename, lines):
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            lines = (f"{user.id}|{user.name}|{user.email}|{user.password_hash}|{user.created_at.isoformat()}"
+                     for user in self._users.values())
+            chunks = iter_text_document({'schema_version': SCHEMA_VERSION, 'next_id': self._id_allocator.next_id},
+                                        lines)
+            if write_chunks_file(filename, chunks):
                 self._unsaved_changes = False
                 return True, f"Usuarios guardados en '{filename}'"
             return False, f"Error al guardar en '{filename}'"
@@ -186,21 +622,72 @@ class UserService:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
         try:
-            data = read_json_file(filename)
-            if data is None:
-                return False, f"No se pudo leer el archivo '{filename}'"
-            
-            self.users.clear()
-            User._next_id = 1  # Reiniciar contador de IDs
-            
-            for user_data in data:
-                user = User.from_dict(user_data)
-                self.users.append(user)
+            count = self._replace_from_json_bytes(read_binary_file(filename), filename)
+        except Exception as e:
+            return False, f"Error al cargar archivo JSON: {str(e)}"
+        self._publish_loaded(filename)
+        return True, f"Se cargaron {count} usuarios desde '{filename}'"
+    
+    async def load_from_json_async(self, filename: str) -> Tuple[bool, str]:
+        """
+        Variante asíncrona de load_from_json
+        
+        La lectura, la verificación, el parseo y la construcción de usuarios e
+        índices se hacen en el pool de E/S de archivos, sobre un servicio
+        auxiliar que comparte el asignador de IDs. En el bucle de eventos solo
+        se intercambia el estado ya construido, así que el servicio nunca se
+        ve a medio cargar y el bucle sigue atendiendo otras tareas (el hilo
+        del pool cede el GIL periódicamente).
+        
+        Args:
+            filename (str): Nombre del archivo
             
-            self._unsaved_changes = False
-            return True, f"Se cargaron {len(self.users)} usuarios desde '{filename}'"
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            raw = await read_binary_file_async(filename)
+            staging = UserService(self._id_allocator, email_filter=self._email_filter is not None,
+                                  bulk_load_gc=self.bulk_load_gc)
+            count = await asyncio.get_running_loop().run_in_executor(
+                get_file_io_executor(), staging._replace_from_json_bytes, raw, filename)
         except Exception as e:
             return False, f"Error al cargar archivo JSON: {str(e)}"
+        self._restore_state(staging._snapshot_state())
+        self._unsaved_changes = staging._unsaved_changes
+        self._publish_loaded(filename)
+        return True, f"Se cargaron {count} usuarios desde '{filename}'"
+
+    def load_resumable(self, filename: str,
+                       checkpoint_every: int = IMPORT_CHECKPOINT_RECORDS) -> Tuple[bool, str]:
+        """
+        Carga usuarios desde un archivo JSON o NDJSON grande con puntos de control
+
+        Los usuarios se preparan aparte y solo reemplazan a los actuales si la
+        lectura termina bien. Si falla o se interrumpe, los usuarios actuales
+        no cambian y una nueva llamada retoma desde el último punto de control
+        (ver src.services.resumable_import).
+
+        Args:
+            filename (str): Nombre del archivo
+            checkpoint_every (int): Registros entre puntos de control
+
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            with bulk_load_gc(self.bulk_load_gc):
+                result = import_resumable(filename, checkpoint_every)
+                count = self._replace_users(result.users, result.next_id)
+            # Solo tras el reemplazo: si fallara, la importación se podría reanudar
+            discard_checkpoint(filename)
+            self._publish_loaded(filename)
+            if result.resumed_from:
+                return True, (f"Se cargaron {count} usuarios desde '{filename}' "
+                              f"(reanudado desde el registro {result.resumed_from})")
+            return True, f"Se cargaron {count} usuarios desde '{filename}'"
+        except Exception as e:
+            return False, f"Error en la importación de '{filename}' (se puede reanudar): {str(e)}"
 
     def load_from_txt(self, filename: str) -> Tuple[bool, str]:
         """
@@ -213,35 +700,303 @@ class UserService:
             Tuple[bool, str]: Tupla con (éxito, mensaje)
         """
         try:
-            lines = read_text_file(filename)
-            if lines is None:
+            raw = read_binary_file(filename)
+            if raw is None:
                 return False, f"No se pudo leer el archivo '{filename}'"
+            integrity = verify_bytes(raw, 'txt')
+            if not integrity.ok:
+                return False, f"El archivo '{filename}' está dañado: {integrity.message}"
             
-            self.users.clear()
-            User._next_id = 1  # Reiniciar contador de IDs
-            
-            count = 0
-            for line in lines:
-                line = line.strip()
-                if line:
-                    parts = line.split('|')
-                    if len(parts) == 5:
-                        user_data = {
-                            'id': int(parts[0]),
-                            'name': parts[1],
-                            'email': parts[2],
-                            'password_hash': parts[3],
-                            'created_at': parts[4]
-                        }
-                        user = User.from_dict(user_data)
-                        self.users.append(user)
-                        count += 1
-            
-            self._unsaved_changes = False
+            with bulk_load_gc(self.bulk_load_gc):
+                users = []
+                next_id = 1
+                skipped = 0
+                from_fields = User.from_fields
+                # Línea a línea sobre los bytes: sin copia decodificada del archivo ni lista de líneas
+                for line in io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8', newline='\n'):
+                    line = line.strip()
+                    if line.startswith('#'):
+                        # Línea de metadatos, por ejemplo "# next_id=42"
+                        key, _, value = line[1:].strip().partition('=')
+                        if key == 'next_id' and value.isdigit():
+                            next_id = int(value)
+                        elif key == 'schema_version':
+                            resolve_version(value)
+                    elif line:
+                        parts = line.split('|')
+                        if len(parts) == 5:
+                            users.append(from_fields(int(parts[0]), parts[1], parts[2], parts[3], parts[4]))
+                        else:
+                            skipped += 1
+                
+                count = self._replace_users(users, next_id)
+            self._publish_loaded(filename)
+            if skipped:
+                return True, f"Se cargaron {count} usuarios desde '{filename}' ({skipped} líneas inválidas omitidas)"
             return True, f"Se cargaron {count} usuarios desde '{filename}'"
         except Exception as e:
             return False, f"Error al cargar archivo TXT: {str(e)}"
             
+    """
+    Formatos por líneas: NDJSON y CSV
+    """
+
+    def save_to_ndjson(self, filename: str, users: Optional[Iterable[User]] = None,
+                       append: bool = False) -> Tuple[bool, str]:
+        """
+        Guarda usuarios en un archivo NDJSON (un usuario por línea)
+        
+        Args:
+            filename (str): Nombre del archivo
+            users (Iterable[User], optional): Usuarios a exportar. Por defecto, todos
+            append (bool): Agrega al final del archivo (exportación incremental, por
+                ejemplo con los usuarios de find_by_created_range desde la última)
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            selected = self._users.values() if users is None else users
+            if write_ndjson_file(filename, (user.to_dict() for user in selected), append=append):
+                if users is None and not append:
+                    self._unsaved_changes = False
+                return True, f"Usuarios guardados en '{filename}'"
+            return False, f"Error al guardar en '{filename}'"
+        except Exception as e:
+            return False, f"Error al guardar archivo NDJSON: {str(e)}"
+    
+    def save_to_csv(self, filename: str, users: Optional[Iterable[User]] = None,
+                    append: bool = False) -> Tuple[bool, str]:
+        """
+        Guarda usuarios en un archivo CSV (RFC 4180)
+        
+        Args:
+            filename (str): Nombre del archivo
+            users (Iterable[User], optional): Usuarios a exportar. Por defecto, todos
+            append (bool): Agrega filas al final sin repetir la cabecera
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            selected = self._users.values() if users is None else users
+            if write_csv_file(filename, (user.to_dict() for user in selected), CSV_FIELDS, append=append):
+                if users is None and not append:
+                    self._unsaved_changes = False
+                return True, f"Usuarios guardados en '{filename}'"
+            return False, f"Error al guardar en '{filename}'"
+        except Exception as e:
+            return False, f"Error al guardar archivo CSV: {str(e)}"
+    
+    def load_from_ndjson(self, filename: str, workers: int = 1) -> Tuple[bool, str]:
+        """
+        Carga usuarios desde un archivo NDJSON
+        
+        Con workers > 1 el archivo se divide en rangos de bytes que se
+        decodifican en paralelo en procesos separados.
+        
+        Args:
+            filename (str): Nombre del archivo
+            workers (int): Procesos para decodificar el archivo
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            if workers > 1:
+                ranges = split_file_ranges(filename, workers)
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunks = executor.map(read_ndjson_range, [filename] * len(ranges),
+                                          [start for start, _ in ranges], [end for _, end in ranges])
+                    records = [record for chunk in chunks for record in chunk]
+            else:
+                records = iter_ndjson_file(filename)
+            
+            with bulk_load_gc(self.bulk_load_gc):
+                # Sin cabecera: la versión se deduce de cada registro
+                count = self._replace_users(User.from_dict(record)
+                                            for record in migrate_records(records, None, workers))
+            self._publish_loaded(filename)
+            return True, f"Se cargaron {count} usuarios desde '{filename}'"
+        except Exception as e:
+            return False, f"Error al cargar archivo NDJSON: {str(e)}"
+    
+    def load_from_csv(self, filename: str) -> Tuple[bool, str]:
+        """
+        Carga usuarios desde un archivo CSV con las columnas de CSV_FIELDS
+        
+        Args:
+            filename (str): Nombre del archivo
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            rows = iter_csv_file(filename)
+            # Sin ID solo se admiten filas v1 (la migración les deja id None)
+            records = ({**row, 'id': int(row['id'])} if row.get('id') else
+                       {key: value for key, value in row.items() if key != 'id'} for row in rows)
+            with bulk_load_gc(self.bulk_load_gc):
+                count = self._replace_users(User.from_dict(record)
+                                            for record in migrate_records(records, None))
+            self._publish_loaded(filename)
+            return True, f"Se cargaron {count} usuarios desde '{filename}'"
+        except Exception as e:
+            return False, f"Error al cargar archivo CSV: {str(e)}"
+    
+    """
+    Filtro de Bloom de emails
+    """
+
+    def save_email_filter(self, filename: str) -> Tuple[bool, str]:
+        """
+        Guarda el filtro de Bloom de emails en un archivo binario
+        
+        Args:
+            filename (str): Nombre del archivo
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        if self._email_filter is None:
+            return False, "El filtro de emails no está activado"
+        if write_binary_file(filename, self._email_filter.to_bytes()):
+            return True, f"Filtro de emails guardado en '{filename}'"
+        return False, f"Error al guardar en '{filename}'"
+    
+    def load_email_filter(self, filename: str) -> Tuple[bool, str]:
+        """
+        Carga un filtro de Bloom de emails guardado con save_email_filter
+        
+        Útil cuando los usuarios no se mantienen en memoria: el filtro evita
+        consultar el almacenamiento para la mayoría de emails nuevos.
+        
+        El archivo puede ser de otra versión de los datos. Un filtro con menos
+        elementos que usuarios, o al que le falta el email de alguno de una
+        muestra (el más reciente incluido), no se instala: se reconstruye a
+        partir de los usuarios actuales.
+        
+        Args:
+            filename (str): Nombre del archivo
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        data = read_binary_file(filename)
+        if data is None:
+            return False, f"No se pudo leer el archivo '{filename}'"
+        try:
+            email_filter = BloomFilter.from_bytes(data)
+        except ValueError as e:
+            return False, f"Error al cargar filtro de emails: {str(e)}"
+        
+        self._email_filter = email_filter
+        if not self._email_filter_matches(email_filter):
+            self._rebuild_email_filter()
+            return True, (f"El filtro de '{filename}' no corresponde a los usuarios actuales; "
+                          f"se reconstruyó")
+        return True, f"Filtro de emails cargado desde '{filename}'"
+    
+    def _email_filter_matches(self, email_filter: BloomFilter) -> bool:
+        """
+        Comprueba que un filtro cargado contiene a los usuarios actuales
+        
+        Un filtro de Bloom no tiene falsos negativos: un email ausente indica
+        que el filtro es de otros datos.
+        
+        Args:
+            email_filter (BloomFilter): Filtro a comprobar
+            
+        Returns:
+            bool: True si el conteo y la muestra coinciden
+        """
+        if len(email_filter) < len(self._users):
+            return False
+        if not self._users:
+            return True
+        step = max(1, len(self._users) // EMAIL_FILTER_CHECK_SAMPLE)
+        sample = chain(islice(self._users.values(), 0, None, step), [next(reversed(self._users.values()))])
+        return all(user.email.lower() in email_filter for user in sample)
+    
+    def email_filter_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas de uso del filtro de emails
+        
+        Returns:
+            Dict[str, Any]: checks (consultas), rejected (descartadas sin consulta
+                autoritativa), passed (requirieron consulta), false_positives y
+                las tasas correspondientes
+        """
+        stats = dict(self._email_filter_stats)
+        checks = stats['checks']
+        stats['enabled'] = self._email_filter is not None
+        stats['reject_rate'] = stats['rejected'] / checks if checks else 0.0
+        stats['false_positive_rate'] = stats['false_positives'] / checks if checks else 0.0
+        return stats
+    
+    """
+    Caché de snapshots
+    """
+
+    def load_cached(self, filename: str) -> Tuple[bool, str]:
+        """
+        Carga usuarios desde un archivo usando su snapshot si el archivo no cambió
+        
+        Con un snapshot válido (mismo tamaño, fecha y contenido del archivo, ver
+        src.services.snapshot_cache) se restauran usuarios e índices sin volver
+        a leer el archivo. Si no, el archivo se carga según su extensión y se
+        guarda un snapshot para la próxima vez.
+        
+        Args:
+            filename (str): Nombre del archivo (json, txt, ndjson, jsonl o csv)
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        loaders = {'.json': self.load_from_json, '.txt': self.load_from_txt, '.ndjson': self.load_from_ndjson,
+                   '.jsonl': self.load_from_ndjson, '.csv': self.load_from_csv}
+        loader = loaders.get(os.path.splitext(filename)[1].lower())
+        if loader is None:
+            return False, f"Formato no soportado: '{filename}'"
+        try:
+            # La clave se toma antes de leer: si el archivo cambia durante la carga, el snapshot no valdrá
+            key = source_key(filename)
+            with bulk_load_gc(self.bulk_load_gc):
+                state = read_snapshot(filename, key)
+                if state is not None:
+                    self._restore_state(state)
+        except Exception as e:
+            return False, f"Error al cargar archivo: {str(e)}"
+        if state is not None:
+            self._publish_loaded(filename)
+            return True, f"Se cargaron {len(self._users)} usuarios desde el snapshot de '{filename}'"
+        
+        success, message = loader(filename)
+        # Con cambios sin guardar (IDs asignados a registros antiguos) el estado ya no refleja el archivo
+        if success and not self._unsaved_changes and not write_snapshot(filename, key, self._snapshot_state()):
+            message += " (no se pudo guardar el snapshot)"
+        return success, message
+    
+    def save_snapshot(self, filename: str) -> Tuple[bool, str]:
+        """
+        Guarda un snapshot del estado actual asociado a un archivo
+        
+        Debe llamarse justo después de guardar o cargar ese archivo: el
+        snapshot se asocia a su contenido actual y se usará en lugar de él.
+        
+        Args:
+            filename (str): Archivo que contiene exactamente los usuarios actuales
+            
+        Returns:
+            Tuple[bool, str]: Tupla con (éxito, mensaje)
+        """
+        try:
+            if write_snapshot(filename, source_key(filename), self._snapshot_state()):
+                return True, f"Snapshot de '{filename}' guardado"
+            return False, f"No se pudo guardar el snapshot de '{filename}'"
+        except Exception as e:
+            return False, f"Error al guardar el snapshot: {str(e)}"
+    
     def has_unsaved_changes(self) -> bool:
         """
         Verifica si hay cambios sin guardar
@@ -251,6 +1006,196 @@ class UserService:
         """
         return self._unsaved_changes
     
+    def _validate_user_data(self, name: str, email: str, password: Optional[str],
+                            check_password: bool = True) -> Optional[str]:
+        """
+        Valida los datos básicos de un usuario
+        
+        Args:
+            name (str): Nombre del usuario
+            email (str): Email del usuario
+            password (str): Contraseña del usuario
+            check_password (bool): False para registros que ya traen el hash
+            
+        Returns:
+            Optional[str]: Mensaje de error, o None si los datos son válidos
+        """
+        if not name or not name.strip():
+            return "El nombre no puede estar vacío"
+        
+        if not email or '@' not in email:
+            return "El email no es válido"
+        
+        if check_password and (not password or len(password) < 6):
+            return "La contraseña debe tener al menos 6 caracteres"
+        
+        return None
+    
+    def _replace_users(self, users: Iterable[User], next_id: int = 1) -> int:
+        """
+        Sustituye todos los usuarios y reconstruye IDs e índices
+        
+        Los usuarios se construyen antes de tocar la lista actual, de modo que
+        un error a mitad de la lectura no deja el servicio vacío. Los que
+        llegan sin ID (registros v1 migrados) reciben uno del asignador por
+        encima del mayor ID cargado, van al final y dejan cambios sin guardar.
+        
+        Args:
+            users (Iterable[User]): Nuevos usuarios
+            next_id (int): Marca de agua de IDs persistida, si la hay
+            
+        Returns:
+            int: Cantidad de usuarios cargados
+        """
+        by_id: Dict[int, User] = {}
+        missing: List[User] = []
+        for user in users:
+            if user.id is None:
+                missing.append(user)
+            elif user.id in by_id:
+                raise ValueError(f"ID de usuario repetido: {user.id}")
+            else:
+                by_id[user.id] = user
+        self._users = by_id
+        self._reset_id_allocator(next_id)
+        for user, user_id in zip(missing, self._id_allocator.reserve(len(missing))):
+            user.id = user_id
+            by_id[user_id] = user
+        self._rebuild_indexes()
+        self._unsaved_changes = bool(missing)
+        return len(self._users)
+    
+    def _replace_from_json_bytes(self, raw: Optional[bytes], filename: str) -> int:
+        """
+        Verifica y reemplaza los usuarios por el contenido de un archivo JSON
+        
+        No publica el evento LOADED: de eso se encarga quien llama.
+        
+        Args:
+            raw (bytes, optional): Contenido del archivo (None si no se pudo leer)
+            filename (str): Nombre del archivo, para mensajes
+            
+        Returns:
+            int: Cantidad de usuarios cargados
+            
+        Raises:
+            IOError: Si el archivo no se pudo leer
+            ValueError: Si el archivo está dañado, no es JSON válido o trae IDs repetidos
+        """
+        if raw is None:
+            raise IOError(f"No se pudo leer el archivo '{filename}'")
+        integrity = verify_bytes(raw, 'json')
+        if not integrity.ok:
+            raise ValueError(f"El archivo '{filename}' está dañado: {integrity.message}")
+        with bulk_load_gc(self.bulk_load_gc):
+            data = json.loads(raw)
+            
+            # Formato actual: {'schema_version': V, 'next_id': N, 'users': [...]}; formato antiguo: lista
+            declared = None
+            if isinstance(data, dict):
+                next_id = data.get('next_id', 1)
+                declared = data.get('schema_version')
+                data = data.pop('users', [])
+            else:
+                next_id = 1
+            version = resolve_version(declared)
+            
+            users: List[Optional[User]] = [None] * len(data)
+            for index, user_data in enumerate(migrate_records(data, version)):
+                users[index] = User.from_dict(user_data)
+                data[index] = None  # Libera el diccionario en cuanto se usó (menor pico de memoria)
+            return self._replace_users(users, next_id)
+    
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Usuarios e índices que guarda la caché de snapshots"""
+        return {
+            'users': self._users,
+            'users_by_email': self._users_by_email,
+            'created_index': self._created_index,
+            'name_index': self._name_index,
+            'aggregates': self._aggregates,
+            'email_filter': self._email_filter,
+            'next_id': self._id_allocator.next_id
+        }
+    
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Reemplaza usuarios e índices por los de un snapshot
+        
+        Args:
+            state (Dict[str, Any]): Estado devuelto por _snapshot_state
+            
+        Raises:
+            KeyError: Si al estado le falta alguna parte (el servicio no cambia)
+        """
+        users, users_by_email = state['users'], state['users_by_email']
+        created_index, name_index = state['created_index'], state['name_index']
+        aggregates, email_filter, next_id = state['aggregates'], state['email_filter'], state['next_id']
+        
+        self._users = users
+        self._users_by_email = users_by_email
+        self._created_index = created_index
+        self._name_index = name_index
+        self._aggregates = aggregates
+        self._reset_id_allocator(next_id)
+        self._unsaved_changes = False
+        # El filtro de emails sigue la configuración de este servicio, no la del snapshot
+        if self._email_filter is not None:
+            if email_filter is None:
+                self._rebuild_email_filter()
+            else:
+                self._email_filter = email_filter
+    
+    def _publish_loaded(self, source: str) -> None:
+        """
+        Publica que todos los usuarios fueron reemplazados por una carga
+        
+        Args:
+            source (str): Archivo de origen
+        """
+        self.events.publish(EventType.LOADED, data={'source': source, 'count': len(self._users)})
+    
+    def _reset_id_allocator(self, next_id: int) -> None:
+        """
+        Adelanta la marca de agua de IDs tras una carga
+        
+        Solo avanza: el asignador puede estar compartido con otros servicios
+        que ya entregaron IDs mayores que los del archivo cargado.
+        
+        Args:
+            next_id (int): Marca de agua persistida en el archivo
+        """
+        highest = max(self._users, default=0)
+        self._id_allocator.observe(max(next_id - 1, highest))
+    
+    def _email_taken(self, email: str) -> bool:
+        """
+        Verifica si un email ya existe consultando antes el filtro de Bloom
+        
+        Si el filtro asegura que el email no existe se evita la verificación
+        autoritativa, que en un almacenamiento en disco sería una lectura.
+        
+        Args:
+            email (str): Email a verificar
+            
+        Returns:
+            bool: True si el email ya existe
+        """
+        if self._email_filter is None:
+            return self._email_exists(email)
+        
+        stats = self._email_filter_stats
+        stats['checks'] += 1
+        if email.lower() not in self._email_filter:
+            stats['rejected'] += 1
+            return False
+        
+        stats['passed'] += 1
+        exists = self._email_exists(email)
+        if not exists:
+            stats['false_positives'] += 1
+        return exists
+    
     def _email_exists(self, email: str) -> bool:
         """
         Verifica si un email ya existe
@@ -261,4 +1206,62 @@ class UserService:
         Returns:
             bool: True si el email ya existe
         """
-        return any(user.email.lower() == email.lower() for user in self.users)
\ No newline at end of file
+        return email.lower() in self._users_by_email
+    
+    def _add_user(self, user: User) -> None:
+        """
+        Agrega un usuario ya validado, lo indexa y publica su alta
+        
+        Args:
+            user (User): Usuario con ID y email libres
+        """
+        self._users[user.id] = user
+        self._index_user(user)
+        self._id_allocator.observe(user.id)
+        self.events.publish(EventType.REGISTERED, user.id, user.to_dict())
+    
+    def _index_user(self, user: User) -> None:
+        """
+        Agrega un usuario a los índices secundarios
+        
+        Args:
+            user (User): Usuario agregado
+        """
+        self._users_by_email[user.email.lower()] = user
+        self._created_index.insert(user.created_at, user.id, user)
+        self._name_index.add(user, user.name)
+        self._aggregates.add(user)
+        if self._email_filter is not None:
+            if self._email_filter.is_saturated():
+                self._rebuild_email_filter()
+            self._email_filter.add(user.email.lower())
+    
+    def _unindex_user(self, user: User) -> None:
+        """
+        Quita un usuario de los índices secundarios
+        
+        Args:
+            user (User): Usuario eliminado
+        """
+        self._users_by_email.pop(user.email.lower(), None)
+        self._created_index.remove(user.created_at, user.id)
+        self._name_index.remove(user)
+        self._aggregates.remove(user)
+    
+    def _rebuild_indexes(self) -> None:
+        """Reconstruye todos los índices secundarios a partir de los usuarios"""
+        users = self._users.values()
+        self._users_by_email = {user.email.lower(): user for user in users}
+        self._created_index.rebuild((user.created_at, user.id, user) for user in users)
+        self._name_index.clear()
+        for user in users:
+            self._name_index.add(user, user.name)
+        self._aggregates.rebuild(users)
+        if self._email_filter is not None:
+            self._rebuild_email_filter()
+    
+    def _rebuild_email_filter(self) -> None:
+        """Reconstruye el filtro de emails con holgura para el doble de usuarios"""
+        capacity = max(EMAIL_FILTER_CAPACITY, 2 * len(self._users))
+        self._email_filter = BloomFilter(capacity, self._email_filter.false_positive_rate)
+        self._email_filter.update(user.email.lower() for user in self._users.values())
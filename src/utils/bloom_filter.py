@@ -0,0 +1,134 @@
+"""
+Filtro de Bloom
+Estructura probabilística para descartar rápidamente elementos inexistentes
+"""
+
+import hashlib
+import math
+import struct
+from typing import Iterable
+
+_MAGIC = b'BLM1'
+# magic, bits, hashes, elementos agregados, capacidad, tasa de falsos positivos
+_HEADER = struct.Struct('<4sQIQQd')
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre cadenas
+
+    Responde "seguro que no está" o "puede que esté". No admite borrados:
+    un elemento eliminado sigue dando positivo, lo que solo se traduce en
+    una consulta autoritativa de más.
+    """
+
+    def __init__(self, capacity: int = 100000, false_positive_rate: float = 0.01):
+        """
+        Inicializa un filtro dimensionado para una capacidad y tasa de error
+
+        Args:
+            capacity (int): Número de elementos esperado
+            false_positive_rate (float): Tasa de falsos positivos deseada (0 < p < 1)
+
+        Raises:
+            ValueError: Si los parámetros están fuera de rango
+        """
+        if capacity <= 0:
+            raise ValueError("La capacidad del filtro debe ser positiva")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("La tasa de falsos positivos debe estar entre 0 y 1")
+
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _positions(self, item: str):
+        """Calcula las posiciones de bit con doble hashing sobre BLAKE2b"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first, second = struct.unpack('<QQ', digest)
+        second |= 1  # Impar para recorrer todas las posiciones
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """
+        Agrega un elemento al filtro
+
+        Args:
+            item (str): Elemento a agregar
+        """
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        """
+        Agrega varios elementos al filtro
+
+        Args:
+            items (Iterable[str]): Elementos a agregar
+        """
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def is_saturated(self) -> bool:
+        """
+        Indica si se superó la capacidad para la que se dimensionó el filtro
+
+        Returns:
+            bool: True si la tasa de falsos positivos ya no está garantizada
+        """
+        return self.count > self.capacity
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa el filtro
+
+        Returns:
+            bytes: Cabecera seguida del arreglo de bits
+        """
+        header = _HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count,
+                              self.capacity, self.false_positive_rate)
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BloomFilter':
+        """
+        Reconstruye un filtro serializado con to_bytes
+
+        Args:
+            data (bytes): Datos serializados
+
+        Returns:
+            BloomFilter: Filtro reconstruido
+
+        Raises:
+            ValueError: Si los datos no tienen el formato esperado
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Datos de filtro de Bloom truncados")
+
+        magic, num_bits, num_hashes, count, capacity, rate = _HEADER.unpack_from(data)
+        bits = data[_HEADER.size:]
+        if magic != _MAGIC or len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Datos de filtro de Bloom inválidos")
+
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.false_positive_rate = rate
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.count = count
+        bloom._bits = bytearray(bits)
+        return bloom
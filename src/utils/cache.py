@@ -0,0 +1,162 @@
+"""
+Caché LRU con expiración
+Caché acotada por entradas y por peso, con TTL y contadores de uso
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Valor devuelto por get cuando la clave no está en la caché
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Caché LRU con tiempo de vida por entrada
+
+    Las entradas se desalojan por antigüedad de uso cuando se supera
+    max_entries o el peso total (max_weight, calculado con `weigher`), y
+    caducan ttl segundos después de guardarse. Lleva contadores de aciertos,
+    fallos, desalojos, caducidades e invalidaciones.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None,
+                 max_weight: Optional[int] = None,
+                 weigher: Optional[Callable[[Any], int]] = None):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries (int): Número máximo de entradas
+            ttl (float, optional): Segundos de vida de cada entrada (None = sin caducidad)
+            max_weight (int, optional): Peso total máximo (None = sin límite)
+            weigher (Callable[[Any], int], optional): Calcula el peso de un valor (por defecto 1)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self._weigher = weigher or (lambda value: 1)
+        # clave -> (valor, peso, instante de caducidad)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Obtiene un valor y lo marca como usado recientemente
+
+        Args:
+            key (Hashable): Clave buscada
+
+        Returns:
+            Any: Valor guardado, o MISSING si no está o caducó
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return MISSING
+
+            value, _, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Guarda un valor, desalojando las entradas menos usadas si hace falta
+
+        Args:
+            key (Hashable): Clave
+            value (Any): Valor a guardar
+        """
+        weight = self._weigher(value)
+        if self.max_weight is not None and weight > self.max_weight:
+            return  # Nunca cabría: no vale la pena vaciar la caché por él
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, weight, expires_at)
+            self._weight += weight
+
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_weight is not None and self._weight > self.max_weight)):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters['evictions'] += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Elimina una entrada concreta
+
+        Args:
+            key (Hashable): Clave a eliminar
+
+        Returns:
+            bool: True si la entrada existía
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._counters['invalidations'] += 1
+            return True
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Elimina las entradas que cumplen una condición
+
+        Args:
+            predicate (Callable[[Hashable, Any], bool]): Recibe (clave, valor)
+
+        Returns:
+            int: Cantidad de entradas eliminadas
+        """
+        with self._lock:
+            doomed = [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                self._remove(key)
+            self._counters['invalidations'] += len(doomed)
+            return len(doomed)
+
+    def clear(self) -> None:
+        """Vacía la caché (cuenta como invalidación de todas las entradas)"""
+        with self._lock:
+            self._counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los contadores de uso
+
+        Returns:
+            Dict[str, Any]: hits, misses, evictions, expirations, invalidations,
+                entries, weight y hit_rate
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['weight'] = self._weight
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def _remove(self, key: Hashable) -> None:
+        """Quita una entrada y descuenta su peso (llamar con el lock tomado)"""
+        _, weight, _ = self._entries.pop(key)
+        self._weight -= weight
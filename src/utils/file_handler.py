@@ -4,8 +4,25 @@ Funciones auxiliares para operaciones con archivos
 """
 
 import os
+import io
+import csv
 import json
-from typing import Dict, List, Any, Optional
+import asyncio
+import codecs
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional, Iterable, Iterator, TextIO, Tuple
+from src.config.settings import FILE_IO_MAX_WORKERS, FILE_IO_CHUNK_SIZE
+
+# Pool dedicado a la E/S de archivos de las variantes asíncronas (se crea al primer uso)
+_file_io_executor: Optional[ThreadPoolExecutor] = None
+_file_io_executor_lock = threading.Lock()
+
+
+class OperationCancelled(Exception):
+    """La operación de archivo se canceló entre dos bloques"""
+    pass
 
 
 def ensure_directory_exists(filepath: str) -> None:
@@ -33,7 +50,7 @@ def file_exists(filepath: str) -> bool:
     return os.path.isfile(filepath)
 
 
-def read_json_file(filepath: str) -> Optional[List[Dict[str, Any]]]:
+def read_json_file(filepath: str) -> Optional[Any]:
     """
     Lee un archivo JSON y devuelve su contenido
     
@@ -41,7 +58,7 @@ def read_json_file(filepath: str) -> Optional[List[Dict[str, Any]]]:
         filepath (str): Ruta del archivo JSON
         
     Returns:
-        Optional[List[Dict[str, Any]]]: Contenido del archivo o None si hay error
+        Optional[Any]: Contenido del archivo o None si hay error
     """
     try:
         if not file_exists(filepath):
@@ -54,23 +71,23 @@ def read_json_file(filepath: str) -> Optional[List[Dict[str, Any]]]:
         return None
 
 
-def write_json_file(filepath: str, data: List[Dict[str, Any]]) -> bool:
+def write_json_file(filepath: str, data: Any) -> bool:
     """
     Escribe datos en un archivo JSON
     
+    La escritura es atómica: se escribe un temporal en el mismo directorio
+    y se renombra sobre el destino, así que un error a mitad de camino
+    nunca deja el archivo anterior truncado.
+    
     Args:
         filepath (str): Ruta del archivo JSON
-        data (List[Dict[str, Any]]): Datos a escribir
+        data (Any): Datos a escribir (lista o diccionario serializable)
         
     Returns:
         bool: True si se escribió exitosamente
     """
     try:
-        ensure_directory_exists(filepath)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
+        _write_atomic(filepath, _iter_json_chunks(data))
         return True
     except IOError as e:
         print(f"Error al escribir archivo JSON '{filepath}': {e}")
@@ -100,7 +117,7 @@ def read_text_file(filepath: str) -> Optional[List[str]]:
 
 def write_text_file(filepath: str, lines: List[str]) -> bool:
     """
-    Escribe líneas en un archivo de texto
+    Escribe líneas en un archivo de texto (de forma atómica, como write_json_file)
     
     Args:
         filepath (str): Ruta del archivo de texto
@@ -110,18 +127,760 @@ def write_text_file(filepath: str, lines: List[str]) -> bool:
         bool: True si se escribió exitosamente
     """
     try:
-        ensure_directory_exists(filepath)
+        _write_atomic(filepath, _iter_text_chunks(lines))
+        return True
+    except IOError as e:
+        print(f"Error al escribir archivo de texto '{filepath}': {e}")
+        return False
+
+
+async def read_json_file_async(filepath: str, chunk_size: int = FILE_IO_CHUNK_SIZE) -> Optional[Any]:
+    """
+    Variante asíncrona de read_json_file
+    
+    Lee el archivo por bloques en el pool de E/S de archivos sin bloquear el
+    bucle de eventos. Si la tarea se cancela, la lectura se detiene en el
+    siguiente bloque.
+    
+    Args:
+        filepath (str): Ruta del archivo JSON
+        chunk_size (int): Bytes leídos por bloque
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            for line in lines:
-                f.write(f"{line}\n")
+    Returns:
+        Optional[Any]: Contenido del archivo o None si hay error
+    """
+    return await _run_file_io(_read_json_chunked, filepath, chunk_size)
+
+
+async def write_json_file_async(filepath: str, data: Any, chunk_size: int = FILE_IO_CHUNK_SIZE) -> bool:
+    """
+    Variante asíncrona de write_json_file
+    
+    Serializa y escribe por bloques en el pool de E/S de archivos con la
+    misma escritura atómica. Si la tarea se cancela, la escritura se
+    detiene en el siguiente bloque, se borra el temporal y el archivo
+    anterior queda intacto. `data` no debe modificarse hasta que termine.
+    
+    Args:
+        filepath (str): Ruta del archivo JSON
+        data (Any): Datos a escribir (lista o diccionario serializable)
+        chunk_size (int): Caracteres escritos por bloque
         
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    return await _run_file_io(_write_json_chunked, filepath, data, chunk_size)
+
+
+async def read_text_file_async(filepath: str, chunk_size: int = FILE_IO_CHUNK_SIZE) -> Optional[List[str]]:
+    """
+    Variante asíncrona de read_text_file (ver read_json_file_async)
+    
+    Args:
+        filepath (str): Ruta del archivo de texto
+        chunk_size (int): Bytes leídos por bloque
+        
+    Returns:
+        Optional[List[str]]: Líneas del archivo o None si hay error
+    """
+    return await _run_file_io(_read_text_chunked, filepath, chunk_size)
+
+
+async def write_text_file_async(filepath: str, lines: List[str], chunk_size: int = FILE_IO_CHUNK_SIZE) -> bool:
+    """
+    Variante asíncrona de write_text_file (ver write_json_file_async)
+    
+    Args:
+        filepath (str): Ruta del archivo de texto
+        lines (List[str]): Líneas a escribir
+        chunk_size (int): Caracteres escritos por bloque
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    return await _run_file_io(_write_text_chunked, filepath, lines, chunk_size)
+
+
+async def read_binary_file_async(filepath: str, chunk_size: int = FILE_IO_CHUNK_SIZE) -> Optional[bytes]:
+    """
+    Variante asíncrona de read_binary_file (ver read_json_file_async)
+    
+    Args:
+        filepath (str): Ruta del archivo
+        chunk_size (int): Bytes leídos por bloque
+        
+    Returns:
+        Optional[bytes]: Contenido del archivo o None si hay error
+    """
+    return await _run_file_io(_read_binary_chunked, filepath, chunk_size)
+
+
+async def write_chunks_file_async(filepath: str, chunks: Iterable[bytes]) -> bool:
+    """
+    Variante asíncrona de write_chunks_file (ver write_json_file_async)
+    
+    Los bloques se generan en el hilo del pool, así que no deben depender de
+    datos que se modifiquen mientras tanto.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        chunks (Iterable[bytes]): Bloques a escribir, en orden
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    return await _run_file_io(_write_chunks_cancellable, filepath, chunks)
+
+
+def get_file_io_executor() -> ThreadPoolExecutor:
+    """
+    Obtiene el pool de hilos de las operaciones de archivo asíncronas
+    
+    Tiene FILE_IO_MAX_WORKERS hilos como máximo; las operaciones que no
+    caben esperan en cola, así que la E/S concurrente queda acotada.
+    
+    Returns:
+        ThreadPoolExecutor: Pool compartido
+    """
+    global _file_io_executor
+    with _file_io_executor_lock:
+        if _file_io_executor is None:
+            _file_io_executor = ThreadPoolExecutor(max_workers=FILE_IO_MAX_WORKERS,
+                                                   thread_name_prefix='file-io')
+        return _file_io_executor
+
+
+def shutdown_file_io_executor(wait: bool = True) -> None:
+    """
+    Cierra el pool de E/S de archivos (se vuelve a crear si se usa de nuevo)
+    
+    Args:
+        wait (bool): Espera a que terminen las operaciones en curso
+    """
+    global _file_io_executor
+    with _file_io_executor_lock:
+        executor, _file_io_executor = _file_io_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def _run_file_io(func: Callable[..., Any], *args) -> Any:
+    """
+    Ejecuta una operación de archivo en el pool, propagando la cancelación
+    
+    La función recibe como último argumento un threading.Event que se activa
+    si la tarea que espera se cancela; debe consultarlo entre bloques.
+    """
+    cancel = threading.Event()
+    future = asyncio.get_running_loop().run_in_executor(get_file_io_executor(), func, *args, cancel)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+
+
+def _read_chunked(filepath: str, chunk_size: int, cancel: threading.Event) -> bytes:
+    """Lee un archivo completo por bloques, comprobando la cancelación entre bloques"""
+    chunks = []
+    with open(filepath, 'rb') as f:
+        while True:
+            if cancel.is_set():
+                raise OperationCancelled(filepath)
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def _read_binary_chunked(filepath: str, chunk_size: int, cancel: threading.Event) -> Optional[bytes]:
+    """Cuerpo de read_binary_file_async (se ejecuta en el pool)"""
+    try:
+        if not file_exists(filepath):
+            return None
+        return _read_chunked(filepath, chunk_size, cancel)
+    except OperationCancelled:
+        return None
+    except IOError as e:
+        print(f"Error al leer archivo binario '{filepath}': {e}")
+        return None
+
+
+def _read_json_chunked(filepath: str, chunk_size: int, cancel: threading.Event) -> Optional[Any]:
+    """Cuerpo de read_json_file_async (se ejecuta en el pool)"""
+    try:
+        if not file_exists(filepath):
+            return None
+        return json.loads(_read_chunked(filepath, chunk_size, cancel).decode('utf-8'))
+    except OperationCancelled:
+        return None
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Error al leer archivo JSON '{filepath}': {e}")
+        return None
+
+
+def _read_text_chunked(filepath: str, chunk_size: int, cancel: threading.Event) -> Optional[List[str]]:
+    """Cuerpo de read_text_file_async (se ejecuta en el pool)"""
+    try:
+        if not file_exists(filepath):
+            return None
+        text = _read_chunked(filepath, chunk_size, cancel).decode('utf-8')
+        return [line.strip() for line in io.StringIO(text, newline=None).readlines()]
+    except OperationCancelled:
+        return None
+    except IOError as e:
+        print(f"Error al leer archivo de texto '{filepath}': {e}")
+        return None
+
+
+def _write_json_chunked(filepath: str, data: Any, chunk_size: int, cancel: threading.Event) -> bool:
+    """Cuerpo de write_json_file_async (se ejecuta en el pool)"""
+    try:
+        _write_atomic(filepath, _iter_json_chunks(data, chunk_size), cancel)
+        return True
+    except OperationCancelled:
+        return False
+    except IOError as e:
+        print(f"Error al escribir archivo JSON '{filepath}': {e}")
+        return False
+
+
+def _write_text_chunked(filepath: str, lines: List[str], chunk_size: int, cancel: threading.Event) -> bool:
+    """Cuerpo de write_text_file_async (se ejecuta en el pool)"""
+    try:
+        _write_atomic(filepath, _iter_text_chunks(lines, chunk_size), cancel)
         return True
+    except OperationCancelled:
+        return False
     except IOError as e:
         print(f"Error al escribir archivo de texto '{filepath}': {e}")
         return False
 
 
+def _write_chunks_cancellable(filepath: str, chunks: Iterable[bytes], cancel: threading.Event) -> bool:
+    """Cuerpo de write_chunks_file_async (se ejecuta en el pool)"""
+    try:
+        _write_atomic(filepath, chunks, cancel, binary=True)
+        return True
+    except OperationCancelled:
+        return False
+    except IOError as e:
+        print(f"Error al escribir archivo '{filepath}': {e}")
+        return False
+
+
+def _iter_json_chunks(data: Any, chunk_size: int = FILE_IO_CHUNK_SIZE) -> Iterator[str]:
+    """Serializa datos como JSON (mismo formato que write_json_file) en bloques de ~chunk_size caracteres"""
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    return _buffer_chunks(encoder.iterencode(data), chunk_size)
+
+
+def _iter_text_chunks(lines: Iterable[str], chunk_size: int = FILE_IO_CHUNK_SIZE) -> Iterator[str]:
+    """Une líneas de texto terminadas en salto de línea en bloques de ~chunk_size caracteres"""
+    return _buffer_chunks((f"{line}\n" for line in lines), chunk_size)
+
+
+def _buffer_chunks(pieces: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """Agrupa fragmentos pequeños en bloques de al menos chunk_size caracteres"""
+    buffer: List[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _write_atomic(filepath: str, chunks: Iterable[Any], cancel: Optional[threading.Event] = None,
+                  binary: bool = False) -> None:
+    """
+    Escribe bloques (str, o bytes si binary) en un temporal y lo renombra sobre el destino
+    
+    Raises:
+        OperationCancelled: Si `cancel` se activa antes de terminar (el
+            temporal se borra y el destino no cambia)
+        IOError: Si no se puede escribir
+    """
+    ensure_directory_exists(filepath)
+    temporary = f"{filepath}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with (open(temporary, 'wb') if binary else open(temporary, 'w', encoding='utf-8')) as f:
+            for chunk in chunks:
+                if cancel is not None and cancel.is_set():
+                    raise OperationCancelled(filepath)
+                f.write(chunk)
+        os.replace(temporary, filepath)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_binary_file(filepath: str) -> Optional[bytes]:
+    """
+    Lee un archivo binario completo
+    
+    Args:
+        filepath (str): Ruta del archivo
+        
+    Returns:
+        Optional[bytes]: Contenido del archivo o None si hay error
+    """
+    try:
+        if not file_exists(filepath):
+            return None
+        
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except IOError as e:
+        print(f"Error al leer archivo binario '{filepath}': {e}")
+        return None
+
+
+def write_binary_file(filepath: str, data: bytes) -> bool:
+    """
+    Escribe datos en un archivo binario
+    
+    Args:
+        filepath (str): Ruta del archivo
+        data (bytes): Datos a escribir
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    try:
+        ensure_directory_exists(filepath)
+        
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        
+        return True
+    except IOError as e:
+        print(f"Error al escribir archivo binario '{filepath}': {e}")
+        return False
+
+
+def write_chunks_file(filepath: str, chunks: Iterable[bytes]) -> bool:
+    """
+    Escribe bloques de bytes generados sobre la marcha, de forma atómica
+    
+    Útil para formatos que se generan por partes (por ejemplo con una suma
+    de verificación calculada durante la escritura, ver src.utils.integrity).
+    
+    Args:
+        filepath (str): Ruta del archivo
+        chunks (Iterable[bytes]): Bloques a escribir, en orden
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    try:
+        _write_atomic(filepath, chunks, binary=True)
+        return True
+    except IOError as e:
+        print(f"Error al escribir archivo '{filepath}': {e}")
+        return False
+
+
+def iter_ndjson_stream(stream: TextIO) -> Iterator[Any]:
+    """
+    Lee un flujo NDJSON (un objeto JSON por línea) de forma incremental
+    
+    Args:
+        stream (TextIO): Flujo de entrada
+        
+    Yields:
+        Any: Objeto de cada línea no vacía
+        
+    Raises:
+        json.JSONDecodeError: Si una línea no es JSON válido
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def write_ndjson_stream(stream: TextIO, records: Iterable[Any]) -> int:
+    """
+    Escribe objetos como NDJSON, uno por línea
+    
+    Args:
+        stream (TextIO): Flujo de salida
+        records (Iterable[Any]): Objetos serializables
+        
+    Returns:
+        int: Cantidad de registros escritos
+    """
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def iter_csv_stream(stream: TextIO) -> Iterator[Dict[str, str]]:
+    """
+    Lee un flujo CSV (RFC 4180) con cabecera de forma incremental
+    
+    Args:
+        stream (TextIO): Flujo de entrada (abierto con newline='')
+        
+    Yields:
+        Dict[str, str]: Fila como diccionario campo -> valor
+    """
+    yield from csv.DictReader(stream)
+
+
+def write_csv_stream(stream: TextIO, records: Iterable[Dict[str, Any]],
+                     fieldnames: List[str], header: bool = True) -> int:
+    """
+    Escribe diccionarios como CSV (RFC 4180)
+    
+    Args:
+        stream (TextIO): Flujo de salida (abierto con newline='')
+        records (Iterable[Dict[str, Any]]): Filas a escribir
+        fieldnames (List[str]): Columnas, en orden
+        header (bool): Si se escribe la fila de cabecera
+        
+    Returns:
+        int: Cantidad de filas escritas (sin contar la cabecera)
+    """
+    writer = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore')
+    if header:
+        writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def _iter_line_range(f, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Recorre las líneas de un archivo binario que empiezan en [start, end)
+    
+    Si start cae en medio de una línea, esa línea pertenece al bloque
+    anterior y se descarta; así bloques contiguos cubren cada línea una sola vez.
+    """
+    if start > 0:
+        f.seek(start - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    position = f.tell()
+    while end is None or position < end:
+        line = f.readline()
+        if not line:
+            break
+        position += len(line)
+        yield line
+
+
+def iter_ndjson_file(filepath: str, start: int = 0, end: Optional[int] = None) -> Iterator[Any]:
+    """
+    Lee un archivo NDJSON línea a línea, con memoria acotada
+    
+    Con start/end se lee solo un rango de bytes (ver split_file_ranges), lo
+    que permite procesar un archivo grande en bloques paralelos.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        start (int): Byte inicial del rango
+        end (int, optional): Byte final (exclusivo) del rango; None = hasta el final
+        
+    Yields:
+        Any: Objeto de cada línea no vacía
+        
+    Raises:
+        IOError: Si el archivo no se puede leer
+        json.JSONDecodeError: Si una línea no es JSON válido
+    """
+    with open(filepath, 'rb') as f:
+        for line in _iter_line_range(f, start, end):
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_ndjson_range(filepath: str, start: int = 0, end: Optional[int] = None) -> List[Any]:
+    """
+    Lee un rango de bytes de un archivo NDJSON como lista (útil en procesos hijos)
+    
+    Args:
+        filepath (str): Ruta del archivo
+        start (int): Byte inicial del rango
+        end (int, optional): Byte final (exclusivo) del rango
+        
+    Returns:
+        List[Any]: Objetos del rango
+    """
+    return list(iter_ndjson_file(filepath, start, end))
+
+
+def iter_ndjson_offsets(filepath: str, start: int = 0) -> Iterator[Tuple[Any, int]]:
+    """
+    Lee un archivo NDJSON indicando tras cada objeto el byte donde continuar
+    
+    Args:
+        filepath (str): Ruta del archivo
+        start (int): Byte donde empezar (el inicio de una línea, por ejemplo
+            una posición devuelta antes por esta misma función)
+        
+    Yields:
+        Tuple[Any, int]: (objeto, byte siguiente a su línea)
+        
+    Raises:
+        IOError: Si el archivo no se puede leer
+        json.JSONDecodeError: Si una línea no es JSON válido
+    """
+    with open(filepath, 'rb') as f:
+        position = start
+        for line in _iter_line_range(f, start):
+            position += len(line)
+            if line.strip():
+                yield json.loads(line), position
+
+
+def iter_json_items(filepath: str, array_key: str = 'users', start: Optional[int] = None,
+                    chunk_size: int = FILE_IO_CHUNK_SIZE) -> Iterator[Tuple[Optional[str], Any, int]]:
+    """
+    Lee un documento JSON grande como flujo, sin cargarlo entero en memoria
+    
+    El documento puede ser una lista (sus elementos se emiten con clave
+    array_key) o un objeto, cuyos miembros se emiten uno a uno salvo la
+    lista bajo array_key, que se emite elemento a elemento. Tras cada
+    elemento se indica el byte donde reanudar la lectura.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        array_key (str): Clave de la lista que se recorre elemento a elemento
+        start (int, optional): Byte devuelto tras un elemento de la lista para
+            reanudar desde el siguiente; None = desde el principio
+        chunk_size (int): Bytes leídos por bloque
+        
+    Yields:
+        Tuple[str, Any, int]: (clave, valor, byte siguiente al valor)
+        
+    Raises:
+        IOError: Si el archivo no se puede leer
+        ValueError: Si el documento no es JSON válido (incluye json.JSONDecodeError)
+    """
+    with open(filepath, 'rb') as f:
+        reader = _JsonStreamReader(f, start or 0, chunk_size)
+        if start is not None:
+            yield from reader.array_items(array_key, first=False)
+            if reader.peek():
+                yield from reader.object_items(array_key, first=False)
+        elif reader.peek() == '[':
+            reader.take('[')
+            yield from reader.array_items(array_key, first=True)
+        else:
+            reader.take('{')
+            yield from reader.object_items(array_key, first=True)
+        if reader.peek():
+            raise ValueError(f"Datos inesperados tras el documento JSON en el byte {reader.offset()}")
+
+
+class _JsonStreamReader:
+    """Decodificador incremental de JSON sobre un archivo binario que lleva la cuenta de bytes"""
+
+    def __init__(self, f, start: int, chunk_size: int):
+        f.seek(start)
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._text = ''
+        self._pos = 0
+        # Byte del archivo que corresponde a self._text[self._mark]
+        self._mark = 0
+        self._mark_offset = start
+        self._eof = False
+
+    def offset(self) -> int:
+        """Byte del archivo que corresponde a la posición actual"""
+        self._mark_offset += len(self._text[self._mark:self._pos].encode('utf-8'))
+        self._mark = self._pos
+        return self._mark_offset
+
+    def _fill(self) -> bool:
+        """Lee otro bloque descartando lo ya consumido; False si el archivo terminó"""
+        if self._eof:
+            return False
+        self.offset()
+        self._text, self._pos, self._mark = self._text[self._pos:], 0, 0
+        chunk = self._file.read(self._chunk_size)
+        self._eof = not chunk
+        self._text += self._decoder.decode(chunk, final=self._eof)
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter que no es espacio ('' al final del archivo)"""
+        while True:
+            while self._pos < len(self._text) and self._text[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._text) or not self._fill():
+                return self._text[self._pos:self._pos + 1]
+
+    def take(self, expected: str) -> None:
+        """Consume un carácter de estructura"""
+        if self.peek() != expected:
+            raise ValueError(f"Se esperaba '{expected}' en el byte {self.offset()} del documento JSON")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decodifica el siguiente valor completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un número al final del bloque puede seguir en el siguiente
+            if end == len(self._text) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array_items(self, key: str, first: bool) -> Iterator[Tuple[Optional[str], Any, int]]:
+        """Emite los elementos de una lista hasta su ']'"""
+        while self.peek() != ']':
+            if not first:
+                self.take(',')
+            first = False
+            item = self.value()
+            yield key, item, self.offset()
+        self.take(']')
+
+    def object_items(self, array_key: str, first: bool) -> Iterator[Tuple[Optional[str], Any, int]]:
+        """Emite los miembros de un objeto hasta su '}'"""
+        while self.peek() != '}':
+            if not first:
+                self.take(',')
+            first = False
+            key = self.value()
+            self.take(':')
+            if key == array_key and self.peek() == '[':
+                self.take('[')
+                yield from self.array_items(array_key, first=True)
+            else:
+                item = self.value()
+                yield key, item, self.offset()
+        self.take('}')
+
+
+def iter_csv_file(filepath: str, start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Lee un archivo CSV con cabecera fila a fila, con memoria acotada
+    
+    La cabecera se lee siempre de la primera línea. El particionado por
+    rangos de bytes asume que ningún campo contiene saltos de línea.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        start (int): Byte inicial del rango
+        end (int, optional): Byte final (exclusivo) del rango; None = hasta el final
+        
+    Yields:
+        Dict[str, str]: Fila como diccionario campo -> valor
+        
+    Raises:
+        IOError: Si el archivo no se puede leer
+    """
+    with open(filepath, 'rb') as f:
+        header_line = f.readline()
+        if not header_line:
+            return
+        fieldnames = next(csv.reader([header_line.decode('utf-8-sig')]))
+        lines = _iter_line_range(f, max(start, len(header_line)), end)
+        reader = csv.DictReader((line.decode('utf-8') for line in lines), fieldnames=fieldnames)
+        yield from reader
+
+
+def write_ndjson_file(filepath: str, records: Iterable[Any], append: bool = False) -> bool:
+    """
+    Escribe objetos en un archivo NDJSON
+    
+    Args:
+        filepath (str): Ruta del archivo
+        records (Iterable[Any]): Objetos serializables
+        append (bool): Agrega al final en lugar de sobrescribir (exportaciones incrementales)
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    try:
+        ensure_directory_exists(filepath)
+        
+        with open(filepath, 'a' if append else 'w', encoding='utf-8') as f:
+            write_ndjson_stream(f, records)
+        
+        return True
+    except IOError as e:
+        print(f"Error al escribir archivo NDJSON '{filepath}': {e}")
+        return False
+
+
+def write_csv_file(filepath: str, records: Iterable[Dict[str, Any]],
+                   fieldnames: List[str], append: bool = False) -> bool:
+    """
+    Escribe filas en un archivo CSV (RFC 4180)
+    
+    Args:
+        filepath (str): Ruta del archivo
+        records (Iterable[Dict[str, Any]]): Filas a escribir
+        fieldnames (List[str]): Columnas, en orden
+        append (bool): Agrega al final; la cabecera solo se escribe si el archivo está vacío
+        
+    Returns:
+        bool: True si se escribió exitosamente
+    """
+    try:
+        ensure_directory_exists(filepath)
+        header = not append or not file_exists(filepath) or os.path.getsize(filepath) == 0
+        
+        with open(filepath, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+            write_csv_stream(f, records, fieldnames, header=header)
+        
+        return True
+    except IOError as e:
+        print(f"Error al escribir archivo CSV '{filepath}': {e}")
+        return False
+
+
+def split_file_ranges(filepath: str, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Divide un archivo en rangos de bytes de tamaño parecido
+    
+    Los rangos no se alinean a líneas: los lectores por rango asignan cada
+    línea al rango donde empieza, así que basta con que sean contiguos.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        chunks (int): Cantidad de rangos deseada
+        
+    Returns:
+        List[Tuple[int, int]]: Rangos (inicio, fin) contiguos que cubren el archivo
+    """
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return [(0, 0)]
+    
+    chunks = max(1, min(chunks, size))
+    step = -(-size // chunks)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
 def get_files_with_extension(directory: str, extension: str) -> List[str]:
     """
     Obtiene una lista de archivos con cierta extensión en un directorio
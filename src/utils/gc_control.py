@@ -0,0 +1,70 @@
+"""
+Control del Recolector de Basura
+Modo de carga masiva: sin pasadas del GC cíclico mientras se construyen muchos objetos
+"""
+
+import gc
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+# 'off': sin cambios; 'pause': GC desactivado durante la carga (la primera pasada
+# al reactivarlo recorre todo lo cargado); 'freeze': además, lo cargado pasa a la
+# generación permanente (gc.freeze) y esa pasada no ocurre
+GC_MODES = ('off', 'pause', 'freeze')
+
+_lock = threading.Lock()
+_depth = 0
+_was_enabled = False
+_freeze_requested = False
+
+
+@contextmanager
+def bulk_load_gc(mode: str = 'pause') -> Iterator[None]:
+    """
+    Contexto para construir muchos objetos de larga vida
+
+    Cada objeto contenedor creado cuenta para el umbral de la generación 0,
+    así que una carga de millones de usuarios dispara cientos de pasadas del
+    GC, y las de generaciones viejas recorren un montículo cada vez mayor.
+    Con el GC desactivado durante la carga esas pasadas no ocurren; con
+    'freeze', al terminar se mueve todo lo vivo a la generación permanente
+    para que las pasadas posteriores no vuelvan a recorrer los usuarios.
+    Los objetos congelados se siguen liberando por conteo de referencias,
+    pero gc.freeze congela todo el montículo, no solo lo cargado: conviene
+    reservarlo para la carga inicial de un proceso de larga vida.
+
+    Los contextos anidados o concurrentes comparten el estado: el GC se
+    restaura al salir del último, y se congela si cualquiera de ellos pidió
+    'freeze' (sin importar el orden de salida).
+
+    Args:
+        mode (str): Uno de GC_MODES
+
+    Raises:
+        ValueError: Si el modo no es válido
+    """
+    global _depth, _was_enabled, _freeze_requested
+    if mode not in GC_MODES:
+        raise ValueError(f"Modo de GC no válido: '{mode}' (use {', '.join(GC_MODES)})")
+    if mode == 'off':
+        yield
+        return
+
+    with _lock:
+        if _depth == 0:
+            _was_enabled = gc.isenabled()
+            _freeze_requested = False
+            gc.disable()
+        _depth += 1
+        _freeze_requested = _freeze_requested or mode == 'freeze'
+    try:
+        yield
+    finally:
+        with _lock:
+            _depth -= 1
+            if _depth == 0:
+                if _freeze_requested:
+                    gc.freeze()
+                if _was_enabled:
+                    gc.enable()
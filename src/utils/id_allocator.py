@@ -0,0 +1,94 @@
+"""
+Asignador de IDs
+Genera IDs únicos y crecientes sin reutilizar los ya emitidos
+"""
+
+import threading
+
+
+class IdAllocator:
+    """
+    Asignador de IDs seguro entre hilos
+
+    Los IDs nunca se reutilizan: eliminar un usuario o descartar parte de un
+    bloque reservado deja un hueco, pero el siguiente ID siempre es mayor que
+    cualquiera emitido u observado. La marca de agua (next_id) se persiste
+    junto a los datos para conservar esta garantía entre ejecuciones.
+    """
+
+    def __init__(self, next_id: int = 1):
+        """
+        Inicializa el asignador
+
+        Args:
+            next_id (int): Primer ID que se entregará
+        """
+        self._next_id = next_id
+        self._lock = threading.Lock()
+
+    @property
+    def next_id(self) -> int:
+        """int: Próximo ID que se entregará (marca de agua persistible)"""
+        return self._next_id
+
+    @property
+    def high_water_mark(self) -> int:
+        """int: Mayor ID emitido u observado (0 si no hay ninguno)"""
+        return self._next_id - 1
+
+    def allocate(self) -> int:
+        """
+        Entrega un ID nuevo
+
+        Returns:
+            int: ID asignado
+        """
+        with self._lock:
+            user_id = self._next_id
+            self._next_id += 1
+            return user_id
+
+    def reserve(self, count: int) -> range:
+        """
+        Reserva un bloque de IDs consecutivos en una sola operación
+
+        Args:
+            count (int): Cantidad de IDs a reservar
+
+        Returns:
+            range: Rango con los IDs reservados
+
+        Raises:
+            ValueError: Si count es negativo
+        """
+        if count < 0:
+            raise ValueError("La cantidad de IDs a reservar no puede ser negativa")
+
+        with self._lock:
+            start = self._next_id
+            self._next_id += count
+            return range(start, start + count)
+
+    def observe(self, user_id: int) -> None:
+        """
+        Registra un ID asignado externamente (por ejemplo, al cargar un archivo)
+
+        Args:
+            user_id (int): ID existente
+        """
+        with self._lock:
+            if user_id >= self._next_id:
+                self._next_id = user_id + 1
+
+    def reset(self, next_id: int = 1) -> None:
+        """
+        Reinicia la marca de agua
+
+        Puede hacerla retroceder y volver a entregar IDs ya emitidos: no
+        usarlo sobre un asignador compartido (para adelantarla, observe).
+
+        Args:
+            next_id (int): Próximo ID que se entregará
+        """
+        with self._lock:
+            self._next_id = next_id
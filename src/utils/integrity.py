@@ -0,0 +1,357 @@
+"""
+Integridad de Archivos
+Sumas de verificación y conteo de registros para los archivos JSON y TXT guardados
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional
+from src.config.settings import FILE_IO_CHUNK_SIZE, INTEGRITY_ALGORITHM
+
+ALGORITHMS = ('crc32', 'blake2b')
+
+# Línea de cierre: {"count": N, "value": "..."} tras el último registro
+_JSON_TRAILER = b'\n  "checksum": '
+_TEXT_TRAILER = b'\n# checksum '
+_JSON_HEADER = re.compile(rb'^  "checksum_algorithm": "(\w+)",$', re.MULTILINE)
+_TEXT_HEADER = re.compile(rb'^# checksum_algorithm=(\w+)$', re.MULTILINE)
+_TEXT_TRAILER_FIELDS = re.compile(r'^count=(\d+) value=([0-9a-f]+)$')
+
+# Bytes leídos al principio y al final del archivo para encontrar cabecera y cierre
+_HEAD_BYTES = 4096
+_TAIL_BYTES = 4096
+
+
+class IntegrityStatus(Enum):
+    """Resultado de verificar un archivo"""
+    OK = 'ok'                # La suma y el conteo coinciden
+    MISSING = 'missing'      # Archivo sin suma de verificación (formato anterior)
+    CORRUPT = 'corrupt'      # Suma o conteo distintos, cierre ausente o datos tras el cierre
+
+
+@dataclass
+class IntegrityResult:
+    """
+    Resultado de verificar un archivo guardado
+
+    Attributes:
+        status (IntegrityStatus): Resultado
+        algorithm (str, optional): Algoritmo declarado en la cabecera
+        count (int, optional): Registros encontrados
+        expected_count (int, optional): Registros declarados en el cierre
+        checksum (str, optional): Suma calculada
+        expected_checksum (str, optional): Suma declarada en el cierre
+        message (str): Descripción del resultado
+    """
+    status: IntegrityStatus
+    algorithm: Optional[str] = None
+    count: Optional[int] = None
+    expected_count: Optional[int] = None
+    checksum: Optional[str] = None
+    expected_checksum: Optional[str] = None
+    message: str = ''
+
+    @property
+    def ok(self) -> bool:
+        """bool: False solo si el archivo está dañado (los archivos sin suma se aceptan)"""
+        return self.status is not IntegrityStatus.CORRUPT
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte el resultado a un diccionario serializable
+
+        Returns:
+            Dict[str, Any]: Campos del resultado, con status como texto
+        """
+        result = asdict(self)
+        result['status'] = self.status.value
+        return result
+
+
+class StreamChecksum:
+    """Suma de verificación incremental (CRC32 o BLAKE2b de 128 bits)"""
+
+    def __init__(self, algorithm: str = INTEGRITY_ALGORITHM):
+        """
+        Inicializa la suma
+
+        Args:
+            algorithm (str): 'crc32' o 'blake2b'
+
+        Raises:
+            ValueError: Si el algoritmo no está soportado
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algoritmo de verificación no soportado: '{algorithm}'")
+        self.algorithm = algorithm
+        self._crc = 0
+        self._hash = hashlib.blake2b(digest_size=16) if algorithm == 'blake2b' else None
+
+    def update(self, data: bytes) -> None:
+        """
+        Agrega bytes a la suma
+
+        Args:
+            data (bytes): Bytes a agregar
+        """
+        if self._hash is not None:
+            self._hash.update(data)
+        else:
+            self._crc = zlib.crc32(data, self._crc)
+
+    def hexdigest(self) -> str:
+        """
+        Obtiene la suma en hexadecimal
+
+        Returns:
+            str: Suma calculada hasta ahora
+        """
+        return self._hash.hexdigest() if self._hash is not None else f"{self._crc:08x}"
+
+
+def iter_json_document(metadata: Dict[str, Any], records: Iterable[Dict[str, Any]],
+                       algorithm: str = INTEGRITY_ALGORITHM,
+                       chunk_size: int = FILE_IO_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Genera un documento JSON con un registro por línea y un cierre de verificación
+
+    El documento es JSON válido: los metadatos, 'checksum_algorithm', la
+    lista 'users' (un registro por línea) y 'checksum' con el conteo y la
+    suma de todos los bytes anteriores, calculada mientras se genera.
+
+    Args:
+        metadata (Dict[str, Any]): Claves de cabecera, por ejemplo {'next_id': 42}
+        records (Iterable[Dict[str, Any]]): Registros de usuarios
+        algorithm (str): Algoritmo de la suma
+        chunk_size (int): Caracteres aproximados por bloque generado
+
+    Yields:
+        bytes: Bloques del archivo codificados en UTF-8
+    """
+    checksum = StreamChecksum(algorithm)
+    counter = [0]
+
+    def pieces() -> Iterator[str]:
+        yield '{\n'
+        for key, value in metadata.items():
+            yield f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n'
+        yield f'  "checksum_algorithm": "{algorithm}",\n  "users": [\n'
+        separator = '    '
+        for record in records:
+            yield separator
+            yield json.dumps(record, ensure_ascii=False)
+            separator = ',\n    '
+            counter[0] += 1
+        yield '\n  ],\n' if counter[0] else '  ],\n'
+
+    yield from _encode_covered(pieces(), checksum, chunk_size)
+    trailer = json.dumps({'count': counter[0], 'value': checksum.hexdigest()})
+    yield f'  "checksum": {trailer}\n}}\n'.encode('utf-8')
+
+
+def iter_text_document(metadata: Dict[str, Any], lines: Iterable[str],
+                       algorithm: str = INTEGRITY_ALGORITHM,
+                       chunk_size: int = FILE_IO_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Genera un archivo de texto con cabecera '# clave=valor' y cierre de verificación
+
+    Args:
+        metadata (Dict[str, Any]): Claves de cabecera, por ejemplo {'next_id': 42}
+        lines (Iterable[str]): Líneas de datos (una por usuario, sin salto de línea)
+        algorithm (str): Algoritmo de la suma
+        chunk_size (int): Caracteres aproximados por bloque generado
+
+    Yields:
+        bytes: Bloques del archivo codificados en UTF-8
+    """
+    checksum = StreamChecksum(algorithm)
+    counter = [0]
+
+    def pieces() -> Iterator[str]:
+        for key, value in metadata.items():
+            yield f"# {key}={value}\n"
+        yield f"# checksum_algorithm={algorithm}\n"
+        for line in lines:
+            yield f"{line}\n"
+            counter[0] += 1
+
+    yield from _encode_covered(pieces(), checksum, chunk_size)
+    yield f"# checksum count={counter[0]} value={checksum.hexdigest()}\n".encode('utf-8')
+
+
+def verify_file(filepath: str, fmt: Optional[str] = None,
+                chunk_size: int = FILE_IO_CHUNK_SIZE) -> IntegrityResult:
+    """
+    Verifica un archivo guardado sin interpretar sus registros
+
+    Lee el archivo por bloques calculando la suma y contando las líneas de
+    registros, con memoria acotada.
+
+    Args:
+        filepath (str): Ruta del archivo
+        fmt (str, optional): 'json' o 'txt' (por defecto según la extensión)
+        chunk_size (int): Bytes leídos por bloque
+
+    Returns:
+        IntegrityResult: Resultado de la verificación
+
+    Raises:
+        IOError: Si el archivo no se puede leer
+        ValueError: Si el formato no es json ni txt
+    """
+    fmt = fmt or os.path.splitext(filepath)[1].lstrip('.').lower()
+    with open(filepath, 'rb') as f:
+        return verify_stream(f, fmt, chunk_size)
+
+
+def verify_bytes(data: bytes, fmt: str) -> IntegrityResult:
+    """
+    Verifica el contenido completo de un archivo ya leído (ver verify_file)
+
+    Args:
+        data (bytes): Contenido del archivo
+        fmt (str): 'json' o 'txt'
+
+    Returns:
+        IntegrityResult: Resultado de la verificación
+    """
+    return verify_stream(io.BytesIO(data), fmt)
+
+
+def verify_stream(f: BinaryIO, fmt: str, chunk_size: int = FILE_IO_CHUNK_SIZE) -> IntegrityResult:
+    """
+    Verifica un flujo binario con posicionamiento (ver verify_file)
+
+    Args:
+        f (BinaryIO): Flujo abierto en modo binario
+        fmt (str): 'json' o 'txt'
+        chunk_size (int): Bytes leídos por bloque
+
+    Returns:
+        IntegrityResult: Resultado de la verificación
+
+    Raises:
+        ValueError: Si el formato no es json ni txt
+    """
+    if fmt not in ('json', 'txt'):
+        raise ValueError(f"Formato sin verificación de integridad: '{fmt}'")
+    header, trailer_marker = (_JSON_HEADER, _JSON_TRAILER) if fmt == 'json' else (_TEXT_HEADER, _TEXT_TRAILER)
+
+    size = f.seek(0, io.SEEK_END)
+    f.seek(0)
+    match = header.search(f.read(_HEAD_BYTES))
+    if match is None:
+        return IntegrityResult(IntegrityStatus.MISSING, message="El archivo no tiene suma de verificación")
+    algorithm = match.group(1).decode('ascii')
+    if algorithm not in ALGORITHMS:
+        return IntegrityResult(IntegrityStatus.CORRUPT, algorithm,
+                               message=f"Algoritmo de verificación desconocido: '{algorithm}'")
+
+    tail_start = max(0, size - _TAIL_BYTES)
+    f.seek(tail_start)
+    tail = f.read()
+    position = tail.rfind(trailer_marker)
+    if position < 0:
+        return IntegrityResult(IntegrityStatus.CORRUPT, algorithm,
+                               message="Falta el cierre de verificación (archivo truncado)")
+    expected = _parse_trailer(tail[position + len(trailer_marker):], fmt)
+    if expected is None:
+        return IntegrityResult(IntegrityStatus.CORRUPT, algorithm,
+                               message="Cierre de verificación inválido o datos tras el cierre")
+    expected_count, expected_checksum = expected
+
+    # Se cubre hasta el salto de línea que precede al cierre, inclusive
+    covered = tail_start + position + 1
+    checksum = StreamChecksum(algorithm)
+    if fmt == 'json':
+        records = _PatternCounter(b'\n    {')
+    else:
+        lines, comments = _PatternCounter(b'\n'), _PatternCounter(b'\n#')
+    f.seek(0)
+    remaining = covered
+    first = True
+    while remaining > 0:
+        chunk = f.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        checksum.update(chunk)
+        if fmt == 'json':
+            records.feed(chunk)
+        else:
+            lines.feed(chunk)
+            comments.feed(chunk)
+            if first and chunk.startswith(b'#'):
+                comments.count += 1
+        first = False
+
+    count = records.count if fmt == 'json' else lines.count - comments.count
+    result = IntegrityResult(IntegrityStatus.OK, algorithm, count, expected_count,
+                             checksum.hexdigest(), expected_checksum)
+    if result.checksum != expected_checksum:
+        result.status = IntegrityStatus.CORRUPT
+        result.message = "La suma de verificación no coincide"
+    elif count != expected_count:
+        result.status = IntegrityStatus.CORRUPT
+        result.message = f"Se esperaban {expected_count} registros y hay {count}"
+    else:
+        result.message = f"{count} registros verificados ({algorithm})"
+    return result
+
+
+def _parse_trailer(rest: bytes, fmt: str) -> Optional[tuple]:
+    """Interpreta la línea de cierre (sin el marcador); None si es inválida o le siguen datos"""
+    line, _, after = rest.partition(b'\n')
+    try:
+        text = line.decode('utf-8')
+        if fmt == 'json':
+            if after.strip() != b'}':
+                return None
+            trailer = json.loads(text)
+            return int(trailer['count']), str(trailer['value'])
+        if after.strip():
+            return None
+        match = _TEXT_TRAILER_FIELDS.match(text)
+        return (int(match.group(1)), match.group(2)) if match else None
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _encode_covered(pieces: Iterable[str], checksum: StreamChecksum, chunk_size: int) -> Iterator[bytes]:
+    """Agrupa fragmentos en bloques, los codifica y los suma a la verificación"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            data = ''.join(buffer).encode('utf-8')
+            checksum.update(data)
+            yield data
+            buffer.clear()
+            size = 0
+    if buffer:
+        data = ''.join(buffer).encode('utf-8')
+        checksum.update(data)
+        yield data
+
+
+class _PatternCounter:
+    """Cuenta apariciones de un patrón en bloques consecutivos (incluidas las que cruzan bloques)"""
+
+    def __init__(self, pattern: bytes):
+        self.pattern = pattern
+        self.count = 0
+        self._tail = b''
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._tail + chunk
+        self.count += data.count(self.pattern)
+        keep = len(self.pattern) - 1
+        self._tail = data[-keep:] if keep else b''
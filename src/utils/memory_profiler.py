@@ -0,0 +1,142 @@
+"""
+Perfil de Memoria
+Recorrido de objetos con sys.getsizeof y diferencias de snapshots de tracemalloc
+"""
+
+import asyncio
+import enum
+import gc
+import struct
+import sys
+import tracemalloc
+import types
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+# Objetos compartidos por todo el proceso que no forman parte de los datos medidos
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                  types.MethodType, types.CodeType, types.FrameType, enum.Enum,
+                  asyncio.AbstractEventLoop, type(None))
+
+_POINTER_SIZE = struct.calcsize('P')
+
+
+def sizeof_by_type(roots: Iterable[Any], seen: Optional[Set[int]] = None) -> Counter:
+    """
+    Suma el tamaño de todo lo alcanzable desde unos objetos, agrupado por tipo
+
+    Recorre las referencias con gc.get_referents (sin materializar los
+    __dict__ de las instancias) y cuenta cada objeto una sola vez. Pasando
+    el mismo `seen` a varias llamadas, lo ya contado en una no se vuelve a
+    contar en las siguientes. Para instancias cuyos atributos se guardan en
+    línea (sin __dict__ propio) se suma una estimación de un puntero por atributo.
+
+    Args:
+        roots (Iterable[Any]): Objetos desde los que empezar
+        seen (Set[int], optional): IDs de objetos ya contados (se actualiza)
+
+    Returns:
+        Counter: Bytes por nombre de tipo
+    """
+    seen = set() if seen is None else seen
+    sizes: Counter = Counter()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        size = sys.getsizeof(obj)
+        referents = gc.get_referents(obj)
+        if type(obj).__dictoffset__ and not _has_materialized_dict(referents):
+            size += _POINTER_SIZE * len(referents)
+        sizes[type(obj).__name__] += size
+        stack.extend(referents)
+    return sizes
+
+
+def _has_materialized_dict(referents: list) -> bool:
+    """Indica si las referencias de una instancia son su __dict__ (y su tipo) en vez de valores en línea"""
+    values = [ref for ref in referents if not isinstance(ref, type)]
+    return len(values) == 1 and type(values[0]) is dict
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Calcula el tamaño total de un objeto y todo lo que referencia
+
+    Args:
+        obj (Any): Objeto a medir
+        seen (Set[int], optional): IDs de objetos ya contados (se actualiza)
+
+    Returns:
+        int: Bytes
+    """
+    return sum(sizeof_by_type([obj], seen).values())
+
+
+def trace_allocations(func: Callable[..., Any], *args, top: int = 10, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Ejecuta una función midiendo la memoria que asigna con tracemalloc
+
+    Toma un snapshot antes y otro después y los compara por línea de
+    código. Si tracemalloc no estaba activo se activa solo durante la llamada.
+
+    Args:
+        func (Callable[..., Any]): Función a ejecutar
+        *args: Argumentos posicionales de func
+        top (int): Líneas con más diferencia a incluir
+        **kwargs: Argumentos con nombre de func
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: (resultado de func, diferencia) donde la
+            diferencia tiene net_bytes (memoria retenida), peak_bytes (pico
+            sobre la memoria inicial) y top (ubicación, size_diff, count_diff)
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        initial, _ = tracemalloc.get_traced_memory()
+        result = func(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap>')]
+    differences = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), 'lineno')
+    return result, {
+        'net_bytes': current - initial,
+        'peak_bytes': peak - initial,
+        'top': [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff
+            }
+            for stat in differences[:top]
+        ]
+    }
+
+
+def format_bytes(size: float) -> str:
+    """
+    Formatea una cantidad de bytes con la unidad más legible
+
+    Args:
+        size (float): Bytes (puede ser negativo)
+
+    Returns:
+        str: Por ejemplo '512 B', '1.5 KiB' o '-3.2 MiB'
+    """
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -0,0 +1,122 @@
+"""
+Limitador de tasa
+Cubetas de tokens por clave con expiración de las claves inactivas
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class TokenBucketLimiter:
+    """
+    Limitador de tasa con una cubeta de tokens por clave
+
+    Cada clave (cuenta, IP de origen, etc.) dispone de `capacity` tokens que
+    se recargan a `refill_rate` tokens por segundo. El estado por clave es una
+    lista [tokens, última_actualización]; las claves inactivas durante más de
+    `ttl` segundos se eliminan (una cubeta así ya estaría llena, por lo que
+    olvidarla no cambia el resultado). Las claves se mantienen ordenadas por
+    último acceso, así que la expiración cuesta O(1) amortizado por llamada.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, ttl: Optional[float] = None):
+        """
+        Inicializa el limitador
+
+        Args:
+            capacity (float): Tokens máximos por clave (ráfaga permitida)
+            refill_rate (float): Tokens recargados por segundo
+            ttl (float, optional): Segundos de inactividad tras los que se olvida una
+                clave. Por defecto, el tiempo que tarda en llenarse una cubeta vacía
+
+        Raises:
+            ValueError: Si capacity o refill_rate no son positivos
+        """
+        if capacity <= 0 or refill_rate <= 0:
+            raise ValueError("La capacidad y la tasa de recarga deben ser positivas")
+
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.ttl = ttl if ttl is not None else self.capacity / self.refill_rate
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> bool:
+        """
+        Consume tokens de la cubeta de una clave si hay suficientes
+
+        Args:
+            key (str): Clave limitada
+            cost (float): Tokens que consume la operación
+            now (float, optional): Instante actual (time.monotonic por defecto)
+
+        Returns:
+            bool: True si la operación está permitida
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True
+            return False
+
+    def retry_after(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """
+        Calcula cuántos segundos faltan para que una clave pueda consumir tokens
+
+        Args:
+            key (str): Clave limitada
+            cost (float): Tokens necesarios
+            now (float, optional): Instante actual (time.monotonic por defecto)
+
+        Returns:
+            float: Segundos de espera (0 si ya está permitido)
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0.0
+            tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+            return max(0.0, (cost - tokens) / self.refill_rate)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """
+        Olvida el estado de una clave o de todas
+
+        Args:
+            key (str, optional): Clave a reiniciar; None reinicia todas
+        """
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    def _evict_expired(self, now: float) -> None:
+        """Elimina las claves inactivas durante más de ttl segundos (las más antiguas van primero)"""
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket[1] <= self.ttl:
+                break
+            del buckets[key]
@@ -0,0 +1,147 @@
+"""
+Índice ordenado
+Estructura auxiliar para consultas por rango en O(log N + k)
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+class _Top:
+    """Centinela que compara como mayor que cualquier valor"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+class SortedIndex:
+    """
+    Índice ordenado por una clave de ordenación más un desempate único
+
+    Las entradas se guardan en dos listas paralelas (claves y valores) que se
+    mantienen ordenadas con bisect. Las claves son tuplas (valor, desempate)
+    para que dos valores iguales (por ejemplo, dos fechas idénticas) no
+    colisionen.
+    """
+
+    def __init__(self):
+        """Inicializa un índice vacío"""
+        self._keys: List[Tuple[Any, Any]] = []
+        self._values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def insert(self, sort_value: Any, tiebreak: Any, value: Any) -> None:
+        """
+        Inserta una entrada en el índice
+
+        Args:
+            sort_value (Any): Valor por el que se ordena
+            tiebreak (Any): Valor único para desempatar
+            value (Any): Objeto asociado a la entrada
+        """
+        key = (sort_value, tiebreak)
+        if not self._keys or self._keys[-1] < key:
+            # Caso habitual: las inserciones llegan en orden creciente
+            self._keys.append(key)
+            self._values.append(value)
+            return
+
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._values.insert(position, value)
+
+    def remove(self, sort_value: Any, tiebreak: Any) -> bool:
+        """
+        Elimina una entrada del índice
+
+        Args:
+            sort_value (Any): Valor por el que se ordena
+            tiebreak (Any): Valor único para desempatar
+
+        Returns:
+            bool: True si la entrada existía
+        """
+        key = (sort_value, tiebreak)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+            del self._values[position]
+            return True
+        return False
+
+    def clear(self) -> None:
+        """Vacía el índice"""
+        self._keys.clear()
+        self._values.clear()
+
+    def rebuild(self, entries: Iterable[Tuple[Any, Any, Any]]) -> None:
+        """
+        Reconstruye el índice completo con una sola ordenación
+
+        Args:
+            entries (Iterable[Tuple[Any, Any, Any]]): Tuplas (valor, desempate, objeto)
+        """
+        ordered = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self._keys = [(entry[0], entry[1]) for entry in ordered]
+        self._values = [entry[2] for entry in ordered]
+
+    def range(self, start: Any = None, end: Any = None,
+              limit: Optional[int] = None, reverse: bool = False) -> List[Any]:
+        """
+        Devuelve los valores cuya clave está en [start, end]
+
+        Args:
+            start (Any, optional): Límite inferior inclusivo (None = sin límite)
+            end (Any, optional): Límite superior inclusivo (None = sin límite)
+            limit (int, optional): Número máximo de resultados
+            reverse (bool): Si es True, devuelve primero las claves mayores
+
+        Returns:
+            List[Any]: Valores en orden de clave
+        """
+        low = 0 if start is None else bisect_left(self._keys, (start,))
+        high = len(self._keys) if end is None else bisect_right(self._keys, (end, _TOP))
+
+        if low >= high or (limit is not None and limit <= 0):
+            return []
+
+        if reverse:
+            if limit is not None:
+                low = max(low, high - limit)
+            return self._values[low:high][::-1]
+
+        if limit is not None:
+            high = min(high, low + limit)
+        return self._values[low:high]
+
+    def first(self, n: int) -> List[Any]:
+        """
+        Devuelve los n valores con menor clave
+
+        Args:
+            n (int): Número de valores
+
+        Returns:
+            List[Any]: Valores en orden creciente
+        """
+        return self.range(limit=n)
+
+    def last(self, n: int) -> List[Any]:
+        """
+        Devuelve los n valores con mayor clave
+
+        Args:
+            n (int): Número de valores
+
+        Returns:
+            List[Any]: Valores en orden decreciente
+        """
+        return self.range(limit=n, reverse=True)
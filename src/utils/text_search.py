@@ -0,0 +1,228 @@
+"""
+Utilidades de búsqueda de texto
+Normalización Unicode, distancia de edición acotada e índice de trigramas
+"""
+
+import heapq
+import unicodedata
+from typing import Dict, Hashable, List, Set, Tuple
+
+# Máximo de palabras distintas que se verifican con distancia de edición por palabra de la consulta
+DEFAULT_MAX_CANDIDATES = 2000
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para comparaciones tolerantes
+
+    Descompone los caracteres (NFKD), elimina los acentos, pasa a minúsculas
+    con casefold y colapsa los espacios. "  José  GARCÍA " -> "jose garcia".
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    if not text:
+        return ""
+
+    decomposed = unicodedata.normalize('NFKD', text)
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(folded.casefold().split())
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Distancia de Damerau-Levenshtein (alineamiento óptimo) acotada
+
+    Cuenta inserciones, borrados, sustituciones y transposiciones de dos
+    caracteres adyacentes. Deja de calcular en cuanto la distancia supera
+    max_distance, por lo que el coste es O(len(a) * len(b)) en el peor caso
+    pero mucho menor para cadenas claramente distintas.
+
+    Args:
+        a (str): Primera cadena
+        b (str): Segunda cadena
+        max_distance (int): Distancia máxima de interés
+
+    Returns:
+        int: Distancia exacta, o max_distance + 1 si la supera
+    """
+    if a == b:
+        return 0
+
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        char_a = a[i - 1]
+
+        for j in range(1, len(b) + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], too_far)
+
+
+def token_trigrams(token: str) -> Set[str]:
+    """
+    Obtiene los trigramas de una palabra rellenada con '$' en los extremos
+
+    Args:
+        token (str): Palabra normalizada
+
+    Returns:
+        Set[str]: Trigramas de la palabra
+    """
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas por palabra
+
+    Sirve como prefiltro para la búsqueda aproximada: en lugar de calcular la
+    distancia de edición contra todos los textos, solo se verifican las
+    palabras que comparten suficientes trigramas con la consulta. Los
+    trigramas apuntan a palabras distintas y cada palabra a los elementos
+    que la contienen, así que una palabra repetida en miles de textos se
+    verifica una sola vez.
+    """
+
+    def __init__(self):
+        """Inicializa un índice vacío"""
+        self._postings: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, Set[Hashable]] = {}
+        self._tokens: Dict[Hashable, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Indexa un texto
+
+        Args:
+            key (Hashable): Identificador del elemento
+            text (str): Texto a indexar
+        """
+        tokens = tuple(normalize_text(text).split())
+        self._tokens[key] = tokens
+        for token in tokens:
+            keys = self._keys.get(token)
+            if keys is None:
+                keys = self._keys[token] = set()
+                for gram in token_trigrams(token):
+                    self._postings.setdefault(gram, set()).add(token)
+            keys.add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Quita un elemento del índice
+
+        Args:
+            key (Hashable): Identificador del elemento
+        """
+        for token in self._tokens.pop(key, ()):
+            keys = self._keys.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if keys:
+                continue
+            del self._keys[token]
+            for gram in token_trigrams(token):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(token)
+                    if not posting:
+                        del self._postings[gram]
+
+    def clear(self) -> None:
+        """Vacía el índice"""
+        self._postings.clear()
+        self._keys.clear()
+        self._tokens.clear()
+
+    def tokens(self, key: Hashable) -> Tuple[str, ...]:
+        """
+        Devuelve las palabras normalizadas de un elemento
+
+        Args:
+            key (Hashable): Identificador del elemento
+
+        Returns:
+            Tuple[str, ...]: Palabras normalizadas
+        """
+        return self._tokens.get(key, ())
+
+    def keys(self, token: str) -> Set[Hashable]:
+        """
+        Devuelve los elementos que contienen una palabra indexada
+
+        Args:
+            token (str): Palabra normalizada
+
+        Returns:
+            Set[Hashable]: Identificadores (conjunto interno: no modificar)
+        """
+        return self._keys.get(token, set())
+
+    def candidate_tokens(self, token: str, max_distance: int,
+                         max_candidates: int = DEFAULT_MAX_CANDIDATES) -> List[str]:
+        """
+        Obtiene las palabras indexadas que pueden parecerse a token
+
+        Una palabra a distancia k de la consulta comparte al menos
+        len(token) - 3k trigramas con ella (cada edición destruye como mucho
+        tres). Toda palabra con ese mínimo aparece en alguna lista de los
+        trigramas más raros (filtrado por prefijo); en las listas restantes
+        solo se cuentan los trigramas compartidos de las ya halladas. Las que
+        no llegan al mínimo se descartan y, si aún quedan más de
+        max_candidates, se conservan las que más trigramas comparten.
+
+        Args:
+            token (str): Palabra normalizada de la consulta
+            max_distance (int): Distancia de edición máxima
+            max_candidates (int): Límite duro de palabras devueltas
+
+        Returns:
+            List[str]: Palabras candidatas, de más a menos trigramas compartidos
+        """
+        grams = sorted(token_trigrams(token), key=lambda gram: len(self._postings.get(gram, ())))
+        # Las coincidencias por subcadena pierden los dos trigramas de borde
+        required = max(1, len(grams) - max(2, 3 * max_distance))
+        split = len(grams) - required + 1
+
+        shared: Dict[str, int] = {}
+        for gram in grams[:split]:
+            for word in self._postings.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        for gram in grams[split:]:
+            posting = self._postings.get(gram, set())
+            for word in (posting & shared.keys() if len(posting) < len(shared) else shared.keys() & posting):
+                shared[word] += 1
+
+        ranked = [(count, word) for word, count in shared.items() if count >= required]
+        if len(ranked) > max_candidates:
+            ranked = heapq.nlargest(max_candidates, ranked)
+        else:
+            ranked.sort(reverse=True)
+        return [word for _, word in ranked]
@@ -4,18 +4,47 @@ Pruebas unitarias para el sistema de gestión de usuarios
 """
 
 import unittest
+import unittest.mock
 import os
 import sys
 import json
-from datetime import datetime
+import asyncio
+import gc
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from io import StringIO
 
 # Agregar el directorio raíz del proyecto al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Ahora podemos importar los módulos del proyecto
+from src.cli import batch
+from src.config.settings import DEFAULT_DATA_FILE
 from src.models.user import User
 from src.services.user_service import UserService
-from src.utils.file_handler import write_json_file, read_json_file
+from src.services.cached_user_service import CachedUserService
+from src.services.events import ChangeFeed, EventGapError, EventType
+from src.services.migrations import SCHEMA_VERSION, migrate_records, upgrade_file
+from src.services.replication import ReplicationPrimary, ReplicaService
+from src.services import resumable_import
+from src.services.snapshot_cache import snapshot_path
+from src.utils.cache import LRUCache, MISSING
+from src.utils.file_handler import (write_json_file, read_json_file, iter_ndjson_file, iter_csv_file,
+                                    split_file_ranges, write_text_file, read_text_file,
+                                    read_json_file_async, write_json_file_async,
+                                    read_text_file_async, write_text_file_async,
+                                    shutdown_file_io_executor)
+from src.utils.bloom_filter import BloomFilter
+from src.utils.gc_control import bulk_load_gc
+from src.utils.id_allocator import IdAllocator
+from src.utils.integrity import IntegrityStatus, verify_bytes, verify_file
+from src.utils.memory_profiler import deep_sizeof, sizeof_by_type, trace_allocations
+from src.utils.rate_limiter import TokenBucketLimiter
+from src.utils.text_search import edit_distance, normalize_text
 
 
 class TestUserModel(unittest.TestCase):
@@ -37,6 +66,11 @@ class TestUserModel(unittest.TestCase):
         
         self.assertTrue(user.verify_password("password123"))
         self.assertFalse(user.verify_password("wrongpassword"))
+        self.assertTrue(User("Test", "t@example.com", "contraseña€").verify_password("contraseña€"))
+        
+        # Un hash cargado con caracteres no ASCII no debe lanzar TypeError
+        user.password_hash = "ñ" * 64
+        self.assertFalse(user.verify_password("password123"))
     
     def test_to_dict_from_dict(self):
         """Prueba la conversión a/desde diccionario"""
@@ -137,6 +171,1476 @@ class TestUserService(unittest.TestCase):
             os.remove(test_file)
 
 
+class TestCreatedAtIndex(unittest.TestCase):
+    """Pruebas para las consultas por fecha de registro"""
+    
+    def setUp(self):
+        """Carga usuarios con fechas de registro conocidas"""
+        self.test_file = "test_created_index.json"
+        data = [
+            {"id": i, "name": f"User {i}", "email": f"user{i}@example.com",
+             "password_hash": "x", "created_at": datetime(2024, 1, i).isoformat()}
+            for i in (5, 1, 3, 2, 4)
+        ]
+        write_json_file(self.test_file, data)
+        self.service = UserService()
+        self.service.load_from_json(self.test_file)
+    
+    def tearDown(self):
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+    
+    def test_find_by_created_range(self):
+        """Prueba la búsqueda por rango de fechas inclusivo"""
+        users = self.service.find_by_created_range(datetime(2024, 1, 2), datetime(2024, 1, 4))
+        self.assertEqual([user.id for user in users], [2, 3, 4])
+        
+        users = self.service.find_by_created_range(start=datetime(2024, 1, 3), limit=2)
+        self.assertEqual([user.id for user in users], [3, 4])
+        
+        self.assertEqual(self.service.find_by_created_range(datetime(2025, 1, 1)), [])
+    
+    def test_newest_oldest(self):
+        """Prueba la obtención de los usuarios más nuevos y más antiguos"""
+        self.assertEqual([user.id for user in self.service.newest(2)], [5, 4])
+        self.assertEqual([user.id for user in self.service.oldest(2)], [1, 2])
+    
+    def test_index_follows_register_and_delete(self):
+        """Prueba que el índice se mantiene al registrar y eliminar"""
+        self.service.register_user("Newest", "newest@example.com", "password")
+        self.assertEqual(self.service.newest(1)[0].name, "Newest")
+        
+        self.service.delete_user(1)
+        self.assertEqual(self.service.oldest(1)[0].id, 2)
+    
+    def test_mixed_naive_and_aware_dates(self):
+        """Prueba que las fechas con zona horaria se normalizan a hora local sin zona al indexar"""
+        aware = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+        local = aware.astimezone().replace(tzinfo=None)
+        data = [{"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "x",
+                 "created_at": (aware if i == 6 else datetime(2024, 1, i)).isoformat()} for i in (1, 6, 5)]
+        write_json_file(self.test_file, data)
+        success, message = self.service.load_from_json(self.test_file)
+        self.assertTrue(success, message)
+        self.assertEqual(self.service.get_user_by_id(6).created_at, local)
+        
+        self.assertTrue(self.service.apply_registered(
+            {"id": 7, "name": "User 7", "email": "user7@example.com", "password_hash": "x",
+             "created_at": "2024-01-04T00:00:00+05:00"}))
+        self.assertIsNone(self.service.get_user_by_id(7).created_at.tzinfo)
+        self.assertEqual([user.id for user in self.service.find_by_created_range(aware, aware)], [6])
+        self.assertEqual([user.id for user in self.service.oldest(3)], [1, 6, 7])
+
+
+class TestIdAllocator(unittest.TestCase):
+    """Pruebas para el asignador de IDs"""
+    
+    def test_allocate_and_reserve(self):
+        """Prueba la asignación individual y por bloques"""
+        allocator = IdAllocator()
+        self.assertEqual(allocator.allocate(), 1)
+        self.assertEqual(allocator.reserve(10000), range(2, 10002))
+        self.assertEqual(allocator.allocate(), 10002)
+        
+        allocator.observe(50000)
+        self.assertEqual(allocator.high_water_mark, 50000)
+    
+    def test_concurrent_allocation(self):
+        """Prueba que no se repiten IDs entre hilos"""
+        import threading
+        allocator = IdAllocator()
+        results = []
+        
+        def worker():
+            ids = [allocator.allocate() for _ in range(1000)]
+            ids.extend(allocator.reserve(100))
+            results.append(ids)
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        all_ids = [user_id for ids in results for user_id in ids]
+        self.assertEqual(len(all_ids), len(set(all_ids)))
+    
+    def test_services_are_independent(self):
+        """Prueba que cada servicio tiene su propio contador"""
+        first, second = UserService(), UserService()
+        first.register_user("User One", "one@example.com", "password1")
+        second.register_user("User Two", "two@example.com", "password2")
+        self.assertEqual(first.list_users()[0].id, 1)
+        self.assertEqual(second.list_users()[0].id, 1)
+    
+    def test_high_water_mark_is_persisted(self):
+        """Prueba que los IDs eliminados no se reutilizan tras guardar y cargar"""
+        test_file = "test_next_id.json"
+        service = UserService()
+        service.register_user("User One", "one@example.com", "password1")
+        service.register_user("User Two", "two@example.com", "password2")
+        service.delete_user(2)
+        service.save_to_json(test_file)
+        
+        try:
+            new_service = UserService()
+            new_service.load_from_json(test_file)
+            new_service.register_user("User Three", "three@example.com", "password3")
+            self.assertEqual(new_service.search_users_by_name("Three")[0].id, 3)
+        finally:
+            os.remove(test_file)
+    
+    def test_shared_allocator_never_moves_back(self):
+        """Prueba que cargar un archivo no hace retroceder un asignador compartido"""
+        test_file = "test_shared_ids.json"
+        small = UserService()
+        small.register_user("User One", "one@example.com", "password1")
+        small.save_to_json(test_file)
+        
+        allocator = IdAllocator()
+        first, second = UserService(id_allocator=allocator), UserService(id_allocator=allocator)
+        try:
+            for i in range(5):
+                first.register_user(f"User {i}", f"user{i}@example.com", "password")
+            second.load_from_json(test_file)
+            self.assertEqual(allocator.next_id, 6)
+            
+            second._restore_state(second._snapshot_state())
+            self.assertEqual(allocator.next_id, 6)
+            
+            success, _ = second.register_user("User Two", "two@example.com", "password2")
+            self.assertTrue(success)
+            self.assertEqual(second.get_user_by_email("two@example.com").id, 6)
+        finally:
+            os.remove(test_file)
+    
+    def test_import_mixes_new_and_explicit_ids(self):
+        """Prueba que los IDs nuevos no le quitan el ID a registros explícitos del mismo lote"""
+        service = UserService()
+        explicit = User("Explicit", "explicit@example.com", "password1", user_id=1).to_dict()
+        success, message = service.import_users([
+            {"name": "New", "email": "new@example.com", "password": "password1"}, explicit])
+        self.assertTrue(success)
+        self.assertIn("2 usuarios (0 omitidos)", message)
+        self.assertEqual(service.get_user_by_id(1).email, "explicit@example.com")
+        self.assertEqual(service.get_user_by_email("new@example.com").id, 2)
+    
+    def test_import_users(self):
+        """Prueba la importación en bloque"""
+        service = UserService()
+        service.register_user("User One", "one@example.com", "password1")
+        records = [{"name": f"Bulk {i}", "email": f"bulk{i}@example.com", "password": "password"}
+                   for i in range(100)]
+        records.append({"name": "Dup", "email": "one@example.com", "password": "password"})
+        
+        success, _ = service.import_users(records)
+        self.assertTrue(success)
+        self.assertEqual(len(service.list_users()), 101)
+        ids = [user.id for user in service.list_users()]
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+class TestFuzzySearch(unittest.TestCase):
+    """Pruebas para la búsqueda aproximada por nombre"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.service = UserService()
+        self.service.register_user("José García", "jose@example.com", "password1")
+        self.service.register_user("Joseph Smith", "joseph@example.com", "password2")
+        self.service.register_user("María López", "maria@example.com", "password3")
+    
+    def test_normalize_text(self):
+        """Prueba la normalización con eliminación de acentos"""
+        self.assertEqual(normalize_text("  José  GARCÍA "), "jose garcia")
+    
+    def test_edit_distance(self):
+        """Prueba la distancia de edición acotada con transposiciones"""
+        self.assertEqual(edit_distance("garcia", "gracia", 2), 1)
+        self.assertEqual(edit_distance("lopez", "lopes", 2), 1)
+        self.assertEqual(edit_distance("abc", "xyz123", 2), 3)
+    
+    def test_accent_and_typo_tolerance(self):
+        """Prueba que se encuentran nombres con acentos y errores de tipeo"""
+        results = self.service.search_users_fuzzy("jose garcia")
+        self.assertEqual(results[0].name, "José García")
+        
+        results = self.service.search_users_fuzzy("Gracia")
+        self.assertEqual([user.name for user in results], ["José García"])
+        
+        results = self.service.search_users_fuzzy("maria lopes")
+        self.assertEqual(results[0].name, "María López")
+    
+    def test_ranking_and_limit(self):
+        """Prueba el orden por distancia y el límite de resultados"""
+        results = self.service.search_users_fuzzy("jose")
+        self.assertEqual(results[0].name, "José García")
+        self.assertEqual(len(self.service.search_users_fuzzy("jose", limit=1)), 1)
+        self.assertEqual(self.service.search_users_fuzzy("zzzzzz"), [])
+    
+    def test_candidate_cap_keeps_best_overlap(self):
+        """Prueba que el límite de candidatos conserva las palabras con más trigramas compartidos"""
+        service = UserService()
+        # Cada palabra de relleno comparte un solo trigrama ('cia' o 'ia$') con "gracia"; García, dos
+        service.import_users([{"name": f"Ana Ciab{i}", "email": f"c{i}@example.com", "password": "password1"}
+                              for i in range(200)] +
+                             [{"name": f"Ana X{i}ia", "email": f"x{i}@example.com", "password": "password1"}
+                              for i in range(200)] +
+                             [{"name": "Pedro García", "email": "pedro@example.com", "password": "password1"}])
+        
+        self.assertEqual(service._name_index.candidate_tokens("gracia", 2, max_candidates=5)[0], "garcia")
+        results = service.search_users_fuzzy("gracia", max_candidates=5)
+        self.assertEqual([user.name for user in results], ["Pedro García"])
+        results = service.search_users_fuzzy("pedro gracia", max_candidates=5)
+        self.assertEqual([user.name for user in results], ["Pedro García"])
+    
+    def test_index_follows_delete(self):
+        """Prueba que los usuarios eliminados dejan de aparecer"""
+        user_id = self.service.search_users_fuzzy("maria")[0].id
+        self.service.delete_user(user_id)
+        self.assertNotIn("María López", [user.name for user in self.service.search_users_fuzzy("maria")])
+
+
+class TestAggregates(unittest.TestCase):
+    """Pruebas para las estadísticas agregadas"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.service = UserService()
+        self.service.register_user("User One", "one@example.com", "password1")
+        self.service.register_user("User Two", "two@Example.com", "password2")
+        self.service.register_user("User Three", "three@other.org", "password3")
+    
+    def test_stats(self):
+        """Prueba los contadores por dominio y fecha"""
+        stats = self.service.stats()
+        today = datetime.now().date().isoformat()
+        
+        self.assertEqual(stats['total_users'], 3)
+        self.assertEqual(stats['domains'], {'example.com': 2, 'other.org': 1})
+        self.assertEqual(stats['signups_by_day'], {today: 3})
+        self.assertEqual(stats['signups_by_month'], {today[:7]: 3})
+        self.assertEqual(self.service.stats(top_domains=1)['domains'], {'example.com': 2})
+    
+    def test_users_by_domain(self):
+        """Prueba la consulta de usuarios por dominio"""
+        users = self.service.users_by_domain("EXAMPLE.com")
+        self.assertEqual([user.name for user in users], ["User One", "User Two"])
+        self.assertEqual(self.service.users_by_domain("missing.com"), [])
+    
+    def test_stats_follow_delete_and_load(self):
+        """Prueba que los contadores siguen a bajas y cargas"""
+        self.service.delete_user(self.service.users_by_domain("other.org")[0].id)
+        self.assertEqual(self.service.stats()['domains'], {'example.com': 2})
+        
+        test_file = "test_stats.json"
+        self.service.save_to_json(test_file)
+        try:
+            new_service = UserService()
+            new_service.load_from_json(test_file)
+            self.assertEqual(new_service.stats(), self.service.stats())
+        finally:
+            os.remove(test_file)
+
+
+class TestEmailFilter(unittest.TestCase):
+    """Pruebas para el filtro de Bloom de emails"""
+    
+    def test_bloom_filter(self):
+        """Prueba que no hay falsos negativos y la tasa de falsos positivos es razonable"""
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        bloom.update(f"user{i}@example.com" for i in range(1000))
+        
+        self.assertTrue(all(f"user{i}@example.com" in bloom for i in range(1000)))
+        false_positives = sum(f"other{i}@example.com" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+        self.assertTrue("user5@example.com" in restored)
+        self.assertEqual(len(restored), 1000)
+    
+    def test_register_uses_filter(self):
+        """Prueba que el registro consulta el filtro y lleva estadísticas"""
+        service = UserService(email_filter=True)
+        service.register_user("User One", "one@example.com", "password1")
+        service.register_user("User Two", "two@example.com", "password2")
+        
+        success, _ = service.register_user("Duplicate", "ONE@example.com", "password")
+        self.assertFalse(success)
+        
+        stats = service.email_filter_stats()
+        self.assertTrue(stats['enabled'])
+        self.assertEqual(stats['checks'], 3)
+        self.assertGreaterEqual(stats['rejected'], 1)
+        self.assertGreaterEqual(stats['passed'], 1)
+    
+    def test_filter_persisted_and_rebuilt(self):
+        """Prueba que el filtro se guarda junto al archivo y se reconstruye al cargar"""
+        test_file = "test_filter.json"
+        service = UserService(email_filter=True)
+        service.register_user("User One", "one@example.com", "password1")
+        service.save_to_json(test_file)
+        
+        try:
+            self.assertTrue(os.path.exists(f"{test_file}.bloom"))
+            
+            new_service = UserService(email_filter=True)
+            new_service.load_from_json(test_file)
+            success, _ = new_service.register_user("Duplicate", "one@example.com", "password")
+            self.assertFalse(success)
+            
+            success, _ = new_service.load_email_filter(f"{test_file}.bloom")
+            self.assertTrue(success)
+            
+            # Un filtro de datos anteriores se reconstruye en lugar de instalarse
+            new_service.register_user("User Two", "two@example.com", "password2")
+            new_service.delete_user(1)
+            success, message = new_service.load_email_filter(f"{test_file}.bloom")
+            self.assertTrue(success)
+            self.assertIn("se reconstruyó", message)
+            success, _ = new_service.register_user("Duplicate", "two@example.com", "password")
+            self.assertFalse(success)
+            self.assertIn("two@example.com", new_service._email_filter)
+        finally:
+            for filename in (test_file, f"{test_file}.bloom"):
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+
+class TestBatchCli(unittest.TestCase):
+    """Pruebas para el modo por lotes de la línea de comandos"""
+    
+    def setUp(self):
+        """Crea un directorio temporal con un archivo NDJSON de entrada"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = os.path.join(self.tmpdir.name, "users.json")
+        self.source = os.path.join(self.tmpdir.name, "input.ndjson")
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('{"name": "Ana Pérez", "email": "ana@example.com", "password": "secret1"}\n')
+            f.write('{"name": "Bob", "email": "bob@other.org", "password": "secret2"}\n')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def run_cli(self, *argv):
+        """Ejecuta un subcomando y devuelve (código, líneas de salida)"""
+        output = StringIO()
+        with redirect_stdout(output):
+            code = batch.run(['--store', self.store, *argv])
+        return code, output.getvalue().splitlines()
+    
+    def test_import_search_delete(self):
+        """Prueba importar, buscar y eliminar sin interacción"""
+        code, lines = self.run_cli('import', self.source)
+        self.assertEqual(code, 0)
+        self.assertTrue(json.loads(lines[0])['ok'])
+        
+        code, lines = self.run_cli('search', 'Ana', 'Bob')
+        self.assertEqual([json.loads(line)['query'] for line in lines], ['Ana', 'Bob'])
+        
+        code, lines = self.run_cli('delete', '1', '99')
+        self.assertEqual([json.loads(line)['ok'] for line in lines], [True, False])
+        
+        code, lines = self.run_cli('stats')
+        self.assertEqual(json.loads(lines[0])['total_users'], 1)
+    
+    def test_import_explicit_ids_across_batches(self):
+        """Prueba que un CSV con IDs vacíos y explícitos no pierde filas entre lotes"""
+        source = os.path.join(self.tmpdir.name, "mixed.csv")
+        with open(source, 'w', encoding='utf-8', newline='') as f:
+            f.write("id,name,email,password\n")
+            f.write(",Ana,ana@example.com,secret1\n,Bob,bob@example.com,secret2\n")
+            f.write("2,Carla,carla@example.com,secret3\n1,Dani,dani@example.com,secret4\n")
+        with unittest.mock.patch.object(batch, 'IMPORT_BATCH_SIZE', 2):
+            code, lines = self.run_cli('import', source)
+        self.assertEqual(code, 0)
+        code, lines = self.run_cli('stats')
+        self.assertEqual(json.loads(lines[0])['total_users'], 4)
+    
+    def test_store_defaults_to_settings(self):
+        """Prueba que el almacén por defecto sale de la configuración"""
+        self.assertEqual(batch.build_parser().parse_args(['stats']).store, DEFAULT_DATA_FILE)
+    
+    def test_export_and_convert(self):
+        """Prueba exportar a CSV y convertir entre formatos"""
+        self.run_cli('import', self.source)
+        
+        code, lines = self.run_cli('export', '--format', 'csv')
+        self.assertEqual(lines[0], 'id,name,email,password_hash,created_at')
+        self.assertEqual(len(lines), 3)
+        
+        target = os.path.join(self.tmpdir.name, "users.csv")
+        code, _ = self.run_cli('convert', self.store, target)
+        self.assertEqual(code, 0)
+        
+        service = UserService()
+        batch.load_into(service, target)
+        self.assertEqual(len(service.list_users()), 2)
+
+
+class TestLineFormats(unittest.TestCase):
+    """Pruebas para los formatos NDJSON y CSV"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = UserService()
+        self.service.register_user('Pérez, "Ana"', "ana@example.com", "password1")
+        self.service.register_user("Bob | Smith", "bob@example.com", "password2")
+        self.service.register_user("Carla", "carla@example.com", "password3")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+    
+    def assert_same_users(self, service):
+        original = [user.to_dict() for user in self.service.list_users()]
+        self.assertEqual([user.to_dict() for user in service.list_users()], original)
+    
+    def test_ndjson_round_trip(self):
+        """Prueba guardar y cargar NDJSON, también en paralelo"""
+        filename = self.path("users.ndjson")
+        self.assertTrue(self.service.save_to_ndjson(filename)[0])
+        
+        new_service = UserService()
+        self.assertTrue(new_service.load_from_ndjson(filename)[0])
+        self.assert_same_users(new_service)
+        
+        parallel_service = UserService()
+        self.assertTrue(parallel_service.load_from_ndjson(filename, workers=2)[0])
+        self.assert_same_users(parallel_service)
+    
+    def test_csv_round_trip_with_special_characters(self):
+        """Prueba que el CSV escapa comas, comillas y barras verticales"""
+        filename = self.path("users.csv")
+        self.assertTrue(self.service.save_to_csv(filename)[0])
+        
+        new_service = UserService()
+        self.assertTrue(new_service.load_from_csv(filename)[0])
+        self.assert_same_users(new_service)
+    
+    def test_append(self):
+        """Prueba las exportaciones incrementales"""
+        for filename, save in ((self.path("users.ndjson"), self.service.save_to_ndjson),
+                               (self.path("users.csv"), self.service.save_to_csv)):
+            users = self.service.list_users()
+            save(filename, users[:1])
+            save(filename, users[1:], append=True)
+            
+            reader = iter_csv_file if filename.endswith('.csv') else iter_ndjson_file
+            self.assertEqual([int(row['id']) for row in reader(filename)], [user.id for user in users])
+    
+    def test_byte_range_splitting(self):
+        """Prueba que los rangos cubren cada registro exactamente una vez"""
+        self.service.import_users({"name": f"User {i}", "email": f"user{i}@example.com",
+                                   "password": "password"} for i in range(200))
+        for filename, save, reader in ((self.path("users.ndjson"), self.service.save_to_ndjson, iter_ndjson_file),
+                                       (self.path("users.csv"), self.service.save_to_csv, iter_csv_file)):
+            save(filename)
+            expected = [str(row['id']) for row in reader(filename)]
+            for chunks in (1, 3, 7, 64):
+                ids = [str(row['id']) for start, end in split_file_ranges(filename, chunks)
+                       for row in reader(filename, start, end)]
+                self.assertEqual(ids, expected)
+    
+    def test_failed_load_keeps_data(self):
+        """Prueba que un archivo corrupto no vacía el servicio"""
+        filename = self.path("broken.ndjson")
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('{"id": 1, "name": "A", "email": "a@x.com", "password_hash": "h", '
+                    '"created_at": "2024-01-01T00:00:00"}\n{"id": 2, "na')
+        
+        success, _ = self.service.load_from_ndjson(filename)
+        self.assertFalse(success)
+        self.assertEqual(len(self.service.list_users()), 3)
+
+
+class TestAuthentication(unittest.TestCase):
+    """Pruebas para la autenticación y el limitador de tasa"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.service = UserService()
+        self.service.register_user("User One", "one@example.com", "password1")
+    
+    def test_authenticate(self):
+        """Prueba credenciales válidas, incorrectas e inexistentes"""
+        success, _ = self.service.authenticate("ONE@example.com", "password1")
+        self.assertTrue(success)
+        
+        success, message = self.service.authenticate("one@example.com", "wrong")
+        self.assertFalse(success)
+        
+        success, other_message = self.service.authenticate("missing@example.com", "password1")
+        self.assertFalse(success)
+        self.assertEqual(message, other_message)
+    
+    def test_account_rate_limit(self):
+        """Prueba que los intentos repetidos contra una cuenta se limitan"""
+        results = [self.service.authenticate("one@example.com", "wrong")[1] for _ in range(10)]
+        self.assertTrue(results[-1].startswith("Demasiados intentos"))
+        
+        success, message = self.service.authenticate("one@example.com", "password1")
+        self.assertFalse(success)
+        self.assertTrue(message.startswith("Demasiados intentos"))
+    
+    def test_token_bucket(self):
+        """Prueba la recarga de tokens y la expiración de claves inactivas"""
+        limiter = TokenBucketLimiter(capacity=2, refill_rate=1, ttl=10)
+        self.assertTrue(limiter.allow("a", now=0))
+        self.assertTrue(limiter.allow("a", now=0))
+        self.assertFalse(limiter.allow("a", now=0.5))
+        self.assertAlmostEqual(limiter.retry_after("a", now=0.5), 0.5)
+        self.assertTrue(limiter.allow("a", now=1.5))
+        
+        limiter.allow("b", now=5)
+        self.assertEqual(len(limiter), 2)
+        limiter.allow("b", now=12)
+        self.assertEqual(len(limiter), 1)
+
+
+class TestCache(unittest.TestCase):
+    """Pruebas para la caché de lecturas"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.service = CachedUserService(UserService(), max_entries=100, ttl=60)
+        self.service.register_user("User One", "one@example.com", "password1")
+        self.service.register_user("User Two", "two@example.com", "password2")
+    
+    def test_lru_cache(self):
+        """Prueba el desalojo por entradas y por peso, y la caducidad"""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        
+        weighted = LRUCache(max_entries=10, max_weight=5, weigher=len)
+        weighted.put("a", [1, 2, 3])
+        weighted.put("b", [1, 2, 3])
+        self.assertIs(weighted.get("a"), MISSING)
+        
+        expiring = LRUCache(ttl=0)
+        expiring.put("a", 1)
+        self.assertIs(expiring.get("a"), MISSING)
+        self.assertEqual(expiring.stats()['expirations'], 1)
+    
+    def test_hits_and_misses(self):
+        """Prueba que las lecturas repetidas se sirven desde la caché"""
+        self.service.search_users_by_name("User")
+        self.service.search_users_by_name("user")
+        self.service.get_user_by_id(1)
+        self.service.get_user_by_id(1)
+        
+        stats = self.service.cache_stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 2)
+    
+    def test_invalidation_on_register(self):
+        """Prueba que registrar invalida IDs y búsquedas afectadas"""
+        self.assertIsNone(self.service.get_user_by_id(3))
+        self.assertEqual(len(self.service.search_users_by_name("User")), 2)
+        self.assertEqual(len(self.service.search_users_by_name("One")), 1)
+        
+        self.service.register_user("User Three", "three@example.com", "password3")
+        self.assertEqual(self.service.get_user_by_id(3).name, "User Three")
+        self.assertEqual(len(self.service.search_users_by_name("User")), 3)
+        self.assertEqual(self.service.cache_stats()['entries'], 3)  # "one" sigue en caché
+    
+    def test_invalidation_on_delete_and_load(self):
+        """Prueba que eliminar y cargar no dejan resultados obsoletos"""
+        self.assertEqual(len(self.service.search_users_by_name("User")), 2)
+        self.assertEqual(self.service.search_users_fuzzy("usr two")[0].id, 2)
+        self.service.delete_user(2)
+        self.assertIsNone(self.service.get_user_by_id(2))
+        self.assertEqual(len(self.service.search_users_by_name("User")), 1)
+        self.assertEqual(self.service.search_users_fuzzy("usr two"), [])
+        
+        test_file = "test_cache.json"
+        other = UserService()
+        other.register_user("Loaded User", "loaded@example.com", "password")
+        other.save_to_json(test_file)
+        try:
+            self.service.load_from_json(test_file)
+            self.assertEqual([user.name for user in self.service.search_users_by_name("User")],
+                             ["Loaded User"])
+        finally:
+            os.remove(test_file)
+    
+    def test_invalidation_on_direct_writes(self):
+        """Prueba que las altas que no pasan por register_user también invalidan"""
+        service = CachedUserService(UserService(), max_entries=100, ttl=60)
+        self.assertIsNone(service.get_user_by_id(1))
+        self.assertEqual(service.search_users_by_name("ana"), [])
+        
+        service.apply_registered({'id': 1, 'name': "Ana", 'email': "ana@example.com",
+                                  'password_hash': "x", 'created_at': datetime.now().isoformat()})
+        self.assertEqual(service.get_user_by_id(1).name, "Ana")
+        self.assertEqual(len(service.search_users_by_name("ana")), 1)
+        
+        service._service.delete_user(1)
+        self.assertIsNone(service.get_user_by_id(1))
+        self.assertEqual(service.search_users_by_name("ana"), [])
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Pruebas para el flujo de cambios"""
+    
+    def setUp(self):
+        """Configuración para cada prueba"""
+        self.service = UserService()
+        self.received = []
+        self.service.events.subscribe(self.received.append)
+    
+    def test_sync_subscriber(self):
+        """Prueba que registrar, eliminar y cargar publican eventos tipados"""
+        self.service.register_user("User One", "one@example.com", "password1")
+        self.service.delete_user(1)
+        
+        test_file = "test_events.json"
+        self.service.save_to_json(test_file)
+        try:
+            self.service.load_from_json(test_file)
+        finally:
+            os.remove(test_file)
+        
+        self.assertEqual([event.type for event in self.received],
+                         [EventType.REGISTERED, EventType.DELETED, EventType.LOADED])
+        self.assertEqual([event.sequence for event in self.received], [1, 2, 3])
+        self.assertEqual(self.received[0].data['email'], "one@example.com")
+        self.assertEqual(self.received[2].data['count'], 0)
+    
+    def test_read_since_and_gap(self):
+        """Prueba la lectura desde una secuencia y la detección de huecos"""
+        feed = ChangeFeed(capacity=3)
+        for user_id in range(1, 6):
+            feed.publish(EventType.DELETED, user_id)
+        
+        self.assertEqual([event.user_id for event in feed.read_since(3)], [4, 5])
+        self.assertEqual([event.user_id for event in feed.read_since(2, limit=1)], [3])
+        self.assertEqual(feed.read_since(5), [])
+        with self.assertRaises(EventGapError):
+            feed.read_since(1)
+    
+    def test_subscribe_replays_before_live_events(self):
+        """Prueba que la repetición llega completa, en orden y sin duplicados aunque otro hilo publique"""
+        feed = ChangeFeed(capacity=1000)
+        for user_id in range(1, 201):
+            feed.publish(EventType.DELETED, user_id)
+        received = []
+        
+        def slow_callback(event):
+            received.append(event.sequence)
+            time.sleep(0.0005)
+        
+        def producer():
+            for user_id in range(201, 301):
+                feed.publish(EventType.DELETED, user_id)
+        
+        thread = threading.Thread(target=producer)
+        feed.publish(EventType.DELETED, 0)
+        thread.start()
+        feed.subscribe(slow_callback, from_sequence=100)
+        thread.join()
+        self.assertEqual(received[0], 101)
+        self.assertEqual(received, list(range(101, feed.last_sequence + 1)))
+        
+        small = ChangeFeed(capacity=2)
+        for user_id in range(1, 6):
+            small.publish(EventType.DELETED, user_id)
+        late = []
+        with self.assertRaises(EventGapError):
+            small.subscribe(late.append, from_sequence=1)
+        small.publish(EventType.DELETED, 6)
+        self.assertEqual(late, [])
+    
+    def test_async_subscriber_and_resume(self):
+        """Prueba el suscriptor asíncrono, publicando desde otro hilo, y la reanudación"""
+        async def consume():
+            subscription = self.service.events.subscribe_async()
+            
+            def producer():
+                self.service.register_user("User One", "one@example.com", "password1")
+                self.service.register_user("User Two", "two@example.com", "password2")
+            
+            thread = threading.Thread(target=producer)
+            thread.start()
+            first = await subscription.get(timeout=5)
+            subscription.close()
+            thread.join()
+            
+            resumed = self.service.events.subscribe_async(from_sequence=first.sequence)
+            second = await resumed.get(timeout=5)
+            resumed.close()
+            return first, second
+        
+        first, second = asyncio.run(consume())
+        self.assertEqual((first.sequence, second.sequence), (1, 2))
+        self.assertEqual(second.data['name'], "User Two")
+
+
+class TestReplication(unittest.TestCase):
+    """Pruebas para la replicación primario/réplica"""
+    
+    def setUp(self):
+        """Crea el directorio de replicación"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "replication")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def assert_in_sync(self, primary_service, replica):
+        self.assertEqual([user.to_dict() for user in replica.list_users()],
+                         [user.to_dict() for user in primary_service.list_users()])
+    
+    def test_apply_registered_uses_id_index(self):
+        """Prueba aplicar altas y bajas replicadas por ID sin duplicar ni reordenar"""
+        source = UserService()
+        for i in range(5):
+            source.register_user(f"User {i}", f"user{i}@example.com", "password1")
+        service = UserService()
+        for user in source.list_users():
+            self.assertTrue(service.apply_registered(user.to_dict()))
+        self.assertFalse(service.apply_registered(source.get_user_by_id(3).to_dict()))
+        
+        self.assertTrue(service.delete_user(3)[0])
+        self.assertIsNone(service.get_user_by_id(3))
+        self.assertEqual([user.id for user in service.list_users()], [1, 2, 4, 5])
+        self.assertEqual(service.get_user_by_id(4).email, "user3@example.com")
+        service.register_user("New", "new@example.com", "password1")
+        self.assertEqual(service.get_user_by_email("new@example.com").id, 6)
+    
+    def test_snapshot_changes_and_rotation(self):
+        """Prueba snapshot inicial, cambios incrementales, rotación y cargas"""
+        service = UserService()
+        service.register_user("User One", "one@example.com", "password1")
+        primary = ReplicationPrimary(service, self.directory, snapshot_every=3)
+        primary.start()
+        
+        replica = ReplicaService(self.directory)
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        
+        for i in range(2, 9):
+            service.register_user(f"User {i}", f"user{i}@example.com", "password")
+            if i % 2:
+                primary.flush()
+                self.assertGreater(replica.lag()['pending_bytes'] + replica.lag()['new_generation'], 0)
+                replica.poll()
+        service.delete_user(3)
+        primary.flush()
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        self.assertEqual(replica.lag()['lag_seconds'], 0.0)
+        self.assertEqual(replica.search_users_by_name("User 5")[0].id, 5)
+        
+        test_file = os.path.join(self.tmpdir.name, "reload.json")
+        other = UserService()
+        other.register_user("Reloaded", "reloaded@example.com", "password")
+        other.save_to_json(test_file)
+        service.load_from_json(test_file)
+        primary.flush()
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        primary.stop()
+    
+    def test_snapshot_writes_off_the_publish_path(self):
+        """Prueba que start no pierde eventos y que los errores de snapshot se informan y se reintentan"""
+        service = UserService()
+        service.register_user("User One", "one@example.com", "password1")
+        primary = ReplicationPrimary(service, self.directory, snapshot_every=2)
+        subscribe = service.events.subscribe
+        
+        def subscribe_after_register(*args, **kwargs):
+            # Un alta entre el snapshot inicial y la suscripción
+            service.register_user("User Two", "two@example.com", "password1")
+            return subscribe(*args, **kwargs)
+        
+        with unittest.mock.patch.object(service.events, 'subscribe', side_effect=subscribe_after_register):
+            primary.start()
+        replica = ReplicaService(self.directory)
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        
+        # La tercera alta llena el registro y la cuarta rota a un snapshot que no se puede escribir
+        with unittest.mock.patch('src.services.replication.write_json_file', return_value=False):
+            for i in (3, 4):
+                service.register_user(f"User {i}", f"user{i}@example.com", "password1")
+            with self.assertRaises(IOError):
+                primary.flush()
+        self.assertEqual(primary.snapshot_errors, 1)
+        self.assertEqual(service.events.callback_errors, 0)
+        
+        service.register_user("User 5", "user5@example.com", "password1")
+        primary.flush()
+        self.assertIsNone(primary.last_error)
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        primary.stop()
+    
+    def test_replica_recovers_after_primary_restart(self):
+        """Prueba que la réplica recarga el snapshot cuando el primario se reinicia"""
+        test_file = os.path.join(self.tmpdir.name, "users.json")
+        service = UserService()
+        for i in range(5):
+            service.register_user(f"User {i}", f"user{i}@example.com", "password")
+        primary = ReplicationPrimary(service, self.directory)
+        primary.start()
+        service.delete_user(1)
+        replica = ReplicaService(self.directory)
+        replica.poll()
+        self.assert_in_sync(service, replica)
+        service.save_to_json(test_file)
+        primary.stop()
+        
+        # Nuevo proceso: las secuencias de eventos vuelven a empezar
+        restarted = UserService()
+        restarted.load_from_json(test_file)
+        primary = ReplicationPrimary(restarted, self.directory)
+        primary.start()
+        self.assertLess(restarted.events.last_sequence, replica.applied_sequence)
+        restarted.register_user("After Restart", "after@example.com", "password")
+        restarted.delete_user(2)
+        replica.poll()
+        self.assert_in_sync(restarted, replica)
+        self.assertEqual(replica.get_user_by_id(6).name, "After Restart")
+        primary.stop()
+    
+    def test_replica_follows_primary_process(self):
+        """Prueba una réplica que sigue a un primario en otro proceso"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        script = (
+            "import sys, time\n"
+            f"sys.path.insert(0, {root!r})\n"
+            "from src.services.user_service import UserService\n"
+            "from src.services.replication import ReplicationPrimary\n"
+            "service = UserService()\n"
+            f"primary = ReplicationPrimary(service, {self.directory!r}, snapshot_every=20)\n"
+            "primary.start()\n"
+            "for i in range(50):\n"
+            "    service.register_user(f'User {i}', f'user{i}@example.com', 'password')\n"
+            "    time.sleep(0.002)\n"
+            "service.delete_user(10)\n"
+            "primary.stop()\n"
+        )
+        process = subprocess.Popen([sys.executable, "-c", script])
+        replica = ReplicaService(self.directory)
+        replica.start(interval=0.01)
+        try:
+            process.wait(timeout=30)
+            self.assertEqual(process.returncode, 0)
+            
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and len(replica.list_users()) != 49:
+                time.sleep(0.02)
+        finally:
+            replica.stop()
+        
+        self.assertEqual(len(replica.list_users()), 49)
+        self.assertIsNone(replica.get_user_by_id(10))
+        self.assertEqual(replica.get_user_by_id(50).name, "User 49")
+
+
+class TestMemoryReport(unittest.TestCase):
+    """Pruebas para el reporte de memoria"""
+    
+    def test_shared_objects_counted_once(self):
+        """Prueba que los objetos compartidos se cuentan una sola vez"""
+        name = "x" * 1000
+        seen = set()
+        first = deep_sizeof([name], seen)
+        second = deep_sizeof([name], seen)
+        self.assertGreater(first, 1000)
+        self.assertLess(second, 1000)
+        self.assertEqual(sizeof_by_type([[name, name]])['str'], sys.getsizeof(name))
+    
+    def test_service_report(self):
+        """Prueba el desglose por componente y el tamaño por usuario"""
+        service = UserService()
+        empty = service.memory_report()
+        service.import_users([{'name': f"Usuario {i}", 'email': f"user{i}@example.com", 'password': "secret1"}
+                              for i in range(200)])
+        report = service.memory_report()
+        
+        self.assertEqual(report['users'], 200)
+        self.assertEqual(report['total_bytes'],
+                         sum(report['breakdown'].values()) + sum(report['indexes'].values()))
+        self.assertEqual(report['breakdown']['datetimes'], 200 * sys.getsizeof(datetime.now()))
+        self.assertGreater(report['breakdown']['strings'], 200 * 4 * 40)
+        self.assertGreater(report['indexes']['name_index'], empty['indexes']['name_index'])
+        self.assertAlmostEqual(report['per_user_bytes'], report['total_bytes'] / 200)
+        
+        cached = CachedUserService(service)
+        cached.search_users_by_name("Usuario")
+        self.assertGreater(cached.memory_report()['indexes']['cache'], 0)
+    
+    def test_trace_allocations(self):
+        """Prueba la diferencia de tracemalloc alrededor de una carga"""
+        service = UserService()
+        for i in range(100):
+            service.register_user(f"Usuario {i}", f"user{i}@example.com", "secret1")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "users.json")
+            service.save_to_json(filename)
+            
+            (success, _), trace = trace_allocations(UserService().load_from_json, filename, top=5)
+            self.assertTrue(success)
+            self.assertGreater(trace['net_bytes'], 100 * 200)
+            self.assertGreaterEqual(trace['peak_bytes'], trace['net_bytes'])
+            self.assertLessEqual(len(trace['top']), 5)
+            
+            output = StringIO()
+            with redirect_stdout(output):
+                code = batch.run(['--store', filename, 'memory', '--trace'])
+            report = json.loads(output.getvalue())
+            self.assertEqual(code, 0)
+            self.assertEqual(report['users'], 100)
+            self.assertIn('load', report)
+
+
+class TestAsyncFileIO(unittest.TestCase):
+    """Pruebas para la E/S de archivos asíncrona"""
+    
+    def setUp(self):
+        """Crea un directorio temporal"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        shutdown_file_io_executor()
+        self.tmpdir.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+    
+    def test_same_output_as_sync(self):
+        """Prueba que las variantes asíncronas escriben y leen lo mismo que las síncronas"""
+        data = {'next_id': 3, 'users': [{'id': 1, 'name': "José Núñez"}, {'id': 2, 'name': "Bob"}]}
+        lines = ["# cabecera", "1|José|jose@example.com", "2|Bob|bob@example.com"]
+        
+        async def roundtrip():
+            self.assertTrue(await write_json_file_async(self.path("async.json"), data, chunk_size=8))
+            self.assertTrue(await write_text_file_async(self.path("async.txt"), lines, chunk_size=8))
+            return (await read_json_file_async(self.path("async.json"), chunk_size=8),
+                    await read_text_file_async(self.path("async.txt"), chunk_size=8),
+                    await read_json_file_async(self.path("missing.json")))
+        
+        json_data, text_lines, missing = asyncio.run(roundtrip())
+        write_json_file(self.path("sync.json"), data)
+        write_text_file(self.path("sync.txt"), lines)
+        
+        self.assertEqual(json_data, data)
+        self.assertEqual(text_lines, read_text_file(self.path("sync.txt")))
+        self.assertIsNone(missing)
+        for name in ("json", "txt"):
+            with open(self.path(f"async.{name}"), 'rb') as a, open(self.path(f"sync.{name}"), 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+    
+    def test_cancellation_keeps_previous_file(self):
+        """Prueba que cancelar una escritura deja el archivo anterior intacto"""
+        target = self.path("users.txt")
+        write_text_file(target, ["original"])
+        started, gate = threading.Event(), threading.Event()
+        
+        def slow_lines():
+            yield "nueva"
+            started.set()
+            gate.wait()
+            yield "otra"
+        
+        async def cancel_write():
+            task = asyncio.ensure_future(write_text_file_async(target, slow_lines(), chunk_size=1))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        
+        asyncio.run(cancel_write())
+        gate.set()
+        shutdown_file_io_executor(wait=True)
+        
+        self.assertEqual(read_text_file(target), ["original"])
+        self.assertEqual(os.listdir(self.tmpdir.name), ["users.txt"])
+    
+    def test_sync_write_is_atomic(self):
+        """Prueba que un error al serializar no trunca el archivo existente"""
+        target = self.path("users.json")
+        write_json_file(target, {'users': []})
+        with self.assertRaises(TypeError):
+            write_json_file(target, {'users': [object()]})
+        self.assertEqual(read_json_file(target), {'users': []})
+        self.assertEqual(os.listdir(self.tmpdir.name), ["users.json"])
+    
+    def test_service_async_save_and_load(self):
+        """Prueba guardar y cargar el servicio de forma asíncrona"""
+        service = UserService()
+        service.register_user("Ana Pérez", "ana@example.com", "secret1")
+        service.register_user("Bob", "bob@example.com", "secret2")
+        target = self.path("users.json")
+        
+        async def save_and_load():
+            saved = await service.save_to_json_async(target)
+            loaded_service = UserService()
+            loaded = await loaded_service.load_from_json_async(target)
+            return saved, loaded, loaded_service
+        
+        (saved, _), (loaded, _), loaded_service = asyncio.run(save_and_load())
+        self.assertTrue(saved and loaded)
+        self.assertFalse(service.has_unsaved_changes())
+        self.assertEqual([user.to_dict() for user in loaded_service.list_users()],
+                         [user.to_dict() for user in service.list_users()])
+    
+    def test_async_load_builds_off_the_event_loop(self):
+        """Prueba que la carga asíncrona verifica, parsea e indexa en el pool y solo intercambia el estado en el bucle"""
+        service = UserService()
+        for i in range(5):
+            service.register_user(f"Usuario {i}", f"user{i}@example.com", "secret1")
+        target = self.path("users.json")
+        service.save_to_json(target)
+        
+        threads = []
+        rebuild_indexes = UserService._rebuild_indexes
+        
+        def verify(*args):
+            threads.append(threading.current_thread())
+            return verify_bytes(*args)
+        
+        def rebuild(instance):
+            threads.append(threading.current_thread())
+            rebuild_indexes(instance)
+        
+        loaded_service = UserService()
+        with unittest.mock.patch('src.services.user_service.verify_bytes', side_effect=verify), \
+                unittest.mock.patch.object(UserService, '_rebuild_indexes', autospec=True, side_effect=rebuild):
+            success, message = asyncio.run(loaded_service.load_from_json_async(target))
+        
+        self.assertTrue(success, message)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(loaded_service.get_user_by_email("user3@example.com").id, 4)
+        self.assertEqual(len(loaded_service.search_users_by_name("usuario")), 5)
+        self.assertEqual(loaded_service.events.read_since(0)[-1].type, EventType.LOADED)
+        
+        write_json_file(target, [{'id': 1, 'name': name, 'email': f"{name}@example.com", 'password_hash': "x",
+                                  'created_at': "2024-01-02T03:04:05"} for name in ("ana", "bob")])
+        success, message = asyncio.run(loaded_service.load_from_json_async(target))
+        self.assertFalse(success)
+        self.assertIn("repetido", message)
+        self.assertEqual(len(loaded_service.list_users()), 5)
+
+
+class TestIntegrity(unittest.TestCase):
+    """Pruebas para las sumas de verificación de los archivos guardados"""
+    
+    def setUp(self):
+        """Guarda un servicio con algunos usuarios en JSON y TXT"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = UserService()
+        for i in range(5):
+            self.service.register_user(f"Usuario {i}", f"user{i}@example.com", "secret1")
+        self.json_file = os.path.join(self.tmpdir.name, "users.json")
+        self.txt_file = os.path.join(self.tmpdir.name, "users.txt")
+        self.service.save_to_json(self.json_file)
+        self.service.export_to_txt(self.txt_file)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def rewrite(self, filename, transform):
+        with open(filename, 'rb') as f:
+            data = f.read()
+        with open(filename, 'wb') as f:
+            f.write(transform(data))
+    
+    def test_saved_files_verify(self):
+        """Prueba que los archivos guardados verifican y siguen siendo JSON válido"""
+        for filename in (self.json_file, self.txt_file):
+            result = verify_file(filename, chunk_size=7)
+            self.assertEqual(result.status, IntegrityStatus.OK)
+            self.assertEqual(result.count, 5)
+        self.assertEqual(len(read_json_file(self.json_file)['users']), 5)
+    
+    def test_corruption_is_rejected_on_load(self):
+        """Prueba que una línea perdida o un byte cambiado impiden la carga"""
+        self.rewrite(self.txt_file, lambda data: data.replace(b"3|Usuario 2", b"3|Usuario X"))
+        self.rewrite(self.json_file, lambda data: data[:data.index(b'    {"id": 5')] + data[data.index(b'  ],'):])
+        
+        self.assertEqual(verify_file(self.txt_file).status, IntegrityStatus.CORRUPT)
+        self.assertEqual(verify_file(self.json_file).status, IntegrityStatus.CORRUPT)
+        
+        target = UserService()
+        target.register_user("Existente", "existente@example.com", "secret1")
+        for loader, filename in ((target.load_from_txt, self.txt_file), (target.load_from_json, self.json_file)):
+            success, message = loader(filename)
+            self.assertFalse(success)
+            self.assertIn("dañado", message)
+        self.assertEqual(len(target.list_users()), 1)
+    
+    def test_truncated_and_legacy_files(self):
+        """Prueba que un archivo truncado falla y uno sin suma se acepta"""
+        self.rewrite(self.txt_file, lambda data: data[:data.rindex(b'# checksum ')])
+        self.assertEqual(verify_file(self.txt_file).status, IntegrityStatus.CORRUPT)
+        
+        legacy = os.path.join(self.tmpdir.name, "legacy.json")
+        write_json_file(legacy, self.service.export_data())
+        self.assertEqual(verify_file(legacy).status, IntegrityStatus.MISSING)
+        self.assertTrue(UserService().load_from_json(legacy)[0])
+        
+        output = StringIO()
+        with redirect_stdout(output):
+            code = batch.run(['verify', self.json_file, legacy, self.txt_file])
+        statuses = [json.loads(line)['status'] for line in output.getvalue().splitlines()]
+        self.assertEqual(statuses, ['ok', 'missing', 'corrupt'])
+        self.assertEqual(code, 1)
+
+
+class TestMigrations(unittest.TestCase):
+    """Pruebas para las migraciones de esquema"""
+    
+    def setUp(self):
+        """Crea registros con el esquema 1 (contraseñas en texto plano)"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.records = [{'id': i, 'name': f"Usuario {i}", 'email': f"user{i}@example.com",
+                         'password': f"secret{i}", 'created_at': "2024-01-02T03:04:05"}
+                        for i in range(1, 13)]
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+    
+    def test_legacy_json_loads_through_migration(self):
+        """Prueba cargar un archivo JSON antiguo (lista con contraseñas en texto plano)"""
+        write_json_file(self.path("legacy.json"), self.records)
+        service = UserService()
+        success, _ = service.load_from_json(self.path("legacy.json"))
+        
+        self.assertTrue(success)
+        user = service.get_user_by_id(3)
+        self.assertTrue(user.verify_password("secret3"))
+        self.assertEqual(user.created_at, datetime(2024, 1, 2, 3, 4, 5))
+        with self.assertRaises(KeyError):
+            User.from_dict(self.records[0])
+    
+    def test_upgrade_file_in_parallel(self):
+        """Prueba actualizar un archivo en una pasada, en bloques paralelos"""
+        source = self.path("legacy.ndjson")
+        with open(source, 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+        
+        with unittest.mock.patch('src.services.migrations.MIGRATION_CHUNK_RECORDS', 5):
+            result = upgrade_file(source, self.path("upgraded.json"), workers=2)
+        self.assertEqual(result, {'count': 12, 'from_version': 1, 'to_version': SCHEMA_VERSION})
+        
+        data = read_json_file(self.path("upgraded.json"))
+        self.assertEqual(data['schema_version'], SCHEMA_VERSION)
+        self.assertEqual([record['id'] for record in data['users']], list(range(1, 13)))
+        self.assertNotIn('password', data['users'][0])
+        self.assertEqual(verify_file(self.path("upgraded.json")).status, IntegrityStatus.OK)
+        
+        service = UserService()
+        self.assertTrue(service.load_from_json(self.path("upgraded.json"))[0])
+        self.assertTrue(service.get_user_by_id(12).verify_password("secret12"))
+    
+    def test_legacy_records_without_id(self):
+        """Prueba que los registros v1 sin ID reciben IDs nuevos al cargar y al actualizar"""
+        records = [{key: value for key, value in record.items() if key != 'id'} if record['id'] in (2, 7)
+                   else record for record in self.records[:8]]
+        write_json_file(self.path("legacy.json"), records)
+        
+        service = UserService()
+        success, message = service.load_from_json(self.path("legacy.json"))
+        self.assertTrue(success, message)
+        self.assertEqual(len(service.list_users()), 8)
+        self.assertEqual([service.get_user_by_email(f"user{i}@example.com").id for i in (2, 7)], [9, 10])
+        self.assertTrue(service.get_user_by_id(9).verify_password("secret2"))
+        self.assertTrue(service.has_unsaved_changes())
+        
+        ndjson = self.path("legacy.ndjson")
+        with open(ndjson, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        shared = IdAllocator(20)
+        service = UserService(id_allocator=shared)
+        self.assertTrue(service.load_from_ndjson(ndjson)[0])
+        self.assertEqual(service.get_user_by_email("user7@example.com").id, 21)
+        
+        result = upgrade_file(self.path("legacy.json"), self.path("upgraded.json"))
+        self.assertEqual(result['count'], 8)
+        data = read_json_file(self.path("upgraded.json"))
+        self.assertEqual([record['id'] for record in data['users']], [1, 9, 3, 4, 5, 6, 10, 8])
+        self.assertEqual(data['next_id'], 11)
+        self.assertTrue(UserService().load_from_json(self.path("upgraded.json"))[0])
+    
+    def test_headerless_files_mixing_versions(self):
+        """Prueba que un archivo sin cabecera puede mezclar registros v1 y actuales en cualquier orden"""
+        hashed = [User(f"Nuevo {i}", f"new{i}@example.com", f"secret{i}", user_id=i).to_dict()
+                  for i in (20, 21)]
+        for records in (self.records[:3] + hashed, hashed + self.records[:3]):
+            write_json_file(self.path("mixed.json"), records)
+            service = UserService()
+            success, message = service.load_from_json(self.path("mixed.json"))
+            self.assertTrue(success, message)
+            self.assertTrue(service.get_user_by_id(2).verify_password("secret2"))
+            self.assertTrue(service.get_user_by_id(21).verify_password("secret21"))
+            
+            with open(self.path("mixed.ndjson"), 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+            service = UserService()
+            success, message = service.load_from_ndjson(self.path("mixed.ndjson"))
+            self.assertTrue(success, message)
+            self.assertEqual(len(service.list_users()), 5)
+            
+            result = upgrade_file(self.path("mixed.ndjson"), self.path("upgraded.json"))
+            self.assertEqual(result['from_version'], 1)
+            self.assertTrue(UserService().load_from_json(self.path("upgraded.json"))[0])
+    
+    def test_current_and_newer_versions(self):
+        """Prueba que los registros actuales pasan sin cambios y que un esquema más nuevo se rechaza"""
+        current = [User("Ana", "ana@example.com", "secret1").to_dict()]
+        self.assertIs(next(migrate_records(current, SCHEMA_VERSION)), current[0])
+        
+        write_json_file(self.path("future.json"), {'schema_version': SCHEMA_VERSION + 1, 'users': current})
+        success, message = UserService().load_from_json(self.path("future.json"))
+        self.assertFalse(success)
+        self.assertIn("más nuevo", message)
+
+
+class TestResumableImport(unittest.TestCase):
+    """Pruebas para la importación reanudable"""
+    
+    def setUp(self):
+        """Crea un servicio con datos vivos y un origen con 23 usuarios"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = UserService()
+        self.service.register_user("Usuario Vivo", "vivo@example.com", "password123")
+        source = UserService()
+        for i in range(23):
+            source.register_user(f"Usuario Ñ{i}", f"user{i}@example.com", "password123")
+        self.source = source
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+    
+    def failing_migration(self, fail_at):
+        """migrate_record que falla en la llamada número fail_at"""
+        calls = [0]
+        real = resumable_import.migrate_record
+        
+        def migrate(record, version):
+            calls[0] += 1
+            if calls[0] == fail_at:
+                raise RuntimeError("interrumpido")
+            return real(record, version)
+        return unittest.mock.patch('src.services.resumable_import.migrate_record', side_effect=migrate)
+    
+    def test_failed_load_keeps_live_users(self):
+        """Prueba que una carga JSON o TXT fallida no vacía el servicio"""
+        broken = self.path("broken.json")
+        write_json_file(broken, [{'id': 1, 'name': "Ana", 'email': "ana@example.com",
+                                  'password_hash': "x", 'created_at': "2024-01-01T00:00:00"}, {'id': 2}])
+        success, _ = self.service.load_from_json(broken)
+        self.assertFalse(success)
+        self.assertEqual(len(self.service.list_users()), 1)
+        
+        with open(self.path("broken.txt"), 'w', encoding='utf-8') as f:
+            f.write("1|Ana|ana@example.com|x|no-es-fecha\n")
+        success, _ = self.service.load_from_txt(self.path("broken.txt"))
+        self.assertFalse(success)
+        self.assertIsNotNone(self.service.get_user_by_email("vivo@example.com"))
+    
+    def test_interrupted_import_resumes_from_checkpoint(self):
+        """Prueba reanudar una importación interrumpida en JSON y NDJSON"""
+        for name, save in (("users.json", self.source.save_to_json), ("users.ndjson", self.source.save_to_ndjson)):
+            with self.subTest(name=name):
+                filename = self.path(name)
+                save(filename)
+                before = [user.email for user in self.service.list_users()]
+                with self.failing_migration(fail_at=13):
+                    success, message = self.service.load_resumable(filename, checkpoint_every=5)
+                self.assertFalse(success)
+                self.assertEqual([user.email for user in self.service.list_users()], before)
+                self.assertTrue(resumable_import.has_checkpoint(filename))
+                
+                with unittest.mock.patch('src.services.resumable_import.migrate_record',
+                                         wraps=resumable_import.migrate_record) as migrate:
+                    success, message = self.service.load_resumable(filename, checkpoint_every=5)
+                self.assertTrue(success, message)
+                self.assertIn("reanudado desde el registro 10", message)
+                self.assertEqual(migrate.call_count, 13)
+                self.assertEqual([user.to_dict() for user in self.service.list_users()],
+                                 [user.to_dict() for user in self.source.list_users()])
+                self.assertFalse(os.path.exists(resumable_import.checkpoint_path(filename)))
+                self.assertFalse(os.path.exists(resumable_import.staging_path(filename)))
+    
+    def test_failed_swap_keeps_checkpoint(self):
+        """Prueba que si el reemplazo falla (ID repetido) el punto de control sigue disponible"""
+        filename = self.path("users.ndjson")
+        records = [user.to_dict() for user in self.source.list_users()]
+        records.append({**records[0], 'email': "repetido@example.com"})
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        
+        success, message = self.service.load_resumable(filename, checkpoint_every=5)
+        self.assertFalse(success)
+        self.assertIn("repetido", message)
+        self.assertEqual(len(self.service.list_users()), 1)
+        self.assertTrue(resumable_import.has_checkpoint(filename))
+        
+        with unittest.mock.patch('src.services.resumable_import.migrate_record',
+                                 wraps=resumable_import.migrate_record) as migrate:
+            success, message = self.service.load_resumable(filename, checkpoint_every=5)
+        self.assertFalse(success)
+        self.assertEqual(migrate.call_count, 0)
+    
+    def test_changed_source_discards_checkpoint(self):
+        """Prueba que un origen modificado invalida el punto de control"""
+        filename = self.path("users.ndjson")
+        self.source.save_to_ndjson(filename)
+        with self.failing_migration(fail_at=8):
+            self.service.load_resumable(filename, checkpoint_every=5)
+        self.assertTrue(resumable_import.has_checkpoint(filename))
+        
+        self.source.register_user("Nuevo", "nuevo@example.com", "password123")
+        self.source.save_to_ndjson(filename)
+        self.assertFalse(resumable_import.has_checkpoint(filename))
+        success, message = self.service.load_resumable(filename, checkpoint_every=5)
+        self.assertTrue(success)
+        self.assertNotIn("reanudado", message)
+        self.assertEqual(len(self.service.list_users()), 24)
+
+
+class TestBulkLoadGc(unittest.TestCase):
+    """Pruebas para el modo de GC de las cargas masivas"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "users.txt")
+        source = UserService()
+        for i in range(20):
+            source.register_user(f"Usuario {i}", f"user{i}@example.com", "password123")
+        source.export_to_txt(self.filename)
+        self.expected = [user.to_dict() for user in source.list_users()]
+    
+    def tearDown(self):
+        gc.unfreeze()
+        gc.enable()
+        self.tmpdir.cleanup()
+    
+    def test_freeze_mode_restores_gc_and_freezes_users(self):
+        """Prueba que 'freeze' reactiva el GC y congela los usuarios cargados"""
+        gc.unfreeze()
+        service = UserService(bulk_load_gc='freeze')
+        with unittest.mock.patch('gc.disable', wraps=gc.disable) as disable:
+            success, _ = service.load_from_txt(self.filename)
+        
+        self.assertTrue(success)
+        disable.assert_called_once()
+        self.assertTrue(gc.isenabled())
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertEqual([user.to_dict() for user in service.list_users()], self.expected)
+    
+    def test_pause_mode_keeps_gc_disabled_state(self):
+        """Prueba que 'pause' no congela y respeta un GC ya desactivado"""
+        gc.unfreeze()
+        gc.disable()
+        service = UserService(bulk_load_gc='pause')
+        success, _ = service.load_from_txt(self.filename)
+        
+        self.assertTrue(success)
+        self.assertFalse(gc.isenabled())
+        self.assertEqual(gc.get_freeze_count(), 0)
+        with self.assertRaises(ValueError):
+            with bulk_load_gc('later'):
+                pass
+    
+    def test_nested_contexts_freeze_if_any_asked(self):
+        """Prueba que en contextos anidados se congela si alguno pidió 'freeze', salga quien salga último"""
+        for outer, inner in (('pause', 'freeze'), ('freeze', 'pause')):
+            with self.subTest(outer=outer, inner=inner):
+                gc.unfreeze()
+                with bulk_load_gc(outer):
+                    with bulk_load_gc(inner):
+                        self.assertFalse(gc.isenabled())
+                    self.assertEqual(gc.get_freeze_count(), 0)
+                self.assertTrue(gc.isenabled())
+                self.assertGreater(gc.get_freeze_count(), 0)
+        
+        gc.unfreeze()
+        with bulk_load_gc('pause'):
+            with bulk_load_gc('pause'):
+                pass
+        self.assertEqual(gc.get_freeze_count(), 0)
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Pruebas para la caché de snapshots"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "users.json")
+        self.source = UserService()
+        for name in ("Ana García", "Luis Pérez", "María López"):
+            self.source.register_user(name, f"{name.split()[0].lower()}@example.com", "password123")
+        self.source.delete_user(2)
+        self.source.save_to_json(self.filename)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_snapshot_restores_users_and_indexes(self):
+        """Prueba que el segundo arranque usa el snapshot con los índices listos"""
+        success, message = UserService().load_cached(self.filename)
+        self.assertTrue(success)
+        self.assertNotIn("snapshot", message)
+        self.assertTrue(os.path.exists(snapshot_path(self.filename)))
+        
+        service = UserService()
+        with unittest.mock.patch.object(UserService, 'load_from_json') as load_from_json:
+            success, message = service.load_cached(self.filename)
+        self.assertTrue(success)
+        self.assertIn("snapshot", message)
+        load_from_json.assert_not_called()
+        
+        self.assertEqual([user.to_dict() for user in service.list_users()],
+                         [user.to_dict() for user in self.source.list_users()])
+        self.assertEqual(service.get_user_by_email("ANA@example.com").name, "Ana García")
+        self.assertEqual([user.id for user in service.search_users_fuzzy("garsia")],
+                         [user.id for user in self.source.search_users_fuzzy("garsia")])
+        self.assertEqual(service.stats()['total_users'], 2)
+        self.assertFalse(service.has_unsaved_changes())
+        service.register_user("Nuevo Usuario", "nuevo@example.com", "password123")
+        self.assertEqual(service.get_user_by_email("nuevo@example.com").id, 4)
+    
+    def test_changed_or_damaged_source_invalidates_snapshot(self):
+        """Prueba que un origen modificado o un snapshot dañado obligan a releer el archivo"""
+        UserService().load_cached(self.filename)
+        self.source.register_user("Pedro Ruiz", "pedro@example.com", "password123")
+        self.source.save_to_json(self.filename)
+        
+        service = UserService()
+        success, message = service.load_cached(self.filename)
+        self.assertTrue(success)
+        self.assertNotIn("snapshot", message)
+        self.assertEqual(len(service.list_users()), 3)
+        
+        with open(snapshot_path(self.filename), 'r+b') as f:
+            f.truncate(os.path.getsize(snapshot_path(self.filename)) // 2)
+        success, message = UserService().load_cached(self.filename)
+        self.assertTrue(success)
+        self.assertNotIn("snapshot", message)
+
+
 # Ejecutar las pruebas si se llama directamente
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file